@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pulp
+
+from backends import make_solver
+from metrics import SolveMetrics
+from solve import (
+    AssignmentResult,
+    CoverageModel,
+    CoverageResult,
+    DayCategory,
+    PlanSolver,
+)
+
+
+# -----------------------
+# Alternative plans
+# -----------------------
+@dataclass
+class PlanOption:
+    """
+    One of the best distinct coverage plans; its day assignments are only
+    solved when days() is first called.
+
+    rank: Position in the order found (0: the optimal plan)
+    coverage: The plan's CoverageResult
+    """
+
+    rank: int
+    coverage: CoverageResult
+    solver: PlanSolver = field(repr=False)
+    assign_options: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _days: Optional[Dict[DayCategory, AssignmentResult]] = field(
+        default=None, repr=False
+    )
+
+    def days(self) -> Dict[DayCategory, AssignmentResult]:
+        """Day assignments of the plan (see PlanSolver.assign_days), solved once"""
+        if self._days is None:
+            self._days = self.solver.assign_days(self.coverage, **self.assign_options)
+        return self._days
+
+
+def add_distance_cut(
+    model: CoverageModel, min_distance: int, tag: str
+) -> None:
+    """
+    Require the next solution's exercise counts to differ from the current
+    solution's (the values in the model) in at least min_distance
+    (category, exercise) positions.
+
+    A position whose count was 0 (or at its upper bound) can only move up (or
+    down), so its "differs" binary is bounded by the count directly; other
+    positions split the change into an increase and a decrease.
+    """
+    prob = model.prob
+    differs: List[pulp.LpVariable] = []
+    for cat, counts in model.c.items():
+        for e, var in counts.items():
+            v, ub = round(var.varValue or 0), var.upBound
+            name = f"{tag}_{cat.name.lower()}_{e}"
+            h = pulp.LpVariable(f"h_{name}", cat="Binary")
+            differs.append(h)
+            if v == 0:
+                prob += h <= var, f"diff_{name}"
+            elif v == ub:
+                prob += h <= ub - var, f"diff_{name}"
+            else:
+                up = pulp.LpVariable(f"up_{name}", cat="Binary")
+                plus = pulp.LpVariable(f"plus_{name}", lowBound=0, cat="Integer")
+                minus = pulp.LpVariable(f"minus_{name}", lowBound=0, cat="Integer")
+                prob += var - v == plus - minus, f"split_{name}"
+                prob += plus <= (ub - v) * up, f"plus_{name}"
+                prob += minus <= v * (1 - up), f"minus_{name}"
+                prob += h <= plus + minus, f"diff_{name}"
+    prob += pulp.lpSum(differs) >= min_distance, f"distance_{tag}"
+
+
+def top_k_plans(
+    solver: PlanSolver,
+    k: int,
+    min_distance: int = 1,
+    time_limit: Optional[float] = None,
+    **assign_options: Any,
+) -> List[PlanOption]:
+    """
+    The k best coverage plans with pairwise distinct exercise counts, best
+    first. The coverage model is built once; after each solve a cut excludes
+    every plan within min_distance - 1 changed counts of the one just found
+    (min_distance=1: only that plan itself). Fewer than k plans are returned
+    if no further plan exists. Plans that only pair the same exercises
+    differently count as one plan.
+
+    time_limit: solver seconds per plan
+    assign_options: keyword arguments for the lazy assign_days() of each plan
+    """
+    model = solver.build_coverage_model()
+    plans: List[PlanOption] = []
+    while len(plans) < k:
+        if plans:
+            add_distance_cut(model, min_distance, f"cut{len(plans)}")
+            model.metrics = SolveMetrics("coverage")
+            model.metrics.record_model(model.prob)
+        solver.run_coverage_solver(model, make_solver(solver.solver_settings, time_limit))
+        result = solver.extract_coverage(model)
+        solver.emit_metrics(result.metrics)
+        if not result.feasible:
+            break
+        plans.append(PlanOption(len(plans), result, solver, assign_options))
+    return plans
@@ -0,0 +1,258 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+
+import pulp
+
+try:
+    import highspy
+except ImportError:  # optional: CBC (bundled with pulp) is used instead
+    highspy = None
+
+SOLVER_BACKENDS = ("highs", "cbc")
+
+# HiGHS runs its threads on one process-wide scheduler, sized by the first
+# solve; it has to be reset before a solve with a different thread count
+_highs_threads: Optional[int] = None
+
+
+# -----------------------
+# Settings
+# -----------------------
+@dataclass
+class SolverSettings:
+    """
+    MIP backend selection, from the optional "solver" object of config.json.
+
+    backend: 'highs' (in-process through highspy, no temp files or subprocess;
+        falls back to 'cbc' when highspy is not installed) or 'cbc' (the cbc
+        binary bundled with pulp)
+    threads: Solver threads (None: solver default)
+    time_limit: Default time limit in seconds per solve (None: no limit)
+    gap_rel: Stop once the relative MIP gap is at most this (None: solver default)
+    gap_abs: Stop once the absolute MIP gap is at most this (None: solver default)
+    msg: Show solver logs
+    """
+
+    backend: str = "highs"
+    threads: Optional[int] = None
+    time_limit: Optional[float] = None
+    gap_rel: Optional[float] = None
+    gap_abs: Optional[float] = None
+    msg: bool = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SolverSettings":
+        settings = cls(**config.get("solver", {}))
+        if settings.backend not in SOLVER_BACKENDS:
+            raise ValueError(
+                f"Unknown solver backend {settings.backend!r}, expected one of {SOLVER_BACKENDS}"
+            )
+        return settings
+
+    @property
+    def effective_backend(self) -> str:
+        """The backend actually used (after falling back to CBC)"""
+        if self.backend == "highs" and highspy is None:
+            return "cbc"
+        return self.backend
+
+
+# -----------------------
+# Incumbents
+# -----------------------
+@dataclass
+class Incumbent:
+    """
+    An improving solution found during a solve.
+
+    objective: Objective value of the new incumbent
+    bound: Proven lower bound at that point
+    gap: Relative gap between them
+    elapsed_s: Solver seconds so far
+    """
+
+    objective: float
+    bound: float
+    gap: float
+    elapsed_s: float
+
+
+IncumbentHook = Callable[[Incumbent], None]
+
+
+def _incumbent_callback(
+    callback_type: int, message: str, data_out: Any, data_in: Any, hook: IncumbentHook
+) -> None:
+    hook(
+        Incumbent(
+            data_out.objective_function_value,
+            data_out.mip_dual_bound,
+            data_out.mip_gap,
+            data_out.running_time,
+        )
+    )
+
+
+T = TypeVar("T")
+
+
+class IncumbentStream(Generic[T]):
+    """
+    Run a solve in a background thread and iterate over its improving
+    incumbents as they are found; `result` holds the solve's return value
+    once iteration ends (exceptions of the solve are re-raised there).
+
+        stream = IncumbentStream(solver.solve_coverage, time_limit=60)
+        for incumbent in stream:
+            print(incumbent.objective, incumbent.bound)
+        result = stream.result
+
+    fn must accept an on_incumbent keyword (solve_coverage, assign_pairs_to_days).
+    """
+
+    _DONE = object()
+
+    def __init__(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> None:
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.result: Optional[T] = None
+
+    def __iter__(self) -> Iterator[Incumbent]:
+        found: "queue.Queue[Any]" = queue.Queue()
+        errors = []
+
+        def run() -> None:
+            try:
+                self.result = self.fn(*self.args, on_incumbent=found.put, **self.kwargs)
+            except BaseException as exc:
+                errors.append(exc)
+            finally:
+                found.put(self._DONE)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        while True:
+            item = found.get()
+            if item is self._DONE:
+                break
+            yield item
+        thread.join()
+        if errors:
+            raise errors[0]
+
+
+# -----------------------
+# Solvers
+# -----------------------
+class HighsSolver(pulp.HiGHS):
+    """
+    pulp's in-process HiGHS interface, plus MIP starts: with warmStart=True the
+    variables' current values (setInitialValue) are handed to HiGHS; variables
+    without a value are left for HiGHS to complete.
+    """
+
+    def __init__(self, warmStart: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.warm_start = warmStart
+
+    def callSolver(self, lp: pulp.LpProblem) -> None:
+        global _highs_threads
+        if self.threads != _highs_threads:
+            highspy.Highs.resetGlobalScheduler(True)
+            _highs_threads = self.threads
+        if self.warm_start:
+            start = [
+                (var.index, float(var.varValue))
+                for var in lp.variables()
+                if var.varValue is not None
+            ]
+            if start:
+                indices, values = zip(*start)
+                lp.solverModel.setSolution(len(indices), list(indices), list(values))
+        super().callSolver(lp)
+
+
+def make_solver(
+    settings: SolverSettings,
+    time_limit: Optional[float] = None,
+    warm_start: bool = False,
+    on_incumbent: Optional[IncumbentHook] = None,
+) -> pulp.LpSolver:
+    """
+    Solver for one solve; time_limit overrides the settings' default.
+    on_incumbent receives every improving solution (HiGHS only: the CBC binary
+    reports nothing until it exits).
+    """
+    if time_limit is None:
+        time_limit = settings.time_limit
+    if settings.effective_backend == "highs":
+        callbacks: Dict[str, Any] = {}
+        if on_incumbent is not None:
+            callbacks = {
+                "callbackTuple": (_incumbent_callback, on_incumbent),
+                "callbacksToActivate": [
+                    highspy.cb.HighsCallbackType.kCallbackMipImprovingSolution
+                ],
+            }
+        return HighsSolver(
+            warmStart=warm_start,
+            msg=settings.msg,
+            threads=settings.threads,
+            timeLimit=time_limit,
+            gapRel=settings.gap_rel,
+            gapAbs=settings.gap_abs,
+            **callbacks,
+        )
+    return pulp.PULP_CBC_CMD(
+        msg=settings.msg,
+        threads=settings.threads,
+        timeLimit=time_limit,
+        gapRel=settings.gap_rel,
+        gapAbs=settings.gap_abs,
+        warmStart=warm_start,
+    )
+
+
+def solve_statistics(prob: pulp.LpProblem) -> Tuple[Optional[float], Optional[int]]:
+    """
+    Relative MIP gap and branch-and-bound node count of the last solve of prob.
+    Only HiGHS reports them; (None, None) after a CBC solve.
+    """
+    model = getattr(prob, "solverModel", None)
+    if highspy is None or not isinstance(model, highspy.Highs):
+        return None, None
+    info = model.getInfo()
+    return info.mip_gap, info.mip_node_count
+
+
+def proven_gap(
+    prob: pulp.LpProblem, settings: SolverSettings, mip_gap: Optional[float]
+) -> Optional[float]:
+    """
+    Proven relative gap of the solution in prob: HiGHS's final gap; for CBC
+    0 (or the gap target) when it proved optimality, else unknown (None).
+    None as well when no solution was found.
+    """
+    if prob.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+        return None
+    if mip_gap is not None:
+        return mip_gap if mip_gap != float("inf") else None
+    if prob.sol_status == pulp.LpSolutionOptimal:
+        if settings.gap_abs and not settings.gap_rel:
+            return None  # stopped at an absolute gap: relative gap unknown
+        return settings.gap_rel or 0.0
+    return None
+
+
+def proven_optimal(prob: pulp.LpProblem, settings: SolverSettings) -> bool:
+    """
+    The solution in prob is proven optimal: the solver reports optimality and
+    no gap_rel / gap_abs target let it stop early (CBC reports Optimal as soon
+    as a gap target is met)
+    """
+    return (
+        prob.sol_status == pulp.LpSolutionOptimal
+        and not settings.gap_rel
+        and not settings.gap_abs
+    )
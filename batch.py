@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import IO, Any, Dict, Iterable, Iterator, Optional
+
+from cache import SolveCache
+from report import PLAN_FIELDS, RECORD_FORMATS, RecordWriter, plan_markdown, plan_record
+from shared import SharedCatalog
+from solve import AssignmentResult, CoverageResult, DayCategory, PlanSolver
+
+
+# -----------------------
+# Profiles and records
+# -----------------------
+def iter_profiles(path: str) -> Iterator[Dict[str, Any]]:
+    """Read profile overrides from a JSONL file (one object per line, blank lines skipped)"""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def job_record(
+    job_id: Any,
+    result: CoverageResult,
+    assignments: Dict[DayCategory, AssignmentResult],
+) -> Dict[str, Any]:
+    """JSON-serializable summary of one solved profile"""
+    return {"id": job_id, **plan_record(result, assignments)}
+
+
+# -----------------------
+# Worker side
+# -----------------------
+# Base solver of the worker process, set once by the pool initializer so the
+# exercise tables are transferred to each worker once, not once per job
+_BASE: Optional[PlanSolver] = None
+
+
+def _init_worker(base: PlanSolver) -> None:
+    global _BASE
+    _BASE = base
+
+
+def solve_profile(
+    job_id: Any,
+    overrides: Dict[str, Any],
+    timeout: Optional[float] = None,
+    assignment_method: str = "exact",
+    config: Optional[Dict[str, Any]] = None,
+    markdown: bool = False,
+) -> Dict[str, Any]:
+    """
+    Solve one profile on the worker's base solver, or on a full config replacing
+    it (the overrides then apply to that config). The timeout is enforced as solver
+    time limits over both stages: each category's day assignment gets what is
+    left of it, and falls back to the heuristic once it is used up. With
+    markdown=True the record also holds the plan as printed by solve.py. Errors
+    are captured in the record, never raised.
+    """
+    start = time.perf_counter()
+    try:
+        assert _BASE is not None, "worker not initialized"
+        base = _BASE if config is None else PlanSolver(config)
+        solver = base.with_overrides(overrides)
+        result = solver.solve_coverage(time_limit=timeout)
+        assignments: Dict[DayCategory, AssignmentResult] = {}
+        if result.feasible:
+            deadline = None if timeout is None else start + timeout
+            assignments = solver.assign_days(
+                result, method=assignment_method, deadline=deadline
+            )
+        record = job_record(job_id, result, assignments)
+        if markdown:
+            record["markdown"] = plan_markdown(solver, result, assignments)
+    except Exception as exc:
+        record = {"id": job_id, "status": "Error", "error": repr(exc)}
+    elapsed = time.perf_counter() - start
+    record["elapsed_s"] = elapsed
+    record["timed_out"] = timeout is not None and elapsed >= timeout
+    return record
+
+
+# -----------------------
+# Batch driver
+# -----------------------
+def run_batch(
+    base: PlanSolver,
+    profiles: Iterable[Dict[str, Any]],
+    out: IO[str],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    assignment_method: str = "exact",
+    fmt: str = "jsonl",
+) -> Dict[str, Any]:
+    """
+    Solve profile overrides in parallel on a process pool and write one record
+    per job to `out` as jobs finish (a JSON line, or a CSV row with fmt="csv").
+    A profile's optional "id" key names its job (defaults to its index).
+    Returns a throughput summary.
+    """
+    writer = RecordWriter(
+        out, fmt, ["id", *PLAN_FIELDS, "elapsed_s", "timed_out", "error"]
+    )
+    workers = workers or os.cpu_count() or 1
+    max_pending = 4 * workers
+    summary = {"jobs": 0, "solved": 0, "failed": 0, "timed_out": 0}
+
+    def emit(record: Dict[str, Any]) -> None:
+        summary["jobs"] += 1
+        if record["status"] in ("Optimal", "Feasible"):
+            summary["solved"] += 1
+        else:
+            summary["failed"] += 1
+        if record.get("timed_out"):
+            summary["timed_out"] += 1
+        writer.write(record)
+
+    def collect(done: Iterable[Future]) -> None:
+        for future in done:
+            job_id = pending.pop(future)
+            try:
+                record = future.result()
+            except Exception as exc:  # worker died (e.g. BrokenProcessPool)
+                record = {"id": job_id, "status": "Error", "error": repr(exc)}
+            emit(record)
+
+    start = time.perf_counter()
+    pending: Dict[Future, Any] = {}
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(base,)
+    ) as pool:
+        for index, profile in enumerate(profiles):
+            overrides = dict(profile)
+            job_id = overrides.pop("id", index)
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = pool.submit(
+                solve_profile, job_id, overrides, timeout, assignment_method
+            )
+            pending[future] = job_id
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    wall_s = time.perf_counter() - start
+    summary["wall_s"] = wall_s
+    summary["jobs_per_s"] = summary["jobs"] / wall_s if wall_s > 0 else 0.0
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Solve many profile overrides (JSONL) against one base config"
+    )
+    parser.add_argument("profiles", help="JSONL file of profile overrides")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    parser.add_argument("--format", default="jsonl", choices=RECORD_FORMATS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per job")
+    parser.add_argument(
+        "--assignment-method", default="exact", choices=["exact", "heuristic"]
+    )
+    parser.add_argument("--cache", default=None, help="SQLite solve cache file")
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="invalidate the cache first"
+    )
+    parser.add_argument(
+        "--shared", action="store_true", help="workers attach to one shared exercise table"
+    )
+    args = parser.parse_args()
+
+    cache = SolveCache(args.cache) if args.cache else None
+    if cache is not None and args.clear_cache:
+        cache.invalidate()
+    catalog = SharedCatalog.from_path(args.config) if args.shared else None
+    base = catalog.solver(cache) if catalog else PlanSolver.from_path(args.config, cache)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+    try:
+        summary = run_batch(
+            base,
+            iter_profiles(args.profiles),
+            out,
+            workers=args.workers,
+            timeout=args.timeout,
+            assignment_method=args.assignment_method,
+            fmt=args.format,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if catalog is not None:
+            catalog.close()
+
+    print(
+        f"{summary['jobs']} jobs ({summary['solved']} solved, {summary['failed']} failed, "
+        f"{summary['timed_out']} timed out) in {summary['wall_s']:.2f} s: "
+        f"{summary['jobs_per_s']:.2f} jobs/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,538 @@
+import argparse
+import copy
+import csv
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import pulp
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported
+    resource = None
+
+from backends import SOLVER_BACKENDS, make_solver
+from decompose import CoverageDecomposition
+from joint import JointSolver, total_overlap
+from preview import PREVIEW_METHODS, preview_coverage
+from solve import (
+    ASSIGNMENT_FORMULATIONS,
+    DayCategory,
+    ExercisePairs,
+    Muscle,
+    PlanSolver,
+    load_config,
+    safe_value,
+)
+
+
+# -----------------------
+# Day-assignment formulations
+# -----------------------
+def sample_pairs(
+    solver: PlanSolver, cat: DayCategory, count: int, rng: random.Random
+) -> ExercisePairs:
+    """
+    Draw `count` compatible pairs of a category with repeats, like the expanded
+    pairs of a coverage solve (where most pairs are used more than once).
+    """
+    names = solver.exercise_names
+    pool = solver.compatible_pairs[cat]
+    if not pool:
+        raise ValueError(f"No compatible pairs in {cat.name}")
+    distinct = rng.sample(pool, k=min(len(pool), max(1, (count * 2) // 3)))
+    return [(names[i], names[j]) for i, j in rng.choices(distinct, k=count)]
+
+
+def bench_assignment_formulations(
+    solver: PlanSolver,
+    days: Iterable[int] = range(3, 8),
+    pairs_per_day: Iterable[int] = range(2, 7),
+    cat: DayCategory = DayCategory.UPPER_GYM,
+    formulations: Iterable[str] = ASSIGNMENT_FORMULATIONS,
+    time_limit: Optional[float] = 60.0,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Build and solve the day-assignment ILP with each formulation on the same
+    sampled pairs, for every (days, pairs per day) combination.
+    Returns one row per (days, pairs per day, formulation).
+    """
+    rows: List[Dict[str, Any]] = []
+    for num_days in days:
+        for ppd in pairs_per_day:
+            pairs_list = sample_pairs(
+                solver, cat, num_days * ppd, random.Random(seed + num_days * 10 + ppd)
+            )
+            for formulation in formulations:
+                start = time.perf_counter()
+                model = solver.build_assignment_model(
+                    pairs_list, cat.name.lower(), num_days, ppd, formulation
+                )
+                build_s = time.perf_counter() - start
+
+                start = time.perf_counter()
+                model.prob.solve(make_solver(solver.solver_settings, time_limit))
+                solve_s = time.perf_counter() - start
+
+                rows.append(
+                    {
+                        "days": num_days,
+                        "pairs_per_day": ppd,
+                        "formulation": formulation,
+                        "variables": model.prob.numVariables(),
+                        "constraints": model.prob.numConstraints(),
+                        "build_s": build_s,
+                        "solve_s": solve_s,
+                        "status": pulp.LpStatus[model.prob.status],
+                        "solution": pulp.LpSolution[model.prob.sol_status],
+                        "objective": safe_value(model.prob.objective),
+                    }
+                )
+    return rows
+
+
+# -----------------------
+# Coverage presolve
+# -----------------------
+def bench_coverage_presolve(
+    solver: PlanSolver, time_limit: Optional[float] = 60.0
+) -> List[Dict[str, Any]]:
+    """Build and solve the coverage ILP without and with presolve (one row each)"""
+    rows: List[Dict[str, Any]] = []
+    for presolve in (False, True):
+        start = time.perf_counter()
+        model = solver.build_coverage_model(presolve=presolve)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model.prob.solve(make_solver(solver.solver_settings, time_limit))
+        solve_s = time.perf_counter() - start
+
+        rows.append(
+            {
+                "presolve": presolve,
+                "variables": model.prob.numVariables(),
+                "constraints": model.prob.numConstraints(),
+                "removed_pairs": sum(r.removed_pairs for r in model.presolve.values()),
+                "removed_counts": sum(r.removed_counts for r in model.presolve.values()),
+                "build_s": build_s,
+                "solve_s": solve_s,
+                "status": pulp.LpStatus[model.prob.status],
+                "objective": safe_value(model.prob.objective),
+            }
+        )
+    return rows
+
+
+# -----------------------
+# Scaling over synthetic catalogs
+# -----------------------
+def synthetic_config(
+    base: Dict[str, Any],
+    size: int,
+    days: int,
+    pairs_per_day: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Copy of a config with `size` synthetic exercises and every category set to
+    `days` days of `pairs_per_day` supersets. Exercise k copies the categories,
+    equipment and usage limit of base exercise k (mod the base size, in shuffled
+    order, so the categories keep their proportions) and perturbs its
+    activations (scaled by 0.8-1.2, sometimes one moved to another muscle), so
+    the compatible pairs grow like they would in a real catalog.
+    """
+    rng = random.Random(seed)
+    templates = list(base["exercises"].items())
+    rng.shuffle(templates)
+    muscles = [m.name for m in Muscle]
+    exercises: Dict[str, Any] = {}
+    for k in range(size):
+        name, data = templates[k % len(templates)]
+        activations = {
+            m: round(min(1.0, val * rng.uniform(0.8, 1.2)), 2)
+            for m, val in data["activations"].items()
+        }
+        if activations and rng.random() < 0.2:
+            moved = rng.choice(list(activations))
+            activations[rng.choice(muscles)] = activations.pop(moved)
+        exercises[f"{name} #{k}"] = {
+            "categories": list(data["categories"]),
+            "activations": activations,
+            "equipments": list(data["equipments"]),
+            "usage_limit_per_category": data["usage_limit_per_category"],
+        }
+    config = copy.deepcopy({key: val for key, val in base.items() if key != "exercises"})
+    config["exercises"] = exercises
+    config["days_per_category"] = {cat.name: days for cat in DayCategory}
+    config["supersets_per_day"] = {cat.name: pairs_per_day for cat in DayCategory}
+    return config
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water resident memory of this process (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run_scaling_case(
+    config: Dict[str, Any], time_limit: Optional[float] = 60.0
+) -> List[Dict[str, Any]]:
+    """
+    Build and solve both stages of one synthetic config: the coverage ILP, then
+    the day-assignment ILP of every category on its pairs (summed over
+    categories; skipped if the coverage solve failed). One row per stage.
+    peak_rss_mb is the process high-water mark after the stage, so run each
+    case in a fresh process (see bench_scaling).
+    """
+    solver = PlanSolver(config)
+
+    start = time.perf_counter()
+    model = solver.build_coverage_model()
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    model.prob.solve(make_solver(solver.solver_settings, time_limit))
+    solve_s = time.perf_counter() - start
+    result = solver.extract_coverage(model)
+    rows = [
+        {
+            "stage": "coverage",
+            "variables": model.prob.numVariables(),
+            "constraints": model.prob.numConstraints(),
+            "build_s": build_s,
+            "solve_s": solve_s,
+            "status": result.status,
+            "proven_optimal": result.proven_optimal,
+            "objective": result.objective_value,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    ]
+
+    row = {
+        "stage": "assignment",
+        "variables": 0,
+        "constraints": 0,
+        "build_s": 0.0,
+        "solve_s": 0.0,
+        "status": "Optimal" if result.feasible else "Skipped",
+        "proven_optimal": result.feasible,
+        "objective": 0.0,
+    }
+    for cat, pairs_list in result.pairs_dict.items() if result.feasible else ():
+        start = time.perf_counter()
+        assignment = solver.build_assignment_model(
+            pairs_list,
+            cat.name.lower(),
+            solver.days_per_category[cat],
+            solver.pairs_per_day[cat],
+        )
+        row["build_s"] += time.perf_counter() - start
+        start = time.perf_counter()
+        assignment.prob.solve(make_solver(solver.solver_settings, time_limit))
+        row["solve_s"] += time.perf_counter() - start
+        row["variables"] += assignment.prob.numVariables()
+        row["constraints"] += assignment.prob.numConstraints()
+        row["objective"] += safe_value(assignment.prob.objective)
+        status = pulp.LpStatus[assignment.prob.status]
+        if status != "Optimal":
+            row["status"] = status
+        if assignment.prob.sol_status != pulp.LpSolutionOptimal:
+            row["proven_optimal"] = False
+    row["peak_rss_mb"] = peak_rss_mb()
+    rows.append(row)
+    return rows
+
+
+def bench_scaling(
+    base: Dict[str, Any],
+    sizes: Iterable[int] = (50, 100, 250, 500, 1000),
+    days: Iterable[int] = range(1, 8),
+    pairs_per_day: Iterable[int] = range(2, 7),
+    time_limit: Optional[float] = 60.0,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Run both stages on a synthetic catalog for every (size, days, pairs per
+    day) combination, each case in a fresh worker process so the peak memory
+    and solver state of one case don't leak into the next.
+    """
+    rows: List[Dict[str, Any]] = []
+    for size in sizes:
+        for num_days in days:
+            for ppd in pairs_per_day:
+                config = synthetic_config(base, size, num_days, ppd, seed + size)
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    stages = pool.submit(run_scaling_case, config, time_limit).result()
+                for stage in stages:
+                    rows.append(
+                        {"exercises": size, "days": num_days, "pairs_per_day": ppd, **stage}
+                    )
+    return rows
+
+
+# -----------------------
+# Decomposed vs monolithic coverage
+# -----------------------
+def bench_decomposition(
+    base: Dict[str, Any],
+    sizes: Iterable[int] = (65, 250, 1000),
+    days: int = 3,
+    pairs_per_day: int = 2,
+    time_limit: Optional[float] = 60.0,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Solve the coverage ILP of synthetic catalogs monolithically and with
+    CoverageDecomposition (one row each per size).
+    """
+    rows: List[Dict[str, Any]] = []
+    for size in sizes:
+        solver = PlanSolver(synthetic_config(base, size, days, pairs_per_day, seed + size))
+        start = time.perf_counter()
+        result = solver.solve_coverage(time_limit=time_limit, use_cache=False)
+        rows.append(
+            {
+                "exercises": size,
+                "mode": "monolithic",
+                "wall_s": time.perf_counter() - start,
+                "status": result.status,
+                "proven_optimal": result.proven_optimal,
+                "objective": result.objective_value,
+                "lower_bound": None,
+                "rounds": None,
+                "fallback": None,
+            }
+        )
+
+        decomposition = CoverageDecomposition(solver, workers=workers)
+        start = time.perf_counter()
+        result = decomposition.solve(time_limit=time_limit)
+        rows.append(
+            {
+                "exercises": size,
+                "mode": "decomposed",
+                "wall_s": time.perf_counter() - start,
+                "status": result.status,
+                "proven_optimal": result.proven_optimal,
+                "objective": result.objective_value,
+                "lower_bound": decomposition.lower_bound,
+                "rounds": decomposition.rounds,
+                "fallback": decomposition.used_fallback,
+            }
+        )
+    return rows
+
+
+# -----------------------
+# Joint vs two-stage
+# -----------------------
+def bench_joint(
+    solver: PlanSolver,
+    weights: Iterable[float] = (0.1, 1.0),
+    time_limit: Optional[float] = 60.0,
+) -> List[Dict[str, Any]]:
+    """
+    Per overlap weight, the two-stage plan and the joint plan (warm-started
+    from it, so its time includes the two-stage solve) on the combined
+    objective: coverage objective + weight * same-day overlap.
+    """
+    rows: List[Dict[str, Any]] = []
+    for weight in weights:
+        start = time.perf_counter()
+        coverage = solver.solve_coverage(time_limit, use_cache=False)
+        days = solver.assign_days(coverage, time_limit=time_limit, use_cache=False)
+        overlap = total_overlap(days)
+        rows.append(
+            {
+                "overlap_weight": weight,
+                "mode": "two_stage",
+                "wall_s": time.perf_counter() - start,
+                "coverage_objective": coverage.objective_value,
+                "overlap": overlap,
+                "objective": coverage.objective_value + weight * overlap,
+                "proven_optimal": coverage.proven_optimal,
+            }
+        )
+
+        start = time.perf_counter()
+        result = JointSolver(solver, overlap_weight=weight).solve(time_limit)
+        rows.append(
+            {
+                "overlap_weight": weight,
+                "mode": "joint",
+                "wall_s": time.perf_counter() - start,
+                "coverage_objective": result.coverage.objective_value,
+                "overlap": total_overlap(result.days),
+                "objective": result.objective_value,
+                "proven_optimal": result.proven_optimal,
+            }
+        )
+    return rows
+
+
+# -----------------------
+# Preview estimates vs the ILP
+# -----------------------
+def bench_preview(
+    base: Dict[str, Any],
+    sizes: Iterable[int] = (50, 100, 250, 500, 1000),
+    days: int = 3,
+    pairs_per_day: int = 2,
+    time_limit: Optional[float] = 60.0,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Per synthetic catalog size, each preview method (with repair) against the
+    coverage ILP: wall time, the LP bound, and the repaired plan's objective.
+    """
+    rows: List[Dict[str, Any]] = []
+    for size in sizes:
+        solver = PlanSolver(synthetic_config(base, size, days, pairs_per_day, seed + size))
+        start = time.perf_counter()
+        result = solver.solve_coverage(time_limit, use_cache=False)
+        rows.append(
+            {
+                "exercises": size,
+                "mode": "ilp",
+                "wall_s": time.perf_counter() - start,
+                "lower_bound": None,
+                "objective": result.objective_value,
+            }
+        )
+        for method in PREVIEW_METHODS:
+            start = time.perf_counter()
+            preview = preview_coverage(solver, method=method, repair=True)
+            rows.append(
+                {
+                    "exercises": size,
+                    "mode": method,
+                    "wall_s": time.perf_counter() - start,
+                    "lower_bound": preview.lower_bound,
+                    "objective": (
+                        preview.plan.objective_value
+                        if preview.plan and preview.plan.feasible
+                        else None
+                    ),
+                }
+            )
+    return rows
+
+
+def write_rows(rows: List[Dict[str, Any]], path: str) -> None:
+    """Write benchmark rows to a .json file (a list of objects) or a CSV file"""
+    with open(path, "w", newline="") as f:
+        if path.endswith(".json"):
+            json.dump(rows, f, indent=2)
+        elif rows:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def print_rows(rows: List[Dict[str, Any]]) -> None:
+    """Print benchmark rows as a Markdown table"""
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    print("| " + " | ".join(columns) + " |")
+    print("|" + "|".join(["---"] * len(columns)) + "|")
+    for row in rows:
+        cells = [
+            f"{row[col]:.3f}" if isinstance(row[col], float) else str(row[col])
+            for col in columns
+        ]
+        print("| " + " | ".join(cells) + " |")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Solver benchmarks")
+    parser.add_argument(
+        "--stage",
+        default="assignment",
+        choices=["assignment", "presolve", "scaling", "decomposition", "joint", "preview"],
+    )
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument(
+        "--min-days", type=int, default=None, help="default: 1 for the scaling stage, else 3"
+    )
+    parser.add_argument("--max-days", type=int, default=7)
+    parser.add_argument("--min-pairs", type=int, default=2)
+    parser.add_argument("--max-pairs", type=int, default=6)
+    parser.add_argument("--category", default="UPPER_GYM")
+    parser.add_argument(
+        "--formulations", nargs="+", default=list(ASSIGNMENT_FORMULATIONS)
+    )
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=SOLVER_BACKENDS, default=None)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 100, 250, 500, 1000],
+        help="synthetic catalog sizes (scaling, decomposition and preview stages)",
+    )
+    parser.add_argument(
+        "--weights", type=float, nargs="+", default=[0.1, 1.0],
+        help="overlap weights (joint stage)",
+    )
+    parser.add_argument("--out", default=None, help="also write rows to .csv or .json")
+    args = parser.parse_args()
+    if args.min_days is None:
+        args.min_days = 1 if args.stage == "scaling" else 3
+
+    if args.stage == "scaling":
+        base = load_config(args.config)
+        if args.backend:
+            base["solver"] = {**base.get("solver", {}), "backend": args.backend}
+        rows = bench_scaling(
+            base,
+            sizes=args.sizes,
+            days=range(args.min_days, args.max_days + 1),
+            pairs_per_day=range(args.min_pairs, args.max_pairs + 1),
+            time_limit=args.time_limit,
+            seed=args.seed,
+        )
+    elif args.stage in ("decomposition", "preview"):
+        base = load_config(args.config)
+        if args.backend:
+            base["solver"] = {**base.get("solver", {}), "backend": args.backend}
+        bench = bench_decomposition if args.stage == "decomposition" else bench_preview
+        rows = bench(
+            base,
+            sizes=args.sizes,
+            days=args.min_days,
+            pairs_per_day=args.min_pairs,
+            time_limit=args.time_limit,
+            seed=args.seed,
+        )
+    else:
+        solver = PlanSolver.from_path(args.config)
+        if args.backend:
+            solver = solver.with_overrides({"solver": {"backend": args.backend}})
+        if args.stage == "presolve":
+            rows = bench_coverage_presolve(solver, args.time_limit)
+        elif args.stage == "joint":
+            rows = bench_joint(solver, args.weights, args.time_limit)
+        else:
+            rows = bench_assignment_formulations(
+                solver,
+                days=range(args.min_days, args.max_days + 1),
+                pairs_per_day=range(args.min_pairs, args.max_pairs + 1),
+                cat=DayCategory[args.category],
+                formulations=args.formulations,
+                time_limit=args.time_limit,
+                seed=args.seed,
+            )
+    print_rows(rows)
+    if args.out:
+        write_rows(rows, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+# Bump when a change to the models or result types makes stored results stale
+CACHE_VERSION = 1
+
+# Config keys that affect the coverage ILP
+COVERAGE_KEYS = (
+    "sets_per_instance",
+    "threshold",
+    "deviation_sum_weight",
+    "undershoot_weight_multiplier",
+    "supersets_per_day",
+    "days_per_category",
+    "muscle_targets",
+    "exercises",
+)
+
+
+# -----------------------
+# Canonical keys
+# -----------------------
+def _canonical(obj: Any) -> Any:
+    """Normalize numbers (5 == 5.0) and tuples so equal configs serialize equally"""
+    if isinstance(obj, bool) or obj is None or isinstance(obj, str):
+        return obj
+    if isinstance(obj, (int, float)):
+        return float(obj)
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    return str(obj)
+
+
+def canonical_hash(stage: str, payload: Any) -> str:
+    """SHA-256 of a stage name and its inputs, independent of key order and int/float spelling"""
+    text = json.dumps(
+        [CACHE_VERSION, stage, _canonical(payload)],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def coverage_payload(config: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a raw config the coverage ILP depends on"""
+    return {key: config.get(key) for key in COVERAGE_KEYS}
+
+
+# -----------------------
+# On-disk store
+# -----------------------
+class SolveCache:
+    """
+    Content-addressed store of solve results in a SQLite file, evicting least
+    recently used entries beyond max_entries / max_bytes. Values are pickled.
+    Safe to share between processes (each opens its own connection).
+    """
+
+    def __init__(
+        self,
+        path: str = "solve_cache.sqlite",
+        max_entries: Optional[int] = 10000,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, stage TEXT, value BLOB, size INTEGER, last_used REAL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def key(self, stage: str, payload: Any) -> str:
+        return canonical_hash(stage, payload)
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self.conn.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute(
+            "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self.conn.commit()
+        return pickle.loads(row[0])
+
+    def put(self, key: str, stage: str, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (key, stage, blob, len(blob), time.time()),
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self) -> None:
+        if self.max_entries is not None:
+            self.conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self.conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used ASC"
+            ).fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+
+    def invalidate(self, key: Optional[str] = None, stage: Optional[str] = None) -> None:
+        """Drop one key, every entry of a stage, or (no arguments) everything"""
+        if key is not None:
+            self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        elif stage is not None:
+            self.conn.execute("DELETE FROM results WHERE stage = ?", (stage,))
+        else:
+            self.conn.execute("DELETE FROM results")
+        self.conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        entries, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
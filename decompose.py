@@ -0,0 +1,472 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pulp
+
+from backends import make_solver, proven_optimal
+from metrics import SolveMetrics
+from presolve import PairPresolve
+from solve import (
+    CoverageResult,
+    DayCategory,
+    LpVariableDict,
+    Muscle,
+    MUSCLE_INDEX,
+    PlanSolver,
+    safe_value,
+)
+
+
+# -----------------------
+# Category patterns
+# -----------------------
+@dataclass
+class CategoryPattern:
+    """
+    A feasible solution of one category's block of the coverage ILP.
+
+    cat: The category
+    counts: Exercise counts (by exercise index, used exercises only)
+    pairs: Pair counts (by exercise index pair, used pairs only)
+    coverage: Sets per muscle the category contributes (length M)
+    """
+
+    cat: DayCategory
+    counts: Dict[int, int]
+    pairs: Dict[Tuple[int, int], int]
+    coverage: np.ndarray
+
+
+def read_pattern(
+    solver: PlanSolver, cat: DayCategory, c: LpVariableDict, p: LpVariableDict
+) -> CategoryPattern:
+    """The pattern of one category in a solved model"""
+    counts = {e: round(safe_value(var)) for e, var in c.items() if safe_value(var) > 0.5}
+    pairs = {
+        pair: round(safe_value(var)) for pair, var in p.items() if safe_value(var) > 0.5
+    }
+    coverage = np.zeros(solver.M)
+    for e, count in counts.items():
+        coverage += solver.sets_per_instance[cat] * count * solver.vec[e]
+    return CategoryPattern(cat, counts, pairs, coverage)
+
+
+class CategoryPricer:
+    """
+    One category's block of the coverage ILP (counts, pairs, link and total
+    constraints) with a linear objective on the counts, built once and
+    re-solved for every new objective. Without a presolve reduction every
+    exercise has a count variable.
+    """
+
+    def __init__(
+        self,
+        solver: PlanSolver,
+        cat: DayCategory,
+        reduction: Optional[PairPresolve] = None,
+    ) -> None:
+        self.solver = solver
+        self.cat = cat
+        self.prob = pulp.LpProblem(f"pricing_{cat.name.lower()}", pulp.LpMinimize)
+        self.c, self.p = solver.category_variables(cat, reduction)
+        solver.add_category_constraints(self.prob, cat, self.c, self.p)
+
+    def solve(
+        self, costs: np.ndarray, time_limit: Optional[float] = None
+    ) -> Tuple[Optional[CategoryPattern], float, bool]:
+        """
+        Cheapest pattern under per-exercise costs: (pattern or None if the
+        block is infeasible, its cost, whether the solve proved optimality)
+        """
+        solver = self.solver
+        self.prob.setObjective(
+            pulp.LpAffineExpression(
+                [(var, float(costs[e])) for e, var in self.c.items()]
+            )
+        )
+        self.prob.solve(make_solver(solver.solver_settings, time_limit))
+        if pulp.LpStatus[self.prob.status] not in ("Optimal", "Feasible"):
+            return None, 0.0, False
+        pattern = read_pattern(solver, self.cat, self.c, self.p)
+        cost = float(sum(costs[e] * count for e, count in pattern.counts.items()))
+        return pattern, cost, proven_optimal(self.prob, solver.solver_settings)
+
+
+# Pricers of the worker process, set once by the pool initializer
+_PRICERS: Dict[DayCategory, CategoryPricer] = {}
+
+
+def _init_worker(solver: PlanSolver) -> None:
+    reductions = solver.presolve_coverage()
+    for cat in DayCategory:
+        _PRICERS[cat] = CategoryPricer(solver, cat, reductions[cat])
+
+
+def _price(
+    cat: DayCategory, costs: np.ndarray, time_limit: Optional[float]
+) -> Tuple[Optional[CategoryPattern], float, bool]:
+    return _PRICERS[cat].solve(costs, time_limit)
+
+
+# -----------------------
+# Column generation
+# -----------------------
+# Rounds between upper bounds from the integer master (also solved at the end)
+INTEGER_MASTER_EVERY = 5
+# Relative lower-bound improvement below which a round counts as stalled
+STALL_IMPROVEMENT = 1e-3
+
+
+class CoverageDecomposition:
+    """
+    Dantzig-Wolfe decomposition of the coverage ILP by category.
+
+    The categories only interact through the per-muscle coverage sums in the
+    deviation constraints. The master problem picks one pattern (a feasible
+    block solution) per category and holds the deviation slacks and the
+    objective; its duals on the deviation constraints price muscle coverage,
+    and the four category blocks are priced concurrently for new patterns.
+
+    Each round gives a lower bound (master LP value plus the categories' most
+    negative reduced costs) and an upper bound (the master restricted to
+    integer pattern choices). solve() stops once the relative gap is within
+    gap_tolerance, after max_rounds, or once the lower bound has stalled for
+    stall_rounds rounds; if the gap is still larger it falls back to the
+    monolithic model, warm-started with the best plan found.
+
+    This is not a faster path on the catalogs measured so far: the master LP
+    relaxes the integer counts, so its bound stalls a few percent below the
+    optimum (19.14 vs 21.53 on config.json) and the fallback decides the
+    result. With the stall check, config.json takes 12.6 s against 2.4 s for
+    solve_coverage() (about 5x slower, with workers=0 and with the pool; 36 s
+    without it), and the differential harness measures 0.24-0.46x the
+    reference speed at 40 exercises. Use it for its bounds, not its speed.
+
+    workers: processes pricing the categories (0: price in this process)
+    stall_rounds: Rounds without a STALL_IMPROVEMENT relative gain of the
+        lower bound before giving up on closing the gap (0: never)
+    """
+
+    def __init__(
+        self,
+        solver: PlanSolver,
+        gap_tolerance: float = 1e-4,
+        max_rounds: int = 50,
+        workers: Optional[int] = None,
+        pricing_time_limit: Optional[float] = None,
+        stall_rounds: int = 3,
+    ) -> None:
+        self.solver = solver
+        self.gap_tolerance = gap_tolerance
+        self.max_rounds = max_rounds
+        self.stall_rounds = stall_rounds
+        self.workers = len(DayCategory) if workers is None else workers
+        self.pricing_time_limit = pricing_time_limit
+        self.muscles = [m for m in Muscle if solver.muscle_targets[m] > 0]
+        self.columns: Dict[DayCategory, List[CategoryPattern]] = {
+            cat: [] for cat in DayCategory
+        }
+        self.lower_bound = -float("inf")
+        self.upper_bound = float("inf")
+        self.best: Optional[Dict[DayCategory, CategoryPattern]] = None
+        self.rounds = 0
+        self.stalled = False
+        self.used_fallback = False
+
+    @property
+    def gap(self) -> float:
+        if self.best is None:
+            return float("inf")
+        return max(0.0, self.upper_bound - self.lower_bound) / max(
+            abs(self.upper_bound), 1e-9
+        )
+
+    def exercise_costs(self, cat: DayCategory, muscle_prices: np.ndarray) -> np.ndarray:
+        """Per-exercise cost of one count in a category under muscle prices (length M)"""
+        return self.solver.sets_per_instance[cat] * (self.solver.vec @ muscle_prices)
+
+    def solve(self, time_limit: Optional[float] = None) -> CoverageResult:
+        """
+        Run column generation, then return the best plan, or the monolithic
+        solution if the gap could not be closed (time_limit: for each of the
+        restricted and the monolithic solve)
+        """
+        metrics = SolveMetrics("coverage")
+        if self.workers > 0:
+            pool: Optional[Executor] = ProcessPoolExecutor(
+                max_workers=min(self.workers, os.cpu_count() or 1),
+                initializer=_init_worker,
+                initargs=(self.solver,),
+            )
+        else:
+            pool = None
+            _init_worker(self.solver)
+        try:
+            self._generate(pool, metrics, time_limit)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if self.best is not None and self.gap <= self.gap_tolerance:
+            with metrics.span("extract"):
+                result = self.plan_result(self.best)
+            metrics.mip_gap = self.gap
+            result.metrics = metrics
+            self.solver.emit_metrics(metrics)
+            return result
+
+        # Fall back to the monolithic model
+        self.used_fallback = True
+        model = self.solver.build_coverage_model()
+        warm_start = self.best is not None
+        if warm_start:
+            for cat, pattern in self.best.items():
+                for e, var in model.c[cat].items():
+                    var.setInitialValue(pattern.counts.get(e, 0))
+                for pair, var in model.p[cat].items():
+                    var.setInitialValue(pattern.pairs.get(pair, 0))
+        model.metrics.phases = {**metrics.phases, **model.metrics.phases}
+        self.solver.run_coverage_solver(
+            model, make_solver(self.solver.solver_settings, time_limit, warm_start)
+        )
+        result = self.solver.extract_coverage(model)
+        self.solver.emit_metrics(result.metrics)
+        return result
+
+    def _price_all(
+        self, pool: Optional[Executor], costs: Dict[DayCategory, np.ndarray]
+    ) -> Dict[DayCategory, Tuple[Optional[CategoryPattern], float, bool]]:
+        if pool is None:
+            return {cat: _price(cat, costs[cat], self.pricing_time_limit) for cat in costs}
+        futures = {
+            cat: pool.submit(_price, cat, costs[cat], self.pricing_time_limit)
+            for cat in costs
+        }
+        return {cat: future.result() for cat, future in futures.items()}
+
+    def _generate(
+        self,
+        pool: Optional[Executor],
+        metrics: SolveMetrics,
+        time_limit: Optional[float],
+    ) -> None:
+        solver = self.solver
+        # Initial patterns: any feasible one, and one leaning toward the targets
+        targets = np.array([solver.muscle_targets[m] for m in Muscle], dtype=float)
+        for prices in (np.zeros(solver.M), -targets):
+            with metrics.span("pricing"):
+                priced = self._price_all(
+                    pool, {cat: self.exercise_costs(cat, prices) for cat in DayCategory}
+                )
+            for cat, (pattern, _, _) in priced.items():
+                if pattern is None:
+                    return  # a category block is infeasible: so is the whole model
+                self.columns[cat].append(pattern)
+
+        stalled, best_bound = 0, -float("inf")
+        for self.rounds in range(1, self.max_rounds + 1):
+            with metrics.span("master"):
+                value, prices, convexity = self._solve_master()
+            if self.rounds % INTEGER_MASTER_EVERY == 1:
+                self._update_upper_bound(metrics)
+
+            with metrics.span("pricing"):
+                priced = self._price_all(
+                    pool, {cat: self.exercise_costs(cat, -prices) for cat in DayCategory}
+                )
+            reduced = {cat: cost - convexity[cat] for cat, (_, cost, _) in priced.items()}
+            if all(exact for _, _, exact in priced.values()):
+                self.lower_bound = max(
+                    self.lower_bound, value + sum(min(rc, 0.0) for rc in reduced.values())
+                )
+            if self.gap <= self.gap_tolerance:
+                return
+            if best_bound == -float("inf") or (
+                self.lower_bound > best_bound + STALL_IMPROVEMENT * max(abs(best_bound), 1.0)
+            ):
+                stalled, best_bound = 0, self.lower_bound
+            else:
+                stalled += 1
+                if self.stall_rounds and stalled >= self.stall_rounds:
+                    self.stalled = True
+                    break
+
+            added = False
+            for cat, (pattern, _, _) in priced.items():
+                if pattern is not None and reduced[cat] < -1e-9:
+                    self.columns[cat].append(pattern)
+                    added = True
+            if not added:
+                break  # master LP optimal: the bound can't improve further
+        self._update_upper_bound(metrics)
+        if self.gap > self.gap_tolerance and not self.stalled:
+            # A stalled lower bound can't certify the restricted plan either:
+            # leave it to the fallback
+            self._restricted_upper_bound(metrics, time_limit)
+
+    def _update_upper_bound(self, metrics: SolveMetrics) -> None:
+        with metrics.span("master"):
+            choice, upper = self._solve_master_integer()
+        if upper < self.upper_bound:
+            self.upper_bound, self.best = upper, choice
+
+    def _restricted_upper_bound(
+        self, metrics: SolveMetrics, time_limit: Optional[float]
+    ) -> None:
+        """
+        Solve the monolithic model with only the exercises and pairs of the
+        generated patterns, which recombines them across patterns
+        """
+        solver = self.solver
+        model = solver.build_coverage_model()
+        for cat, patterns in self.columns.items():
+            used_counts = {e for pattern in patterns for e in pattern.counts}
+            used_pairs = {pair for pattern in patterns for pair in pattern.pairs}
+            for e, var in model.c[cat].items():
+                if e not in used_counts:
+                    var.upBound = 0
+            for pair, var in model.p[cat].items():
+                if pair not in used_pairs:
+                    var.upBound = 0
+        with metrics.span("restricted"):
+            model.prob.solve(make_solver(solver.solver_settings, time_limit))
+        if pulp.LpStatus[model.prob.status] not in ("Optimal", "Feasible"):
+            return
+        upper = safe_value(model.prob.objective)
+        if upper < self.upper_bound:
+            self.upper_bound = upper
+            self.best = {
+                cat: read_pattern(solver, cat, model.c[cat], model.p[cat])
+                for cat in DayCategory
+            }
+
+    def _build_master(
+        self, integer: bool
+    ) -> Tuple[pulp.LpProblem, Dict[DayCategory, List[pulp.LpVariable]]]:
+        solver = self.solver
+        prob = pulp.LpProblem("coverage_master", pulp.LpMinimize)
+        lam = {
+            cat: [
+                pulp.LpVariable(
+                    f"lam_{cat.name.lower()}_{k}",
+                    lowBound=0,
+                    upBound=1,
+                    cat="Binary" if integer else "Continuous",
+                )
+                for k in range(len(patterns))
+            ]
+            for cat, patterns in self.columns.items()
+        }
+        for cat, choices in lam.items():
+            prob += pulp.lpSum(choices) == 1, f"convexity_{cat.name.lower()}"
+
+        max_over = pulp.LpVariable("max_overshoot_slack", lowBound=0)
+        max_under = pulp.LpVariable("max_undershoot_slack", lowBound=0)
+        over, under = [], []
+        for m in self.muscles:
+            m_idx = MUSCLE_INDEX[m]
+            coverage = pulp.LpAffineExpression(
+                [
+                    (var, float(pattern.coverage[m_idx]))
+                    for cat, patterns in self.columns.items()
+                    for var, pattern in zip(lam[cat], patterns)
+                ]
+            )
+            o = pulp.LpVariable(f"over_abs_{m.name}", lowBound=0)
+            u = pulp.LpVariable(f"under_abs_{m.name}", lowBound=0)
+            target = solver.muscle_targets[m]
+            prob += coverage - o <= target, f"over_dev_{m.name}"
+            prob += coverage + u >= target, f"under_dev_{m.name}"
+            prob += max_over >= o, f"max_over_{m.name}"
+            prob += max_under >= u, f"max_under_{m.name}"
+            over.append(o)
+            under.append(u)
+
+        mult = solver.undershoot_weight_multiplier
+        prob.setObjective(
+            solver.deviation_sum_weight * (pulp.lpSum(over) + mult * pulp.lpSum(under))
+            + max_over
+            + mult * max_under
+        )
+        return prob, lam
+
+    def _solve_master(self) -> Tuple[float, np.ndarray, Dict[DayCategory, float]]:
+        """Master LP: (value, muscle prices from the deviation duals, convexity duals)"""
+        prob, _ = self._build_master(integer=False)
+        prob.solve(make_solver(self.solver.solver_settings))
+        prices = np.zeros(self.solver.M)
+        for m in self.muscles:
+            constraints = prob.constraints
+            prices[MUSCLE_INDEX[m]] = (
+                constraints[f"over_dev_{m.name}"].pi + constraints[f"under_dev_{m.name}"].pi
+            )
+        convexity = {
+            cat: prob.constraints[f"convexity_{cat.name.lower()}"].pi for cat in DayCategory
+        }
+        return safe_value(prob.objective), prices, convexity
+
+    def _solve_master_integer(
+        self,
+    ) -> Tuple[Optional[Dict[DayCategory, CategoryPattern]], float]:
+        """Best plan made of the generated patterns (one per category) and its objective"""
+        prob, lam = self._build_master(integer=True)
+        prob.solve(make_solver(self.solver.solver_settings))
+        if pulp.LpStatus[prob.status] != "Optimal":
+            return None, float("inf")
+        choice = {
+            cat: next(
+                pattern
+                for var, pattern in zip(lam[cat], self.columns[cat])
+                if safe_value(var) > 0.5
+            )
+            for cat in DayCategory
+        }
+        return choice, safe_value(prob.objective)
+
+    def plan_result(self, plan: Dict[DayCategory, CategoryPattern]) -> CoverageResult:
+        """CoverageResult of one pattern per category"""
+        solver = self.solver
+        names = solver.exercise_names
+        sets_per_muscle = np.zeros(solver.M)
+        for pattern in plan.values():
+            sets_per_muscle += pattern.coverage
+        over = {
+            m: max(0.0, sets_per_muscle[MUSCLE_INDEX[m]] - solver.muscle_targets[m])
+            for m in self.muscles
+        }
+        under = {
+            m: max(0.0, solver.muscle_targets[m] - sets_per_muscle[MUSCLE_INDEX[m]])
+            for m in self.muscles
+        }
+        sum_over, sum_under = sum(over.values()), sum(under.values())
+        max_over = max(over.values(), default=0.0)
+        max_under = max(under.values(), default=0.0)
+        mult = solver.undershoot_weight_multiplier
+        proven = self.gap <= 1e-9
+        return CoverageResult(
+            "Optimal" if proven else "Feasible",
+            {
+                cat: {names[e]: count for e, count in sorted(plan[cat].counts.items())}
+                for cat in DayCategory
+            },
+            {
+                cat: [
+                    (names[i], names[j])
+                    for (i, j), q in sorted(plan[cat].pairs.items())
+                    for _ in range(q)
+                ]
+                for cat in DayCategory
+            },
+            {m: float(sets_per_muscle[m_idx]) for m_idx, m in enumerate(Muscle)},
+            sum_over,
+            sum_under,
+            max_over,
+            max_under,
+            max_over + mult * max_under
+            + solver.deviation_sum_weight * (sum_over + mult * sum_under),
+            proven,
+            self.gap,
+        )
@@ -0,0 +1,710 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from backends import make_solver
+from benchmark import print_rows, synthetic_config, write_rows
+from decompose import CoverageDecomposition
+from joint import JointSolver, total_overlap
+from periodize import PeriodizedPlanner, WeekSpec
+from preview import preview_coverage
+from shared import SharedCatalog
+from snapshot import ConfigError, compile_config, load_snapshot, validate_config
+from solve import (
+    ACTIVATION_FLOOR,
+    AssignmentResult,
+    CoverageResult,
+    DayCategory,
+    Equipment,
+    Muscle,
+    PlanSolver,
+    load_config,
+)
+
+TOLERANCE = 1e-6  # relative objective difference of paths solving the same model
+CATALOGS = ("random", "perturbed")
+
+
+# -----------------------
+# Synthetic catalogs
+# -----------------------
+def random_config(
+    size: int,
+    seed: int = 0,
+    days: Optional[int] = None,
+    pairs_per_day: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    A valid config of `size` random exercises built from the Muscle, Equipment
+    and DayCategory enums alone. Every exercise gets a category (round robin,
+    sometimes a second one), 1-5 muscles (one primary at 0.5-1.0, some below
+    ACTIVATION_FLOOR), up to two pieces of equipment and a usage limit of 1-4.
+    Targets, weights, threshold and sets per instance are drawn too; days and
+    pairs per day per category are drawn unless given, and usage limits are
+    raised where a category could not fill its days (see validate_config).
+    """
+    categories = list(DayCategory)
+    if size < 2 * len(categories):
+        raise ValueError(f"Need at least {2 * len(categories)} exercises, got {size}")
+    rng = random.Random(seed)
+    muscles = [m.name for m in Muscle]
+    equipment = [eq.name for eq in Equipment]
+    per_category = size // len(categories)
+
+    days_per_category = {cat.name: days or rng.randint(1, 3) for cat in categories}
+    supersets_per_day = {
+        cat.name: min(pairs_per_day or rng.randint(1, 3), max(1, per_category // 2))
+        for cat in categories
+    }
+
+    exercises: Dict[str, Any] = {}
+    for k in range(size):
+        cats = [categories[k % len(categories)].name]
+        if rng.random() < 0.25:
+            extra = rng.choice(categories).name
+            if extra not in cats:
+                cats.append(extra)
+        trained = rng.sample(muscles, rng.randint(1, 5))
+        activations = {trained[0]: round(rng.uniform(0.5, 1.0), 2)}
+        for muscle in trained[1:]:
+            low = rng.random() < 0.1
+            activations[muscle] = 0.05 if low else round(rng.uniform(0.1, 0.6), 2)
+        uses = [] if rng.random() < 0.3 else rng.sample(equipment, rng.choice((1, 1, 2)))
+        exercises[f"Synthetic {k}"] = {
+            "categories": cats,
+            "activations": activations,
+            "equipments": uses,
+            "usage_limit_per_category": rng.randint(1, 4),
+        }
+
+    for cat, cat_days in days_per_category.items():
+        eligible = [data for data in exercises.values() if cat in data["categories"]]
+        missing = 2 * cat_days * supersets_per_day[cat] - sum(
+            min(cat_days, data["usage_limit_per_category"]) for data in eligible
+        )
+        for data in eligible:
+            if missing <= 0:
+                break
+            raised = max(data["usage_limit_per_category"], cat_days)
+            missing -= min(cat_days, raised) - min(cat_days, data["usage_limit_per_category"])
+            data["usage_limit_per_category"] = raised
+
+    config = {
+        "sets_per_instance": {cat.name: rng.choice((2.0, 2.5, 3.0, 3.5)) for cat in categories},
+        "threshold": round(rng.uniform(0.05, 0.6), 2),
+        "deviation_sum_weight": round(rng.uniform(0.05, 0.5), 2),
+        "undershoot_weight_multiplier": rng.choice((1.0, 2.0, 3.0)),
+        "solver": {"backend": "highs", "threads": 1, "time_limit": None, "gap_rel": None, "gap_abs": None},
+        "supersets_per_day": supersets_per_day,
+        "days_per_category": days_per_category,
+        "muscle_targets": {
+            m: 0.0 if rng.random() < 0.2 else round(rng.uniform(0.5, 8.0) * 2) / 2
+            for m in muscles
+        },
+        "exercises": exercises,
+    }
+    validate_config(config)
+    return config
+
+
+def case_config(
+    catalog: str,
+    size: int,
+    seed: int,
+    days: Optional[int] = None,
+    pairs_per_day: Optional[int] = None,
+    base: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """A 'random' catalog, or a 'perturbed' copy of base (benchmark.synthetic_config)"""
+    if catalog == "random":
+        return random_config(size, seed, days, pairs_per_day)
+    if catalog == "perturbed":
+        if base is None:
+            raise ValueError("A perturbed catalog needs a base config")
+        return synthetic_config(base, size, days or 3, pairs_per_day or 2, seed)
+    raise ValueError(f"Unknown catalog {catalog!r}, expected one of {CATALOGS}")
+
+
+# -----------------------
+# Reference checks (plain Python over the raw config)
+# -----------------------
+class Catalog:
+    """
+    The exercises of a raw config as plain sets and dicts, independent of the
+    array tables the solver uses: the reference for pairs and feasibility.
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.config = config
+        self.names = list(config["exercises"])
+        self.categories: Dict[str, Set[str]] = {}
+        self.equipment: Dict[str, Set[str]] = {}
+        self.activations: Dict[str, Dict[str, float]] = {}
+        for name, data in config["exercises"].items():
+            self.categories[name] = set(data["categories"])
+            self.equipment[name] = set(data["equipments"] or [])
+            self.activations[name] = {
+                m: float(val) for m, val in data["activations"].items() if val >= ACTIVATION_FLOOR
+            }
+
+    def overlap(self, a: str, b: str) -> float:
+        acts = self.activations[b]
+        return sum(val * acts.get(m, 0.0) for m, val in self.activations[a].items())
+
+    def compatible(self, a: str, b: str, cat: str) -> bool:
+        return (
+            cat in self.categories[a]
+            and cat in self.categories[b]
+            and not self.equipment[a] & self.equipment[b]
+            and self.overlap(a, b) <= self.config["threshold"] + 1e-9
+        )
+
+    def compatible_pairs(self) -> Dict[DayCategory, Set[Tuple[str, str]]]:
+        """Allowed pairs per category by the pairwise definition (O(E^2) in Python)"""
+        pairs: Dict[DayCategory, Set[Tuple[str, str]]] = {cat: set() for cat in DayCategory}
+        for i, a in enumerate(self.names):
+            for b in self.names[i:]:
+                for cat in self.categories[a] & self.categories[b]:
+                    if self.compatible(a, b, cat):
+                        pairs[DayCategory[cat]].add((a, b))
+        return pairs
+
+    def coverage(self, result: CoverageResult) -> Dict[str, float]:
+        sets = self.config["sets_per_instance"]
+        coverage = {m.name: 0.0 for m in Muscle}
+        for cat, counts in result.counts_dict.items():
+            for name, count in counts.items():
+                for m, val in self.activations[name].items():
+                    coverage[m] += sets[cat.name] * count * val
+        return coverage
+
+    def objective(self, result: CoverageResult) -> float:
+        """The coverage objective of a plan's counts, from its deviations"""
+        config = self.config
+        coverage = self.coverage(result)
+        over, under = [], []
+        for m, target in config["muscle_targets"].items():
+            if target > 0:
+                over.append(max(0.0, coverage[m] - target))
+                under.append(max(0.0, target - coverage[m]))
+        mult = config["undershoot_weight_multiplier"]
+        return (
+            config["deviation_sum_weight"] * (sum(over) + mult * sum(under))
+            + max(over, default=0.0)
+            + mult * max(under, default=0.0)
+        )
+
+    def day_overlap(self, pairs: Sequence[Tuple[str, str]]) -> float:
+        """Overlap between every two pairs of a day (their summed activations)"""
+        loads = []
+        for a, b in pairs:
+            load = dict(self.activations[a])
+            for m, val in self.activations[b].items():
+                load[m] = load.get(m, 0.0) + val
+            loads.append(load)
+        return sum(
+            sum(val * loads[y].get(m, 0.0) for m, val in loads[x].items())
+            for x in range(len(loads))
+            for y in range(x + 1, len(loads))
+        )
+
+    def plan_violations(self, result: CoverageResult) -> List[str]:
+        """
+        Every broken coverage constraint of a plan: category eligibility, usage
+        limits, instance and pair totals, equipment conflicts, the overlap
+        threshold, the repeats cap of a pair, counts matching the pairs, and a
+        reported objective below (or, when proven optimal, off) the recomputed one
+        """
+        config = self.config
+        problems: List[str] = []
+        for cat in DayCategory:
+            name = cat.name
+            days = config["days_per_category"][name]
+            supersets = days * config["supersets_per_day"][name]
+            counts = result.counts_dict.get(cat, {})
+            pairs = result.pairs_dict.get(cat, [])
+            for ex, count in counts.items():
+                if name not in self.categories[ex]:
+                    problems.append(f"{name}: {ex} is not eligible")
+                limit = min(days, config["exercises"][ex]["usage_limit_per_category"])
+                if count > limit:
+                    problems.append(f"{name}: {ex} used {count} times, limit {limit}")
+            if sum(counts.values()) != 2 * supersets:
+                problems.append(f"{name}: {sum(counts.values())} instances, expected {2 * supersets}")
+            if len(pairs) != supersets:
+                problems.append(f"{name}: {len(pairs)} pairs, expected {supersets}")
+            for (a, b), repeats in Counter(pairs).items():
+                if self.equipment[a] & self.equipment[b]:
+                    problems.append(f"{name}: {a} + {b} share equipment")
+                if self.overlap(a, b) > config["threshold"] + 1e-9:
+                    problems.append(f"{name}: {a} + {b} overlap {self.overlap(a, b):.3f}")
+                if repeats > min(supersets, 3):
+                    problems.append(f"{name}: {a} + {b} repeated {repeats} times")
+            used = Counter(ex for pair in pairs for ex in pair)
+            if used != Counter({ex: count for ex, count in counts.items() if count}):
+                problems.append(f"{name}: counts do not match the pairs")
+
+        recomputed = self.objective(result)
+        tolerance = TOLERANCE * max(1.0, abs(recomputed))
+        reported = result.objective_value
+        if reported < recomputed - tolerance or (
+            result.proven_optimal and reported > recomputed + tolerance
+        ):
+            problems.append(f"objective {reported:.6f} reported, {recomputed:.6f} recomputed")
+        return problems
+
+    def assignment_violations(
+        self, result: CoverageResult, days: Dict[DayCategory, AssignmentResult]
+    ) -> List[str]:
+        """
+        Every broken day-assignment constraint: the category's days, pairs per
+        day, the days holding exactly the plan's pairs, and the reported overlap
+        """
+        config = self.config
+        problems: List[str] = []
+        for cat, pairs in result.pairs_dict.items():
+            if not pairs:
+                continue
+            name = cat.name
+            assignment = days.get(cat)
+            if assignment is None or not assignment.feasible:
+                problems.append(f"{name}: no day assignment")
+                continue
+            if len(assignment.assignments) != config["days_per_category"][name]:
+                problems.append(f"{name}: {len(assignment.assignments)} days")
+            for label, day in assignment.assignments.items():
+                if len(day) != config["supersets_per_day"][name]:
+                    problems.append(f"{name} {label}: {len(day)} pairs")
+            assigned = Counter(pair for day in assignment.assignments.values() for pair in day)
+            if assigned != Counter(pairs):
+                problems.append(f"{name}: the days do not hold the plan's pairs")
+            recomputed = sum(self.day_overlap(day) for day in assignment.assignments.values())
+            tolerance = TOLERANCE * max(1.0, recomputed)
+            reported = assignment.total_overlap
+            if reported < recomputed - tolerance or (
+                assignment.proven_optimal and reported > recomputed + tolerance
+            ):
+                problems.append(
+                    f"{name}: overlap {reported:.6f} reported, {recomputed:.6f} recomputed"
+                )
+        return problems
+
+
+# -----------------------
+# Differential checks
+# -----------------------
+@dataclass
+class Reference:
+    """
+    The reference path of one case: the coverage ILP without presolve and the
+    linearized day-assignment ILP, with their wall times, and the settings
+    the checks share.
+
+    build_s: PlanSolver construction from the raw config
+    max_gap: Allowed relative gap of heuristic paths to a proven optimum
+    overlap_weight: Weight of the same-day overlap in the joint check
+    """
+
+    solver: PlanSolver
+    catalog: Catalog
+    build_s: float
+    coverage: CoverageResult
+    coverage_s: float
+    days: Dict[DayCategory, AssignmentResult]
+    days_s: float
+    time_limit: Optional[float]
+    max_gap: float
+    overlap_weight: float
+
+
+def _row(
+    check: str,
+    path: str,
+    objective: Optional[float],
+    reference: Optional[float],
+    wall_s: float,
+    reference_s: float,
+    violations: List[str],
+    gap_range: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    """
+    One result row. A path passes if its plan has no violations and its gap to
+    the reference (relative to max(1, |reference|)) is within gap_range (None:
+    not compared, e.g. when either side is not proven optimal). A path without
+    a plan passes only if the reference has none either.
+    """
+    gap = None
+    if objective is not None and reference is not None:
+        gap = (objective - reference) / max(1.0, abs(reference))
+    if objective is None and reference is not None:
+        violations = violations + ["no plan, the reference has one"]
+    elif objective is not None and reference is None:
+        violations = violations + ["plan found, the reference has none"]
+    ok = not violations
+    if gap is not None and gap_range is not None:
+        ok = ok and gap_range[0] <= gap <= gap_range[1]
+    return {
+        "check": check,
+        "path": path,
+        "objective": objective,
+        "reference": reference,
+        "gap": gap,
+        "wall_s": wall_s,
+        "reference_s": reference_s,
+        "speedup": reference_s / wall_s if wall_s > 0 else None,
+        "ok": ok,
+        "violations": "; ".join(violations[:3]),
+    }
+
+
+def _objective(result: CoverageResult) -> Optional[float]:
+    return result.objective_value if result.feasible else None
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def _same(*proven: bool) -> Optional[Tuple[float, float]]:
+    """Gap range of two solves of one model: equal when both are proven optimal"""
+    return (-TOLERANCE, TOLERANCE) if all(proven) else None
+
+
+def check_pairs(ref: Reference) -> List[Dict[str, Any]]:
+    """The vectorized compatible pairs against the pairwise definition"""
+    expected, reference_s = _timed(ref.catalog.compatible_pairs)
+    solver = ref.solver
+    pairs, wall_s = _timed(lambda: solver.table.compatible_pairs(solver.threshold))
+    names = solver.exercise_names
+    violations = []
+    for cat in DayCategory:
+        found = {(names[i], names[j]) for i, j in pairs[cat]}
+        if found != expected[cat]:
+            violations.append(
+                f"{cat.name}: {len(found - expected[cat])} extra, "
+                f"{len(expected[cat] - found)} missing pairs"
+            )
+    total = float(sum(len(p) for p in expected.values()))
+    return [_row("pairs", "table", total, total, wall_s, reference_s, violations)]
+
+
+def _coverage_row(
+    ref: Reference,
+    path: str,
+    result: CoverageResult,
+    wall_s: float,
+    gap_range: Optional[Tuple[float, float]],
+    violations: Optional[List[str]] = None,
+    check: str = "coverage",
+    reference_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    violations = list(violations or [])
+    if result.feasible:
+        violations.extend(ref.catalog.plan_violations(result))
+    return _row(
+        check,
+        path,
+        _objective(result),
+        _objective(ref.coverage),
+        wall_s,
+        ref.coverage_s if reference_s is None else reference_s,
+        violations,
+        gap_range,
+    )
+
+
+def check_presolve(ref: Reference) -> List[Dict[str, Any]]:
+    """The presolved coverage model (solve_coverage) against the full model"""
+    result, wall_s = _timed(lambda: ref.solver.solve_coverage(ref.time_limit, use_cache=False))
+    gap_range = _same(ref.coverage.proven_optimal, result.proven_optimal)
+    return [_coverage_row(ref, "presolve", result, wall_s, gap_range)]
+
+
+def check_decomposition(ref: Reference) -> List[Dict[str, Any]]:
+    """Column generation (pricing in this process) against the full model"""
+    decomposition = CoverageDecomposition(ref.solver, workers=0)
+    result, wall_s = _timed(lambda: decomposition.solve(ref.time_limit))
+    gap_range = None
+    if ref.coverage.proven_optimal:
+        # Within the decomposition's own gap tolerance (exact after a fallback)
+        gap_range = (-TOLERANCE, max(TOLERANCE, decomposition.gap_tolerance))
+    return [_coverage_row(ref, "decomposition", result, wall_s, gap_range)]
+
+
+def check_preview(ref: Reference) -> List[Dict[str, Any]]:
+    """
+    The LP preview: its bound at most the optimum, and its repaired plan
+    feasible and within max_gap (failing to round at all is not an error)
+    """
+    preview, wall_s = _timed(lambda: preview_coverage(ref.solver, method="lp", repair=True))
+    reference = _objective(ref.coverage)
+    violations = []
+    bound = preview.lower_bound
+    if bound is not None and reference is not None and bound > reference + TOLERANCE * max(1.0, reference):
+        violations.append(f"lower bound {bound:.6f} above the optimum")
+    plan = preview.plan
+    if plan is None or not plan.feasible:
+        row = _row("coverage", "preview", None, None, wall_s, ref.coverage_s, violations)
+        row["reference"] = reference
+        return [row]
+    gap_range = (-TOLERANCE, ref.max_gap) if ref.coverage.proven_optimal else None
+    return [_coverage_row(ref, "preview", plan, wall_s, gap_range, violations)]
+
+
+def _check_load(ref: Reference, path: str, load: Callable[[], PlanSolver], setup_s: float) -> Dict[str, Any]:
+    """Solve with a solver loaded another way; timed: setup_s plus the load against building one"""
+    solver, load_s = _timed(load)
+    result = solver.solve_coverage(ref.time_limit, use_cache=False)
+    violations = []
+    if solver.compatible_pairs != ref.solver.compatible_pairs:
+        violations.append("compatible pairs differ")
+    gap_range = _same(ref.coverage.proven_optimal, result.proven_optimal)
+    return _coverage_row(
+        ref, path, result, setup_s + load_s, gap_range, violations, "load", ref.build_s
+    )
+
+
+def check_snapshot(ref: Reference) -> List[Dict[str, Any]]:
+    """A compiled .npz snapshot against building from the config"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "case.npz")
+        try:
+            compile_config(ref.solver.config, path)
+        except ConfigError as exc:
+            # Compiling refuses a category without compatible pairs: fine if
+            # the reference has no plan either
+            row = _row("load", "snapshot", None, _objective(ref.coverage), 0.0, ref.build_s, [])
+            row["violations"] = str(exc)
+            return [row]
+        return [_check_load(ref, "snapshot", lambda: load_snapshot(path), 0.0)]
+
+
+def check_shared(ref: Reference) -> List[Dict[str, Any]]:
+    """A solver attached to a shared block (timed: creating and attaching) against building one"""
+    catalog, create_s = _timed(lambda: SharedCatalog(ref.solver))
+    with catalog:
+        return [_check_load(ref, "shared", catalog.solver, create_s)]
+
+
+def check_assignment(ref: Reference) -> List[Dict[str, Any]]:
+    """The compact day-assignment ILP, and the heuristic within max_gap, against the linearized ILP"""
+    if not ref.coverage.feasible:
+        return []
+    reference = total_overlap(ref.days)
+    reference_proven = all(day.proven_optimal for day in ref.days.values())
+    rows = []
+    for method in ("exact", "heuristic"):
+        days, wall_s = _timed(
+            lambda: ref.solver.assign_days(
+                ref.coverage, method=method, time_limit=ref.time_limit, use_cache=False
+            )
+        )
+        if method == "exact":
+            path = "compact"
+            gap_range = _same(reference_proven, *(day.proven_optimal for day in days.values()))
+        else:
+            path = "heuristic"
+            gap_range = (-TOLERANCE, ref.max_gap) if reference_proven else None
+        violations = ref.catalog.assignment_violations(ref.coverage, days)
+        rows.append(
+            _row("assignment", path, total_overlap(days), reference, wall_s, ref.days_s, violations, gap_range)
+        )
+    return rows
+
+
+def check_joint(ref: Reference) -> List[Dict[str, Any]]:
+    """
+    The joint model against the two-stage plan on the combined objective: never
+    worse (it is warm-started from that plan), and consistent with its own plan
+    """
+    if not ref.coverage.feasible:
+        return []
+    weight = ref.overlap_weight
+    reference = ref.coverage.objective_value + weight * total_overlap(ref.days)
+    result, wall_s = _timed(lambda: JointSolver(ref.solver, weight).solve(ref.time_limit))
+    violations = ref.catalog.plan_violations(result.coverage) + ref.catalog.assignment_violations(
+        result.coverage, result.days
+    )
+    recomputed = ref.catalog.objective(result.coverage) + weight * total_overlap(result.days)
+    if abs(recomputed - result.objective_value) > TOLERANCE * max(1.0, recomputed):
+        violations.append(f"objective {result.objective_value:.6f} reported, {recomputed:.6f} recomputed")
+    # Improving on the two-stage plan is the point; only worse fails
+    gap_range = (-float("inf"), TOLERANCE)
+    return [
+        _row(
+            "joint",
+            "joint",
+            result.objective_value,
+            reference,
+            wall_s,
+            ref.coverage_s + ref.days_s,
+            violations,
+            gap_range,
+        )
+    ]
+
+
+def check_periodize(ref: Reference, weeks: int = 3, min_new: int = 1) -> List[Dict[str, Any]]:
+    """
+    A warm-started program of unchanged weeks with a novelty constraint: the
+    first week equal to the reference, later weeks feasible, never better than
+    it and using min_new new positions (unless the week had to be relaxed)
+    """
+    if not ref.coverage.feasible:
+        return []
+    planner = PeriodizedPlanner(ref.solver, min_new_exercises=min_new, time_limit=ref.time_limit)
+    rows = []
+    for w in range(weeks):
+        week = planner.plan_week(WeekSpec())
+        violations = []
+        if w and not week.relaxed and week.new_exercises < min_new:
+            violations.append(f"{week.new_exercises} new positions, expected {min_new}")
+        if w == 0:
+            gap_range = _same(ref.coverage.proven_optimal, week.coverage.proven_optimal)
+        else:
+            gap_range = (-TOLERANCE, float("inf")) if ref.coverage.proven_optimal else None
+        rows.append(
+            _coverage_row(ref, f"week {w + 1}", week.coverage, week.wall_s, gap_range, violations, "periodize")
+        )
+    return rows
+
+
+CHECKS: Dict[str, Callable[[Reference], List[Dict[str, Any]]]] = {
+    "pairs": check_pairs,
+    "presolve": check_presolve,
+    "decomposition": check_decomposition,
+    "preview": check_preview,
+    "snapshot": check_snapshot,
+    "shared": check_shared,
+    "assignment": check_assignment,
+    "joint": check_joint,
+    "periodize": check_periodize,
+}
+
+
+def solve_reference(
+    config: Dict[str, Any],
+    time_limit: Optional[float] = 60.0,
+    max_gap: float = 0.25,
+    overlap_weight: float = 0.1,
+) -> Reference:
+    """Build the solver and solve the reference path of one config"""
+    solver, build_s = _timed(lambda: PlanSolver(config))
+    start = time.perf_counter()
+    model = solver.build_coverage_model(presolve=False)
+    solver.run_coverage_solver(model, make_solver(solver.solver_settings, time_limit))
+    coverage = solver.extract_coverage(model)
+    coverage_s = time.perf_counter() - start
+    days: Dict[DayCategory, AssignmentResult] = {}
+    days_s = 0.0
+    if coverage.feasible:
+        days, days_s = _timed(
+            lambda: solver.assign_days(coverage, "linearized", time_limit=time_limit, use_cache=False)
+        )
+    return Reference(
+        solver, Catalog(config), build_s, coverage, coverage_s, days, days_s, time_limit, max_gap, overlap_weight
+    )
+
+
+def run_case(
+    config: Dict[str, Any],
+    checks: Iterable[str] = tuple(CHECKS),
+    time_limit: Optional[float] = 60.0,
+    max_gap: float = 0.25,
+    overlap_weight: float = 0.1,
+) -> List[Dict[str, Any]]:
+    """
+    Solve the reference path of a config, then run each check against it. The
+    first row checks the reference plan itself (feasibility and objective).
+    """
+    ref = solve_reference(config, time_limit, max_gap, overlap_weight)
+    violations = []
+    if ref.coverage.feasible:
+        violations = ref.catalog.plan_violations(ref.coverage) + ref.catalog.assignment_violations(
+            ref.coverage, ref.days
+        )
+    objective = _objective(ref.coverage)
+    rows = [_row("coverage", "reference", objective, objective, ref.coverage_s, ref.coverage_s, violations)]
+    for check in checks:
+        rows.extend(CHECKS[check](ref))
+    return rows
+
+
+def run_differential(
+    sizes: Sequence[int],
+    seeds: Sequence[int],
+    catalog: str = "random",
+    checks: Iterable[str] = tuple(CHECKS),
+    time_limit: Optional[float] = 60.0,
+    max_gap: float = 0.25,
+    days: Optional[int] = None,
+    pairs_per_day: Optional[int] = None,
+    base: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """run_case over a generated config per size and seed (rows prefixed with both)"""
+    checks = list(checks)
+    unknown = [check for check in checks if check not in CHECKS]
+    if unknown:
+        raise ValueError(f"Unknown checks {unknown}, expected some of {list(CHECKS)}")
+    rows: List[Dict[str, Any]] = []
+    for size in sizes:
+        for seed in seeds:
+            config = case_config(catalog, size, seed, days, pairs_per_day, base)
+            for row in run_case(config, checks, time_limit, max_gap):
+                rows.append({"exercises": size, "seed": seed, **row})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run the optimized solver paths against the reference on synthetic catalogs"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 40])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--catalog", default="random", choices=CATALOGS)
+    parser.add_argument("--config", default="config.json", help="base config of a perturbed catalog")
+    parser.add_argument("--checks", nargs="+", default=list(CHECKS), choices=list(CHECKS))
+    parser.add_argument("--days", type=int, default=None, help="days per category (default: random)")
+    parser.add_argument("--pairs-per-day", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds per solve")
+    parser.add_argument(
+        "--max-gap", type=float, default=0.25, help="allowed relative gap of heuristic paths"
+    )
+    parser.add_argument("--all", action="store_true", help="print every row, not only failures")
+    parser.add_argument("--out", default=None, help="also write all rows to .csv or .json")
+    args = parser.parse_args()
+
+    base = load_config(args.config) if args.catalog == "perturbed" else None
+    start = time.perf_counter()
+    rows = run_differential(
+        args.sizes,
+        args.seeds,
+        args.catalog,
+        args.checks,
+        args.time_limit,
+        args.max_gap,
+        args.days,
+        args.pairs_per_day,
+        base,
+    )
+    wall_s = time.perf_counter() - start
+
+    failed = [row for row in rows if not row["ok"]]
+    print_rows(rows if args.all else failed)
+    if args.out:
+        write_rows(rows, args.out)
+    print(f"{len(rows)} checks, {len(failed)} failed, in {wall_s:.1f} s", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import math
+import random
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# -----------------------
+# Day assignment on a pair-overlap matrix
+# -----------------------
+# D is the P x P overlap between pairs (symmetric, non-negative; the diagonal
+# is ignored) and an assignment is an array day_of[p] in range(num_days) with
+# exactly pairs_per_day pairs on every day.
+def assignment_overlap(D: np.ndarray, day_of: np.ndarray) -> float:
+    """Total overlap between pairs sharing a day"""
+    same_day = day_of[:, None] == day_of[None, :]
+    return float(np.triu(D * same_day, k=1).sum())
+
+
+def greedy_assignment(D: np.ndarray, num_days: int, pairs_per_day: int) -> np.ndarray:
+    """
+    Place pairs one at a time, most overlapping first, on the day with free
+    capacity where they add the least overlap.
+    """
+    P = len(D)
+    day_of = np.full(P, -1, dtype=np.int64)
+    load = np.zeros((num_days, P))  # load[d, q]: overlap of q with the pairs on day d
+    size = np.zeros(num_days, dtype=np.int64)
+    for p in np.argsort(-D.sum(axis=1), kind="stable"):
+        cost = np.where(size < pairs_per_day, load[:, p], np.inf)
+        d = int(np.argmin(cost))
+        day_of[p] = d
+        size[d] += 1
+        load[d] += D[p]
+    return day_of
+
+
+def anneal_assignment(
+    D: np.ndarray,
+    day_of: np.ndarray,
+    num_days: int,
+    time_budget: float = 0.05,
+    seed: int = 0,
+    max_iterations: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Improve an assignment by swapping pairs between days (simulated annealing,
+    cooling to pure descent by the end of the budget). Returns the best
+    assignment seen.
+    """
+    P = len(D)
+    if num_days < 2 or P < 2:
+        return day_of.copy()
+    if max_iterations is None:
+        max_iterations = max(2000, 50 * P * P)
+
+    rng = random.Random(seed)
+    day_of = day_of.copy()
+    load = np.zeros((num_days, P))
+    for p in range(P):
+        load[day_of[p]] += D[p]
+
+    current = assignment_overlap(D, day_of)
+    best, best_day_of = current, day_of.copy()
+    positive = D[D > 0]
+    start_temp = 0.1 * float(positive.mean()) if positive.size else 0.0
+
+    start = time.perf_counter()
+    for it in range(max_iterations):
+        if it % 64 == 0:
+            elapsed = time.perf_counter() - start
+            if elapsed >= time_budget:
+                break
+            temp = start_temp * max(0.0, 1.0 - elapsed / time_budget)
+
+        p, q = rng.randrange(P), rng.randrange(P)
+        a, b = int(day_of[p]), int(day_of[q])
+        if a == b:
+            continue
+        delta = load[b, p] - load[a, p] + load[a, q] - load[b, q] - 2 * D[p, q]
+        if delta > 1e-12 and (temp <= 0 or rng.random() >= math.exp(-delta / temp)):
+            continue
+
+        day_of[p], day_of[q] = b, a
+        load[a] += D[q] - D[p]
+        load[b] += D[p] - D[q]
+        current += delta
+        if current < best - 1e-12:
+            best, best_day_of = current, day_of.copy()
+    return best_day_of
+
+
+def heuristic_assignment(
+    D: np.ndarray,
+    num_days: int,
+    pairs_per_day: int,
+    time_budget: float = 0.05,
+    seed: int = 0,
+) -> Tuple[np.ndarray, float]:
+    """Greedy construction followed by annealing; returns (day_of, total overlap)"""
+    D = np.array(D, dtype=float)
+    np.fill_diagonal(D, 0.0)
+    D = np.triu(D, k=1) + np.triu(D, k=1).T
+    day_of = greedy_assignment(D, num_days, pairs_per_day)
+    day_of = anneal_assignment(D, day_of, num_days, time_budget, seed)
+    return day_of, assignment_overlap(D, day_of)
@@ -0,0 +1,139 @@
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+
+import pulp
+
+from backends import make_solver
+from metrics import SolveMetrics
+from solve import (
+    CoverageResult,
+    DayCategory,
+    Muscle,
+    PlanSolver,
+    merge_config,
+)
+
+
+# -----------------------
+# Incremental coverage re-solve
+# -----------------------
+class CoverageSession:
+    """
+    A built coverage model kept alive between small edits.
+
+    Edits change the model in place (right-hand sides, variable bounds, the
+    objective) instead of rebuilding it, and solve() hands the previous
+    solution to the solver as a MIP start. The session works on its own copy of the
+    solver's tunables; the exercise tables are shared.
+    """
+
+    def __init__(self, solver: PlanSolver) -> None:
+        self.solver = solver.with_overrides({})
+        self.model = self.solver.build_coverage_model(presolve=False)
+        self.banned: Dict[DayCategory, Set[int]] = {cat: set() for cat in DayCategory}
+        self.result: Optional[CoverageResult] = None
+        # Deviation slacks of muscles whose target was set to zero
+        self._relaxed: Dict[Muscle, Tuple[pulp.LpVariable, pulp.LpVariable]] = {}
+
+    def solve(self, time_limit: Optional[float] = None) -> CoverageResult:
+        warm_start = self.result is not None
+        if warm_start:
+            # Clip the previous solution into the edited bounds
+            for vars_ in (*self.model.c.values(), *self.model.p.values()):
+                for var in vars_.values():
+                    if var.varValue is not None and var.upBound is not None:
+                        var.setInitialValue(min(round(var.varValue), var.upBound))
+        solver = make_solver(self.solver.solver_settings, time_limit, warm_start)
+        self.model.metrics = SolveMetrics("coverage")
+        self.model.metrics.record_model(self.model.prob)
+        self.solver.run_coverage_solver(self.model, solver)
+        self.result = self.solver.extract_coverage(self.model)
+        self.solver.emit_metrics(self.result.metrics)
+        return self.result
+
+    # -----------------------
+    # Edits
+    # -----------------------
+    def set_target(self, muscle: Union[Muscle, str], sets: float) -> None:
+        """Change one muscle's weekly target (in sets)"""
+        m = Muscle[muscle] if isinstance(muscle, str) else muscle
+        self.solver.muscle_targets[m] = sets
+        self._update_config({"muscle_targets": {m.name: sets}})
+
+        model = self.model
+        constraints = model.prob.constraints
+        if f"over_dev_{m.name}" not in constraints:
+            if sets > 0:
+                self.solver.add_deviation_constraints(model, m)
+                self.solver.set_coverage_objective(model)
+            return
+
+        constraints[f"over_dev_{m.name}"].changeRHS(sets)
+        constraints[f"under_dev_{m.name}"].changeRHS(sets)
+        if sets > 0 and m in self._relaxed:
+            # Re-enable the slacks of a muscle whose target was zeroed earlier
+            over, under = self._relaxed.pop(m)
+            model.overshoot[m], model.undershoot[m] = over, under
+            model.prob += (model.max_overshoot >= over, f"max_over_{m.name}")
+            model.prob += (model.max_undershoot >= under, f"max_under_{m.name}")
+            self.solver.set_coverage_objective(model)
+        elif sets <= 0 and m in model.overshoot:
+            # Zero target: the slacks leave the objective and the max constraints,
+            # which makes the deviation constraints non-binding. They stay in the
+            # model so the slack variables keep appearing in it.
+            self._relaxed[m] = (model.overshoot.pop(m), model.undershoot.pop(m))
+            del constraints[f"max_over_{m.name}"]
+            del constraints[f"max_under_{m.name}"]
+            self.solver.set_coverage_objective(model)
+
+    def ban_exercise(
+        self, name: str, categories: Optional[Iterable[DayCategory]] = None
+    ) -> None:
+        """Forbid an exercise (in all categories by default)"""
+        e = self.solver.exercise_index[name]
+        for cat in categories or DayCategory:
+            self.banned[cat].add(e)
+            self.model.c[cat][e].upBound = 0
+
+    def unban_exercise(
+        self, name: str, categories: Optional[Iterable[DayCategory]] = None
+    ) -> None:
+        """Undo ban_exercise"""
+        e = self.solver.exercise_index[name]
+        for cat in categories or DayCategory:
+            self.banned[cat].discard(e)
+            self.model.c[cat][e].upBound = self.solver.count_upper_bound(cat, e)
+
+    def set_schedule(
+        self,
+        cat: DayCategory,
+        days: Optional[int] = None,
+        pairs_per_day: Optional[int] = None,
+    ) -> None:
+        """Change a category's number of days and/or supersets per day"""
+        solver = self.solver
+        if days is not None:
+            solver.days_per_category[cat] = days
+            self._update_config({"days_per_category": {cat.name: days}})
+        if pairs_per_day is not None:
+            solver.pairs_per_day[cat] = pairs_per_day
+            self._update_config({"supersets_per_day": {cat.name: pairs_per_day}})
+        solver.pairs_per_category[cat] = (
+            solver.pairs_per_day[cat] * solver.days_per_category[cat]
+        )
+        solver.day_requirements[cat] = solver.pairs_per_category[cat] * 2
+
+        constraints = self.model.prob.constraints
+        constraints[f"total_{cat.name.lower()}_instances"].changeRHS(
+            solver.day_requirements[cat]
+        )
+        constraints[f"total_{cat.name.lower()}_pairs"].changeRHS(
+            solver.pairs_per_category[cat]
+        )
+        for e, var in self.model.c[cat].items():
+            if e not in self.banned[cat]:
+                var.upBound = solver.count_upper_bound(cat, e)
+        for var in self.model.p[cat].values():
+            var.upBound = min(solver.pairs_per_category[cat], 3)
+
+    def _update_config(self, overrides: Dict) -> None:
+        self.solver.config = merge_config(self.solver.config, overrides)
@@ -0,0 +1,334 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pulp
+
+from backends import IncumbentHook, make_solver, proven_gap, proven_optimal, solve_statistics
+from metrics import SolveMetrics
+from solve import (
+    AssignmentResult,
+    CoverageModel,
+    CoverageResult,
+    DayAssignments,
+    DayCategory,
+    PlanSolver,
+    safe_value,
+)
+
+Pair = Tuple[int, int]
+
+
+# -----------------------
+# Joint model
+# -----------------------
+@dataclass
+class JointModel:
+    """
+    The coverage ILP extended with day assignments.
+
+    coverage: The coverage model the day variables were added to
+    y: Copies of each pair type per day (y[cat][(i, j)][d]), summing to p
+    day_load: Per category and day, the summed activation vector as linear expressions (one per muscle)
+    """
+
+    coverage: CoverageModel
+    y: Dict[DayCategory, Dict[Pair, List[pulp.LpVariable]]]
+    day_load: Dict[DayCategory, List[Dict[int, pulp.LpAffineExpression]]]
+    metrics: SolveMetrics = field(default_factory=lambda: SolveMetrics("joint"))
+
+
+@dataclass
+class JointResult:
+    """
+    Pairs and days chosen in one model.
+
+    coverage: Coverage result of the chosen pairs
+    days: Day assignment per category (exact overlap)
+    objective_value: Coverage objective + overlap_weight * total same-day overlap
+    two_stage_objective: The same objective for the two-stage plan (the warm start; None without one)
+    proven_optimal / gap: Of the joint solve (over its linearized overlap)
+    used_two_stage: The two-stage plan is returned, as the joint solve found
+        no better one (or none, or had no time left)
+    """
+
+    coverage: CoverageResult
+    days: Dict[DayCategory, AssignmentResult]
+    objective_value: float
+    two_stage_objective: Optional[float] = None
+    proven_optimal: bool = False
+    gap: Optional[float] = None
+    metrics: Optional[SolveMetrics] = None
+    used_two_stage: bool = False
+
+
+def total_overlap(days: Dict[DayCategory, AssignmentResult]) -> float:
+    return sum(assignment.total_overlap for assignment in days.values())
+
+
+class JointSolver:
+    """
+    Pair selection and day assignment in one model: each category's pair
+    counts are split into per-day counts y (days hold exactly pairs_per_day
+    pairs) and the objective adds overlap_weight times the same-day overlap.
+
+    The overlap of a day is 1/2 (|L|^2 - sum_a y_a |v_a|^2), where v_a is the
+    summed activation vector of pair a and L = sum_a y_a v_a the day's load, the
+    same quantity the day-assignment ILP minimizes. |L|^2 is convex, so each
+    muscle's L_m^2 is replaced by a variable above its tangents every
+    tangent_step sets (underestimating by at most tangent_step^2 / 4 per day
+    and muscle); the reported overlap is exact. Days are interchangeable, so
+    they are ordered by a weighted sum of their pair counts.
+
+    With warm_start, the two-stage plan (solve_coverage + assign_days) is
+    solved first and passed as the MIP start; solve() returns it instead of
+    the joint plan when that is worse on the combined objective or missing,
+    so the result is never worse than the two-stage plan. With polish, the
+    joint pairs are re-assigned to days by the exact day-assignment ILP.
+    """
+
+    def __init__(
+        self,
+        solver: PlanSolver,
+        overlap_weight: float = 0.1,
+        tangent_step: float = 0.25,
+        warm_start: bool = True,
+        polish: bool = True,
+    ) -> None:
+        self.solver = solver
+        self.overlap_weight = overlap_weight
+        self.tangent_step = tangent_step
+        self.warm_start = warm_start
+        self.polish = polish
+
+    def pair_vectors(self, pairs: List[Pair]) -> np.ndarray:
+        vec = self.solver.vec
+        return np.array([vec[i] + vec[j] for i, j in pairs]).reshape(-1, self.solver.M)
+
+    def build(self, metrics: Optional[SolveMetrics] = None) -> JointModel:
+        solver = self.solver
+        metrics = metrics or SolveMetrics("joint")
+        coverage = solver.build_coverage_model()
+        prob = coverage.prob
+        overlap_terms: List[pulp.LpAffineExpression] = []
+        y: Dict[DayCategory, Dict[Pair, List[pulp.LpVariable]]] = {}
+        day_load: Dict[DayCategory, List[Dict[int, pulp.LpAffineExpression]]] = {}
+
+        with metrics.span("build"):
+            for cat in DayCategory:
+                tag = cat.name.lower()
+                days, per_day = solver.days_per_category[cat], solver.pairs_per_day[cat]
+                pairs = list(coverage.p[cat])
+                v = self.pair_vectors(pairs)
+                y[cat] = {
+                    pair: [
+                        pulp.LpVariable(
+                            f"y_{tag}_{pair[0]}_{pair[1]}_{d}",
+                            lowBound=0,
+                            upBound=min(coverage.p[cat][pair].upBound, per_day),
+                            cat="Integer",
+                        )
+                        for d in range(days)
+                    ]
+                    for pair in pairs
+                }
+                for pair in pairs:
+                    prob += (
+                        pulp.lpSum(y[cat][pair]) == coverage.p[cat][pair],
+                        f"split_{tag}_{pair[0]}_{pair[1]}",
+                    )
+                for d in range(days):
+                    prob += (
+                        pulp.lpSum(y[cat][pair][d] for pair in pairs) == per_day,
+                        f"day_pairs_{tag}_{d}",
+                    )
+
+                # Days ordered by a weighted pair count
+                for d in range(days - 1):
+                    prob += (
+                        pulp.lpSum(
+                            (a + 1) * (y[cat][pair][d] - y[cat][pair][d + 1])
+                            for a, pair in enumerate(pairs)
+                        )
+                        >= 0,
+                        f"day_order_{tag}_{d}",
+                    )
+
+                day_load[cat] = []
+                for d in range(days):
+                    loads: Dict[int, pulp.LpAffineExpression] = {}
+                    for m in np.flatnonzero(v.any(axis=0)) if len(pairs) else []:
+                        active = np.flatnonzero(v[:, m])
+                        load = pulp.LpAffineExpression(
+                            [(y[cat][pairs[a]][d], float(v[a, m])) for a in active]
+                        )
+                        loads[int(m)] = load
+                        square = pulp.LpVariable(f"sq_{tag}_{d}_{m}", lowBound=0)
+                        top = per_day * float(v[active, m].max())
+                        for k, t in enumerate(np.arange(self.tangent_step, top + 1e-9, self.tangent_step)):
+                            prob += (
+                                square >= 2 * float(t) * load - float(t) ** 2,
+                                f"tangent_{tag}_{d}_{m}_{k}",
+                            )
+                        overlap_terms.append(0.5 * square)
+                    day_load[cat].append(loads)
+                    norms = (v**2).sum(axis=1)
+                    overlap_terms.append(
+                        pulp.LpAffineExpression(
+                            [(y[cat][pair][d], -0.5 * float(norms[a])) for a, pair in enumerate(pairs)]
+                        )
+                    )
+
+            prob.setObjective(prob.objective + self.overlap_weight * pulp.lpSum(overlap_terms))
+        metrics.record_model(prob)
+        return JointModel(coverage, y, day_load, metrics)
+
+    def set_initial(
+        self,
+        model: JointModel,
+        coverage: CoverageResult,
+        days: Dict[DayCategory, AssignmentResult],
+    ) -> None:
+        """Load a two-stage plan as the MIP start of the joint model"""
+        solver = self.solver
+        index = solver.exercise_index
+        for cat in DayCategory:
+            counts = {index[name]: count for name, count in coverage.counts_dict[cat].items()}
+            for e, var in model.coverage.c[cat].items():
+                var.setInitialValue(counts.get(e, 0))
+            per_day: List[Dict[Pair, int]] = []
+            if cat in days:
+                for pairs in days[cat].assignments.values():
+                    day: Dict[Pair, int] = {}
+                    for ex1, ex2 in pairs:
+                        key = tuple(sorted((index[ex1], index[ex2])))
+                        day[key] = day.get(key, 0) + 1
+                    per_day.append(day)
+            order = {pair: a + 1 for a, pair in enumerate(model.y[cat])}
+            per_day.sort(key=lambda day: -sum(order.get(pair, 0) * n for pair, n in day.items()))
+            for pair, var in model.coverage.p[cat].items():
+                var.setInitialValue(sum(day.get(pair, 0) for day in per_day))
+            for pair, vars_ in model.y[cat].items():
+                for d, var in enumerate(vars_):
+                    var.setInitialValue(per_day[d].get(pair, 0) if d < len(per_day) else 0)
+
+    def read_days(self, model: JointModel) -> Dict[DayCategory, DayAssignments]:
+        names = self.solver.exercise_names
+        days: Dict[DayCategory, DayAssignments] = {}
+        for cat, pairs in model.y.items():
+            assignments: DayAssignments = {
+                f"Day {d}": [] for d in range(self.solver.days_per_category[cat])
+            }
+            for (i, j), vars_ in pairs.items():
+                for d, var in enumerate(vars_):
+                    copies = round(safe_value(var))
+                    assignments[f"Day {d}"].extend([(names[i], names[j])] * copies)
+            if any(assignments.values()):
+                days[cat] = assignments
+        return days
+
+    def day_overlap(self, assignments: DayAssignments) -> float:
+        """Exact same-day overlap of an assignment (the day-assignment objective)"""
+        total = 0.0
+        for pairs in assignments.values():
+            if pairs:
+                D = self.solver.pair_overlap_matrix(pairs)
+                total += float(np.triu(D, k=1).sum())
+        return total
+
+    def solve(
+        self,
+        time_limit: Optional[float] = None,
+        on_incumbent: Optional[IncumbentHook] = None,
+    ) -> JointResult:
+        """
+        Solve the joint model (time_limit: seconds for all stages together).
+        The two-stage plan is returned instead when the joint solve finds no
+        plan, runs out of time, or ends worse on the combined objective.
+        """
+        solver = self.solver
+        metrics = SolveMetrics("joint")
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+        def remaining() -> Optional[float]:
+            if deadline is None:
+                return None
+            return deadline - time.perf_counter()
+
+        two_stage = None
+        two_stage_objective = None
+        if self.warm_start:
+            with metrics.span("two_stage"):
+                coverage = solver.solve_coverage(time_limit)
+                if coverage.feasible:
+                    # Categories reached out of time get the heuristic: still a complete plan
+                    days = solver.assign_days(coverage, deadline=deadline)
+                    two_stage = (coverage, days)
+                    two_stage_objective = coverage.objective_value + self.overlap_weight * (
+                        total_overlap(days)
+                    )
+        left = remaining()
+        if two_stage is not None and left is not None and left <= 0:
+            solver.emit_metrics(metrics)
+            return self._two_stage_result(two_stage, two_stage_objective, metrics)
+
+        model = self.build(metrics)
+        if two_stage is not None:
+            with metrics.span("mip_start"):
+                self.set_initial(model, *two_stage)
+        prob = model.coverage.prob
+        with metrics.span("solve"):
+            prob.solve(
+                make_solver(
+                    solver.solver_settings, remaining(), two_stage is not None, on_incumbent
+                )
+            )
+        metrics.backend = solver.solver_settings.effective_backend
+        metrics.mip_gap, metrics.nodes = solve_statistics(prob)
+        proven = proven_optimal(prob, solver.solver_settings)
+        gap = proven_gap(prob, solver.solver_settings, metrics.mip_gap)
+
+        coverage = solver.extract_coverage(model.coverage)
+        if not coverage.feasible:
+            solver.emit_metrics(metrics)
+            if two_stage is not None:
+                return self._two_stage_result(two_stage, two_stage_objective, metrics)
+            return JointResult(coverage, {}, float("inf"), metrics=metrics)
+
+        with metrics.span("extract"):
+            days: Dict[DayCategory, AssignmentResult] = {
+                cat: AssignmentResult(
+                    coverage.status, assignments, self.day_overlap(assignments), proven, gap
+                )
+                for cat, assignments in self.read_days(model).items()
+            }
+        left = remaining()
+        if self.polish and (left is None or left > 0):
+            with metrics.span("polish"):
+                polished = solver.assign_days(coverage, deadline=deadline)
+            for cat, assignment in polished.items():
+                if assignment.feasible and assignment.total_overlap < days[cat].total_overlap:
+                    days[cat] = assignment
+
+        objective = coverage.objective_value + self.overlap_weight * total_overlap(days)
+        solver.emit_metrics(metrics)
+        if two_stage_objective is not None and two_stage_objective < objective:
+            # The linearized overlap can favour a plan that is worse exactly
+            return self._two_stage_result(two_stage, two_stage_objective, metrics, proven, gap)
+        return JointResult(
+            coverage, days, objective, two_stage_objective, proven, gap, metrics
+        )
+
+    @staticmethod
+    def _two_stage_result(
+        two_stage: Tuple[CoverageResult, Dict[DayCategory, AssignmentResult]],
+        objective: float,
+        metrics: SolveMetrics,
+        proven: bool = False,
+        gap: Optional[float] = None,
+    ) -> JointResult:
+        coverage, days = two_stage
+        return JointResult(
+            coverage, days, objective, objective, proven, gap, metrics, used_two_stage=True
+        )
@@ -0,0 +1,75 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Callable, Dict, Iterator, Optional
+
+import pulp
+
+
+# -----------------------
+# Solve metrics
+# -----------------------
+@dataclass
+class SolveMetrics:
+    """
+    Timings and model statistics of one stage.
+
+    stage: 'setup' (PlanSolver construction), 'coverage' or 'assignment'
+    phases: Seconds per phase in execution order (e.g. 'build', 'solve', 'extract')
+    variables / constraints / nonzeros: Size of the model (0 if none was built)
+    backend: MIP backend used ('highs' or 'cbc'; None if nothing was solved)
+    mip_gap: Relative MIP gap at the end of the solve (None if the backend doesn't report it)
+    nodes: Branch-and-bound nodes (None if the backend doesn't report it)
+    cache_hit: The result came from the solve cache
+    """
+
+    stage: str
+    phases: Dict[str, float] = field(default_factory=dict)
+    variables: int = 0
+    constraints: int = 0
+    nonzeros: int = 0
+    backend: Optional[str] = None
+    mip_gap: Optional[float] = None
+    nodes: Optional[int] = None
+    cache_hit: bool = False
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """Time a block as `phase` (repeated phases add up)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] = (
+                self.phases.get(phase, 0.0) + time.perf_counter() - start
+            )
+
+    @property
+    def total_s(self) -> float:
+        return sum(self.phases.values())
+
+    def record_model(self, prob: pulp.LpProblem) -> None:
+        """Record the size of a built model"""
+        self.variables = prob.numVariables()
+        self.constraints = prob.numConstraints()
+        self.nonzeros = sum(len(con) for con in prob.constraints.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record["total_s"] = self.total_s
+        return record
+
+
+MetricsHook = Callable[[SolveMetrics], None]
+
+
+class JsonLinesSink:
+    """Metrics hook writing one JSON object per stage to a stream"""
+
+    def __init__(self, out: IO[str]) -> None:
+        self.out = out
+
+    def __call__(self, metrics: SolveMetrics) -> None:
+        self.out.write(json.dumps(metrics.to_dict()) + "\n")
+        self.out.flush()
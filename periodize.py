@@ -0,0 +1,435 @@
+import argparse
+import dataclasses
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pulp
+
+from decompose import CategoryPricer
+from incremental import CoverageSession
+from metrics import SolveMetrics
+from solve import (
+    AssignmentResult,
+    CoverageResult,
+    DayCategory,
+    ExercisePairs,
+    Muscle,
+    PlanSolver,
+)
+
+
+# -----------------------
+# Week specifications
+# -----------------------
+@dataclass
+class WeekSpec:
+    """
+    What changes in one week of a program.
+
+    targets: Muscle targets (in sets) overriding the base config for this week;
+        muscles not listed keep their base target
+    label: Shown in reports (e.g. 'deload')
+    """
+
+    targets: Dict[str, float] = field(default_factory=dict)
+    label: str = ""
+
+
+def ramp_schedule(
+    base_targets: Dict[str, float],
+    weeks: int,
+    start_scale: float = 1.0,
+    end_scale: float = 1.2,
+    deload_every: int = 0,
+    deload_scale: float = 0.6,
+) -> List[WeekSpec]:
+    """
+    Linearly ramp every target from start_scale to end_scale times its base
+    value over the given weeks; with deload_every=k, every k-th week is a
+    deload week at deload_scale instead. Scaled targets are rounded to 0.5 sets.
+    """
+    specs: List[WeekSpec] = []
+    for w in range(weeks):
+        if deload_every and (w + 1) % deload_every == 0:
+            scale, label = deload_scale, "deload"
+        else:
+            progress = w / (weeks - 1) if weeks > 1 else 0.0
+            scale, label = start_scale + (end_scale - start_scale) * progress, ""
+        targets = {m: round(sets * scale * 2) / 2 for m, sets in base_targets.items()}
+        specs.append(WeekSpec(targets, label))
+    return specs
+
+
+# -----------------------
+# Week results
+# -----------------------
+@dataclass
+class WeekPlan:
+    """
+    One solved week.
+
+    week: Index in the program (0-based)
+    spec: The week's specification
+    coverage: The week's coverage result
+    days: Day assignments per category
+    new_exercises: (category, exercise) positions not used the week before
+    rotated_out: Exercises resting this week per category (rotation)
+    relaxed: The novelty constraint had to be dropped to find a feasible plan
+    carried_days: Categories whose pairs were unchanged, so last week's days were reused
+    wall_s: Seconds for the whole week (coverage and assignment)
+    """
+
+    week: int
+    spec: WeekSpec
+    coverage: CoverageResult
+    days: Dict[DayCategory, AssignmentResult]
+    new_exercises: int = 0
+    rotated_out: Dict[DayCategory, List[str]] = field(default_factory=dict)
+    relaxed: bool = False
+    carried_days: List[DayCategory] = field(default_factory=list)
+    wall_s: float = 0.0
+
+
+# -----------------------
+# Periodized planner
+# -----------------------
+class PeriodizedPlanner:
+    """
+    Multi-week programs as a warm-started sequence of weekly solves.
+
+    One coverage model is built for the whole program (a CoverageSession):
+    each week only edits the targets, rotation bans and novelty constraint in
+    place and re-solves from the previous week's plan as a MIP start. A week
+    whose model matches an earlier week's (same targets, rested exercises and
+    novelty baseline, e.g. repeated deload weeks) reuses that week's plan
+    without solving. Day assignments of categories whose pairs did not change
+    are carried over.
+
+    max_consecutive_weeks: An exercise used this many weeks in a row in a
+        category rests there the following week (None: no rotation), as long
+        as the category can still be filled without it (longest streaks rest
+        first)
+    min_new_exercises: Each week uses at least this many (category, exercise)
+        positions that were unused the week before (0: no novelty constraint)
+    time_limit: Solver seconds per weekly coverage solve
+    assign_options: Keyword arguments for assign_pairs_to_days()
+    """
+
+    def __init__(
+        self,
+        solver: PlanSolver,
+        max_consecutive_weeks: Optional[int] = None,
+        min_new_exercises: int = 0,
+        time_limit: Optional[float] = None,
+        **assign_options: Any,
+    ) -> None:
+        self.session = CoverageSession(solver)
+        self.base_targets: Dict[Muscle, float] = dict(self.session.solver.muscle_targets)
+        self.max_consecutive_weeks = max_consecutive_weeks
+        self.min_new_exercises = min_new_exercises
+        self.time_limit = time_limit
+        self.assign_options = assign_options
+        # Consecutive weeks each exercise has been used, per category
+        self.streaks: Dict[DayCategory, Dict[int, int]] = {cat: {} for cat in DayCategory}
+        self.rotated: Dict[DayCategory, Set[int]] = {cat: set() for cat in DayCategory}
+        # Category blocks, to check that rested exercises leave a feasible category
+        self._blocks: Dict[DayCategory, CategoryPricer] = {}
+        self.weeks: List[WeekPlan] = []
+        # Solved weekly models: key -> (result, count and pair values)
+        self._solved: Dict[Tuple, Tuple[CoverageResult, List[Optional[float]]]] = {}
+        # Novelty binaries per (category, exercise), reused across weeks
+        self._novelty: Dict[Tuple[DayCategory, int], pulp.LpVariable] = {}
+
+    def plan(self, specs: List[WeekSpec]) -> List[WeekPlan]:
+        """Solve the given weeks in order (continuing after any already planned)"""
+        for spec in specs:
+            self.plan_week(spec)
+        return self.weeks
+
+    def plan_week(self, spec: WeekSpec) -> WeekPlan:
+        """Solve the next week"""
+        start = time.perf_counter()
+        session = self.session
+        previous = self.weeks[-1] if self.weeks else None
+
+        targets = {**self.base_targets, **{Muscle[m]: s for m, s in spec.targets.items()}}
+        for m, sets in targets.items():
+            if session.solver.muscle_targets[m] != sets:
+                session.set_target(m, sets)
+        self._rotate()
+        self._set_novelty(previous)
+
+        coverage = self._solve(previous)
+        relaxed = False
+        if not coverage.feasible and self._novelty_active(previous):
+            self._remove_novelty()
+            coverage = session.solve(self.time_limit)
+            relaxed = True
+
+        rotated_out = {
+            cat: sorted(session.solver.exercise_names[e] for e in banned)
+            for cat, banned in self.rotated.items()
+            if banned
+        }
+        week = WeekPlan(
+            len(self.weeks),
+            spec,
+            coverage,
+            {},
+            self._count_new(previous, coverage),
+            rotated_out,
+            relaxed,
+        )
+        if coverage.feasible:
+            self._assign_days(week, previous)
+            self._update_streaks(coverage)
+        week.wall_s = time.perf_counter() - start
+        self.weeks.append(week)
+        return week
+
+    def _solve(self, previous: Optional[WeekPlan]) -> CoverageResult:
+        """Solve the edited model, or reuse the plan of an identical earlier week"""
+        key = self._model_key(previous)
+        if key in self._solved:
+            result, values = self._solved[key]
+            # The reused plan is the next week's MIP start
+            for var, value in zip(self._plan_variables(), values):
+                var.varValue = value
+            metrics = SolveMetrics("coverage", cache_hit=True)
+            self.session.solver.emit_metrics(metrics)
+            return dataclasses.replace(result, metrics=metrics)
+        result = self.session.solve(self.time_limit)
+        if result.feasible:
+            values = [var.varValue for var in self._plan_variables()]
+            self._solved[key] = (result, values)
+        return result
+
+    def _model_key(self, previous: Optional[WeekPlan]) -> Tuple:
+        solver = self.session.solver
+        baseline = None
+        if self._novelty_active(previous) and previous.coverage.feasible:
+            baseline = tuple(
+                tuple(sorted(previous.coverage.counts_dict[cat])) for cat in DayCategory
+            )
+        return (
+            tuple(solver.muscle_targets[m] for m in Muscle),
+            tuple(tuple(sorted(self.rotated[cat])) for cat in DayCategory),
+            baseline,
+        )
+
+    def _plan_variables(self) -> List[pulp.LpVariable]:
+        model = self.session.model
+        return [
+            var
+            for vars_ in (*model.c.values(), *model.p.values())
+            for var in vars_.values()
+        ]
+
+    # -----------------------
+    # Rotation
+    # -----------------------
+    def _rotate(self) -> None:
+        """Rest exercises that reached max_consecutive_weeks; bring back last week's rested ones"""
+        session = self.session
+        names = session.solver.exercise_names
+        for cat in DayCategory:
+            rest = self._restable(cat) if self.max_consecutive_weeks else set()
+            for e in self.rotated[cat] - rest:
+                session.unban_exercise(names[e], [cat])
+            for e in rest - self.rotated[cat]:
+                session.ban_exercise(names[e], [cat])
+            self.rotated[cat] = rest
+
+    def _restable(self, cat: DayCategory) -> Set[int]:
+        """
+        The due exercises of a category that can rest together: all of them if
+        the category block stays feasible, else greedily by longest streak.
+        """
+        streaks = self.streaks[cat]
+        due = sorted(
+            (e for e, weeks in streaks.items() if weeks >= self.max_consecutive_weeks),
+            key=lambda e: (-streaks[e], e),
+        )
+        if not due:
+            return set()
+        solver = self.session.solver
+        if cat not in self._blocks:
+            self._blocks[cat] = CategoryPricer(solver, cat)
+        block = self._blocks[cat]
+        for e, var in block.c.items():
+            var.upBound = solver.count_upper_bound(cat, e)
+        for e in due:
+            block.c[e].upBound = 0
+        if self._block_feasible(block):
+            return set(due)
+
+        rest: Set[int] = set()
+        for e in due:
+            block.c[e].upBound = solver.count_upper_bound(cat, e)
+        for e in due:
+            block.c[e].upBound = 0
+            if self._block_feasible(block):
+                rest.add(e)
+            else:
+                block.c[e].upBound = solver.count_upper_bound(cat, e)
+        return rest
+
+    def _block_feasible(self, block: CategoryPricer) -> bool:
+        pattern, _, _ = block.solve(np.zeros(self.session.solver.E), self.time_limit)
+        return pattern is not None
+
+    def _update_streaks(self, coverage: CoverageResult) -> None:
+        index = self.session.solver.exercise_index
+        for cat in DayCategory:
+            used = {index[name] for name in coverage.counts_dict[cat]}
+            self.streaks[cat] = {e: self.streaks[cat].get(e, 0) + 1 for e in used}
+
+    # -----------------------
+    # Novelty
+    # -----------------------
+    def _novelty_active(self, previous: Optional[WeekPlan]) -> bool:
+        return bool(self.min_new_exercises) and previous is not None
+
+    def _set_novelty(self, previous: Optional[WeekPlan]) -> None:
+        """
+        Require min_new_exercises positions unused last week: a binary per such
+        position, bounded by its count, summed. The binaries and their bounding
+        constraints are created once per position and kept in the model; a week
+        only opens (upper bound 1) the positions that are new to it.
+        """
+        self._remove_novelty()
+        if not self._novelty_active(previous) or not previous.coverage.feasible:
+            return
+        model = self.session.model
+        index = self.session.solver.exercise_index
+        new: List[pulp.LpVariable] = []
+        for cat, counts in model.c.items():
+            used = {index[name] for name in previous.coverage.counts_dict[cat]}
+            for e, var in counts.items():
+                if e in used or not var.upBound:
+                    continue
+                n = self._novelty.get((cat, e))
+                if n is None:
+                    name = f"{cat.name.lower()}_{e}"
+                    n = pulp.LpVariable(f"new_{name}", 0, 1, cat="Binary")
+                    model.prob += n <= var, f"new_{name}"
+                    self._novelty[cat, e] = n
+                n.upBound = 1
+                new.append(n)
+        model.prob += pulp.lpSum(new) >= self.min_new_exercises, "novelty"
+
+    def _remove_novelty(self) -> None:
+        """Drop the novelty constraint and close every novelty binary"""
+        self.session.model.prob.constraints.pop("novelty", None)
+        for n in self._novelty.values():
+            n.upBound = 0
+
+    @staticmethod
+    def _count_new(previous: Optional[WeekPlan], coverage: CoverageResult) -> int:
+        if previous is None or not coverage.feasible:
+            return 0
+        return sum(
+            1
+            for cat, counts in coverage.counts_dict.items()
+            for name in counts
+            if name not in previous.coverage.counts_dict[cat]
+        )
+
+    # -----------------------
+    # Day assignment
+    # -----------------------
+    def _assign_days(self, week: WeekPlan, previous: Optional[WeekPlan]) -> None:
+        solver = self.session.solver
+        for cat, pairs in week.coverage.pairs_dict.items():
+            if not pairs:
+                continue
+            if previous is not None and cat in previous.days and (
+                _pair_multiset(previous.coverage.pairs_dict[cat]) == _pair_multiset(pairs)
+            ):
+                week.days[cat] = previous.days[cat]
+                week.carried_days.append(cat)
+                continue
+            week.days[cat] = solver.assign_pairs_to_days(
+                pairs,
+                cat.name.lower(),
+                solver.days_per_category[cat],
+                solver.pairs_per_day[cat],
+                **self.assign_options,
+            )
+
+
+def _pair_multiset(pairs: ExercisePairs) -> List[Tuple[str, str]]:
+    return sorted(tuple(sorted(pair)) for pair in pairs)
+
+
+# -----------------------
+# Command line
+# -----------------------
+def print_program(weeks: List[WeekPlan]) -> None:
+    print("| week | label | status | objective | new | rotated out | relaxed | carried days | s |")
+    print("|---|---|---|---|---|---|---|---|---|")
+    for week in weeks:
+        rotated = sum(len(names) for names in week.rotated_out.values())
+        carried = ", ".join(cat.name for cat in week.carried_days) or "-"
+        print(
+            f"| {week.week + 1} | {week.spec.label or '-'} | {week.coverage.status} "
+            f"| {week.coverage.objective_value:.3f} | {week.new_exercises} | {rotated} "
+            f"| {week.relaxed} | {carried} | {week.wall_s:.2f} |"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan a multi-week periodized program")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--start-scale", type=float, default=1.0)
+    parser.add_argument("--end-scale", type=float, default=1.2)
+    parser.add_argument("--deload-every", type=int, default=4, help="0: no deload weeks")
+    parser.add_argument("--deload-scale", type=float, default=0.6)
+    parser.add_argument(
+        "--rotate-after", type=int, default=None, help="max consecutive weeks per exercise"
+    )
+    parser.add_argument("--min-new", type=int, default=0, help="new exercises per week")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per week")
+    parser.add_argument(
+        "--assignment-method", default="exact", choices=["exact", "heuristic"]
+    )
+    parser.add_argument(
+        "--cold", action="store_true", help="also time independent cold weekly solves"
+    )
+    args = parser.parse_args()
+
+    solver = PlanSolver.from_path(args.config)
+    specs = ramp_schedule(
+        solver.config["muscle_targets"],
+        args.weeks,
+        args.start_scale,
+        args.end_scale,
+        args.deload_every,
+        args.deload_scale,
+    )
+    planner = PeriodizedPlanner(
+        solver,
+        args.rotate_after,
+        args.min_new,
+        args.time_limit,
+        method=args.assignment_method,
+    )
+    weeks = planner.plan(specs)
+    print_program(weeks)
+    print(f"\nProgram: {sum(week.wall_s for week in weeks):.2f} s")
+
+    if args.cold:
+        start = time.perf_counter()
+        for spec in specs:
+            week_solver = solver.with_overrides({"muscle_targets": spec.targets})
+            result = week_solver.solve_coverage(args.time_limit, use_cache=False)
+            if result.feasible:
+                week_solver.assign_days(result, method=args.assignment_method, use_cache=False)
+        print(f"Cold weekly solves (no rotation/novelty): {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+Pair = Tuple[int, int]
+
+
+# -----------------------
+# Coverage presolve
+# -----------------------
+@dataclass
+class PairPresolve:
+    """
+    Reductions of one category's pair structure that keep every optimal plan
+    reachable (so the optimal objective is unchanged).
+
+    pairs: Surviving compatible pairs (i <= j), in input order
+    pair_bounds: Upper bound of each surviving pair variable
+    count_bounds: Upper bound of each exercise's count variable (0: eliminated)
+    symmetric: (k1, k2) pairs of interchangeable exercises, ordered c_k1 >= c_k2
+    input_pairs: Number of compatible pairs before presolve
+    input_counts: Number of count variables before presolve (one per exercise)
+    """
+
+    pairs: List[Pair]
+    pair_bounds: List[int]
+    count_bounds: np.ndarray
+    symmetric: List[Pair]
+    input_pairs: int
+    input_counts: int
+
+    @property
+    def removed_pairs(self) -> int:
+        return self.input_pairs - len(self.pairs)
+
+    @property
+    def removed_counts(self) -> int:
+        return self.input_counts - int(np.count_nonzero(self.count_bounds))
+
+    @property
+    def removed_variables(self) -> int:
+        return self.removed_pairs + self.removed_counts
+
+
+def presolve_pairs(
+    pairs: Sequence[Pair],
+    count_bounds: np.ndarray,
+    pair_cap: int,
+    activations: np.ndarray,
+    equipment_mask: np.ndarray,
+) -> PairPresolve:
+    """
+    Presolve one category of the coverage ILP.
+
+    - A pair is impossible if one of its exercises can't be used (count bound 0)
+      or, for a self pair (e, e), can't be used twice.
+    - An exercise left without a possible pair can't be used: its count
+      variable is eliminated.
+    - Pair bounds are tightened to the count bounds of their exercises.
+    - Exercises with identical activations, equipment and count bound are
+      interchangeable: their counts are ordered instead of left symmetric.
+
+    There is no dominance between non-identical exercises: the objective
+    penalizes deviations in both directions, so more activation is not better.
+    """
+    ub = np.asarray(count_bounds, dtype=np.int64)
+    kept = [
+        (i, j)
+        for i, j in pairs
+        if ub[i] > 0 and ub[j] > 0 and (i != j or ub[i] >= 2)
+    ]
+
+    used = np.zeros(len(ub), dtype=bool)
+    for i, j in kept:
+        used[i] = used[j] = True
+    ub = np.where(used, ub, 0)
+
+    bounds = [
+        min(pair_cap, int(ub[i]) // 2) if i == j else min(pair_cap, int(ub[i]), int(ub[j]))
+        for i, j in kept
+    ]
+
+    # Interchangeable exercises (identical rows also give identical overlaps,
+    # hence the same compatible partners)
+    classes: Dict[Tuple[bytes, int, int], List[int]] = {}
+    for e in np.flatnonzero(ub):
+        key = (activations[e].tobytes(), int(equipment_mask[e]), int(ub[e]))
+        classes.setdefault(key, []).append(int(e))
+    symmetric = [
+        (members[k], members[k + 1])
+        for members in classes.values()
+        for k in range(len(members) - 1)
+    ]
+
+    return PairPresolve(
+        kept,
+        bounds,
+        ub,
+        symmetric,
+        len(pairs),
+        len(ub),
+    )
@@ -0,0 +1,467 @@
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pulp
+
+from backends import make_solver
+from decompose import CategoryPricer
+from metrics import SolveMetrics
+from solve import (
+    CoverageDict,
+    CoverageModel,
+    CoverageResult,
+    DayCategory,
+    Muscle,
+    PlanSolver,
+    safe_value,
+)
+
+PREVIEW_METHODS = ("lp", "nnls")
+Pair = Tuple[int, int]
+
+
+@dataclass
+class CoveragePreview:
+    """
+    Fast estimate of the coverage ILP for interactive previews.
+
+    method: 'lp' (continuous relaxation of the coverage model) or 'nnls'
+        (non-negative least squares on the activation matrix)
+    status: Status of the relaxation ('Optimal', 'Infeasible', ...)
+    counts: Fractional exercise counts per category (positive ones only)
+    coverage: Estimated sets per muscle from the fractional counts
+    objective: Deviation objective of the estimated coverage
+    lower_bound: Proven lower bound on the ILP objective (LP only, None for NNLS)
+    plan: Integer plan rounded from the estimate and repaired (None unless requested)
+    metrics: Phase timings of the preview
+    """
+
+    method: str
+    status: str
+    counts: Dict[DayCategory, Dict[str, float]]
+    coverage: CoverageDict
+    objective: float
+    lower_bound: Optional[float] = None
+    plan: Optional[CoverageResult] = None
+    metrics: Optional[SolveMetrics] = None
+
+    @property
+    def feasible(self) -> bool:
+        return self.status == "Optimal"
+
+
+# -----------------------
+# Objective on coverage vectors
+# -----------------------
+def deviation_objective(solver: PlanSolver, coverage: np.ndarray) -> np.ndarray:
+    """
+    Coverage objective of sets-per-muscle vectors (shape (..., M)): the same
+    weighted sum and maxima of the deviations as the ILP, over the muscles with
+    a positive target.
+    """
+    targets = np.array([solver.muscle_targets.get(m, 0.0) for m in Muscle])
+    active = targets > 0
+    diff = coverage[..., active] - targets[active]
+    over, under = np.maximum(diff, 0.0), np.maximum(-diff, 0.0)
+    mult = solver.undershoot_weight_multiplier
+    if not active.any():
+        return np.zeros(coverage.shape[:-1])
+    return (
+        solver.deviation_sum_weight * (over.sum(axis=-1) + mult * under.sum(axis=-1))
+        + over.max(axis=-1)
+        + mult * under.max(axis=-1)
+    )
+
+
+def nnls(A: np.ndarray, b: np.ndarray, tol: float = 1e-10) -> np.ndarray:
+    """min |Ax - b| subject to x >= 0 (Lawson-Hanson active set)"""
+    n = A.shape[1]
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    w = A.T @ (b - A @ x)
+    for _ in range(3 * n):
+        free = ~passive & (w > tol)
+        if not free.any():
+            break
+        passive[int(np.argmax(np.where(free, w, -np.inf)))] = True
+        while True:
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(A[:, passive], b, rcond=None)[0]
+            negative = passive & (z <= tol)
+            if not negative.any():
+                break
+            # Step back to the first variable reaching zero and drop it
+            step = x[negative] / np.maximum(x[negative] - z[negative], tol)
+            x = x + float(step.min()) * (z - x)
+            passive &= x > tol
+        x = z
+        w = A.T @ (b - A @ x)
+    return x
+
+
+# -----------------------
+# Estimates
+# -----------------------
+def relax(model: CoverageModel) -> None:
+    """Make the count and pair variables of a built coverage model continuous"""
+    for variables in (*model.c.values(), *model.p.values()):
+        for var in variables.values():
+            var.cat = pulp.LpContinuous
+
+
+def lp_preview(
+    solver: PlanSolver, time_limit: Optional[float] = None
+) -> Tuple[CoveragePreview, CoverageModel]:
+    """The coverage model solved as an LP: its objective bounds the ILP's from below"""
+    model = solver.build_coverage_model()
+    model.metrics.stage = "preview"
+    relax(model)
+    solver.run_coverage_solver(model, make_solver(solver.solver_settings, time_limit))
+    status = pulp.LpStatus[model.prob.status]
+    if status != "Optimal":
+        return CoveragePreview("lp", status, {}, {}, float("inf"), metrics=model.metrics), model
+
+    with model.metrics.span("extract"):
+        names = solver.exercise_names
+        sets = np.zeros(solver.M)
+        counts: Dict[DayCategory, Dict[str, float]] = {}
+        for cat, variables in model.c.items():
+            values = {e: safe_value(var) for e, var in variables.items()}
+            counts[cat] = {names[e]: v for e, v in values.items() if v > 1e-6}
+            for e, v in values.items():
+                sets += solver.sets_per_instance[cat] * v * solver.vec[e]
+        bound = float(pulp.value(model.prob.objective))
+    coverage = {m: float(sets[k]) for k, m in enumerate(Muscle)}
+    return CoveragePreview("lp", status, counts, coverage, bound, bound, metrics=model.metrics), model
+
+
+def nnls_preview(solver: PlanSolver, category_weight: float = 10.0) -> CoveragePreview:
+    """
+    Least-squares fit of the targets by non-negative exercise counts, with each
+    category's instance total as a weighted soft row. Usage limits are applied
+    by clipping afterwards and pairing is ignored, so this is an estimate only
+    (no bound).
+    """
+    metrics = SolveMetrics("preview")
+    with metrics.span("build"):
+        columns: List[Tuple[DayCategory, int]] = [
+            (cat, e)
+            for cat in DayCategory
+            if solver.day_requirements[cat]
+            for e in range(solver.E)
+            if solver.count_upper_bound(cat, e) > 0
+        ]
+        targets = np.array([solver.muscle_targets.get(m, 0.0) for m in Muscle])
+        active = targets > 0
+        rows = [
+            np.array([solver.sets_per_instance[cat] * solver.vec[e][active] for cat, e in columns]).T
+        ]
+        rhs = [targets[active]]
+        for cat in DayCategory:
+            if solver.day_requirements[cat]:
+                rows.append(category_weight * np.array([[c == cat for c, _ in columns]], dtype=float))
+                rhs.append([category_weight * solver.day_requirements[cat]])
+        A, b = np.vstack(rows), np.concatenate(rhs)
+    with metrics.span("solve"):
+        x = nnls(A, b)
+    with metrics.span("extract"):
+        caps = np.array([solver.count_upper_bound(cat, e) for cat, e in columns])
+        x = np.minimum(x, caps)
+        names = solver.exercise_names
+        counts: Dict[DayCategory, Dict[str, float]] = {cat: {} for cat in DayCategory}
+        sets = np.zeros(solver.M)
+        for (cat, e), v in zip(columns, x):
+            if v > 1e-6:
+                counts[cat][names[e]] = float(v)
+                sets += solver.sets_per_instance[cat] * v * solver.vec[e]
+        objective = float(deviation_objective(solver, sets))
+    coverage = {m: float(sets[k]) for k, m in enumerate(Muscle)}
+    return CoveragePreview("nnls", "Optimal", counts, coverage, objective, metrics=metrics)
+
+
+# -----------------------
+# Rounding and repair
+# -----------------------
+def repair_plan(
+    solver: PlanSolver,
+    seed: Optional[Dict[DayCategory, Dict[Pair, int]]] = None,
+    lower_bound: Optional[float] = None,
+    max_passes: int = 5,
+    shortlist: int = 1024,
+) -> CoverageResult:
+    """
+    Integer plan from a (possibly empty) seed of pair counts: missing pairs are
+    added greedily, each step taking the compatible pair (within the pair and
+    usage bounds of the ILP) that most lowers the objective of the partial
+    plan, then single pairs are swapped for better ones until no swap helps or
+    max_passes passes are done. Only the `shortlist` pairs best by the
+    objective's gradient are scored exactly. A category the greedy fill gets
+    stuck in (usage limits left only incompatible exercises) is refilled by
+    its block ILP (decompose.CategoryPricer); status 'Not Solved' if that is
+    infeasible too.
+    """
+    cats = [cat for cat in DayCategory if solver.pairs_per_category[cat]]
+    pairs = {cat: solver.compatible_pairs[cat] for cat in cats}
+    first = {cat: np.array([i for i, _ in pairs[cat]], dtype=int) for cat in cats}
+    second = {cat: np.array([j for _, j in pairs[cat]], dtype=int) for cat in cats}
+    double = {cat: (first[cat] == second[cat]).astype(int) for cat in cats}
+    vectors = {
+        cat: solver.sets_per_instance[cat] * (solver.vec[first[cat]] + solver.vec[second[cat]])
+        for cat in cats
+    }
+    count_caps = {
+        cat: np.array([solver.count_upper_bound(cat, e) for e in range(solver.E)]) for cat in cats
+    }
+    targets = np.array([solver.muscle_targets.get(m, 0.0) for m in Muscle])
+    n = {cat: np.zeros(len(pairs[cat]), dtype=int) for cat in cats}
+    used = {cat: np.zeros(solver.E, dtype=int) for cat in cats}
+    sets = np.zeros(solver.M)
+
+    def change(cat: DayCategory, a: int, delta: int) -> None:
+        nonlocal sets
+        n[cat][a] += delta
+        used[cat][first[cat][a]] += delta
+        used[cat][second[cat][a]] += delta
+        sets = sets + delta * vectors[cat][a]
+
+    def candidates(cat: DayCategory) -> np.ndarray:
+        need = used[cat] + 1
+        return np.flatnonzero(
+            (n[cat] < min(solver.pairs_per_category[cat], 3))
+            & (need[first[cat]] + double[cat] <= count_caps[cat][first[cat]])
+            & (need[second[cat]] + double[cat] <= count_caps[cat][second[cat]])
+        )
+
+    def gradient() -> np.ndarray:
+        """First-order change of the weighted deviation sum per set of each muscle"""
+        return np.where(
+            targets <= 0,
+            0.0,
+            np.where(sets > targets, 1.0, -solver.undershoot_weight_multiplier),
+        )
+
+    def best_option(cat: DayCategory) -> Optional[Tuple[float, int]]:
+        """Lowest objective after adding one pair of the category"""
+        options = candidates(cat)
+        if not len(options):
+            return None
+        if len(options) > shortlist:
+            linear = vectors[cat][options] @ gradient()
+            options = options[np.argpartition(linear, shortlist)[:shortlist]]
+        scores = deviation_objective(solver, sets + vectors[cat][options])
+        k = int(np.argmin(scores))
+        return float(scores[k]), int(options[k])
+
+    for cat, counts in (seed or {}).items():
+        index = {pair: a for a, pair in enumerate(pairs.get(cat, []))}
+        for pair, count in counts.items():
+            if pair not in index:
+                continue
+            a = index[pair]
+            for _ in range(count):
+                if a in candidates(cat):
+                    change(cat, a, 1)
+
+    # Greedy fill, best step over all categories still short of pairs
+    while True:
+        short = [cat for cat in cats if n[cat].sum() < solver.pairs_per_category[cat]]
+        best: Optional[Tuple[float, DayCategory, int]] = None
+        for cat in short:
+            option = best_option(cat)
+            if option is not None and (best is None or option[0] < best[0]):
+                best = (option[0], cat, option[1])
+        if best is None:
+            break
+        change(best[1], best[2], 1)
+
+    # Categories the greedy fill got stuck in: their block solved exactly
+    # under the linearized objective
+    for cat in cats:
+        if n[cat].sum() < solver.pairs_per_category[cat]:
+            for a in np.flatnonzero(n[cat]):
+                change(cat, a, -int(n[cat][a]))
+            costs = solver.sets_per_instance[cat] * (solver.vec @ gradient())
+            pattern, _, _ = CategoryPricer(solver, cat).solve(costs)
+            index = {pair: a for a, pair in enumerate(pairs[cat])}
+            for pair, count in (pattern.pairs if pattern else {}).items():
+                change(cat, index[pair], count)
+
+    # Swap descent
+    current = float(deviation_objective(solver, sets))
+    complete = all(n[cat].sum() == solver.pairs_per_category[cat] for cat in cats)
+    for _ in range(max_passes if complete else 0):
+        improved = False
+        for cat in cats:
+            for a in np.flatnonzero(n[cat]):
+                if not n[cat][a]:
+                    continue
+                change(cat, a, -1)
+                option = best_option(cat)
+                if option is not None and option[0] < current - 1e-9:
+                    current = option[0]
+                    change(cat, option[1], 1)
+                    improved = True
+                else:
+                    change(cat, a, 1)
+        if not improved:
+            break
+
+    return plan_result(solver, pairs, n, lower_bound)
+
+
+def plan_result(
+    solver: PlanSolver,
+    pairs: Dict[DayCategory, List[Pair]],
+    n: Dict[DayCategory, np.ndarray],
+    lower_bound: Optional[float] = None,
+) -> CoverageResult:
+    """CoverageResult of integer pair counts, with its gap to a lower bound"""
+    names = solver.exercise_names
+    complete = all(
+        int(n[cat].sum()) == solver.pairs_per_category[cat] for cat in pairs
+    ) and all(solver.pairs_per_category[cat] == 0 for cat in DayCategory if cat not in pairs)
+    if not complete:
+        return CoverageResult(
+            "Not Solved", {cat: {} for cat in DayCategory}, {cat: [] for cat in DayCategory}, {}
+        )
+
+    counts_dict: Dict[DayCategory, Dict[str, int]] = {cat: {} for cat in DayCategory}
+    pairs_dict: Dict[DayCategory, List[Tuple[str, str]]] = {cat: [] for cat in DayCategory}
+    sets = np.zeros(solver.M)
+    for cat, cat_pairs in pairs.items():
+        for (i, j), count in zip(cat_pairs, n[cat].tolist()):
+            if not count:
+                continue
+            pairs_dict[cat].extend([(names[i], names[j])] * count)
+            for e in (i, j):
+                counts_dict[cat][names[e]] = counts_dict[cat].get(names[e], 0) + count
+            sets += solver.sets_per_instance[cat] * count * (solver.vec[i] + solver.vec[j])
+    counts_dict = {
+        cat: {name: counts[name] for name in sorted(counts, key=solver.exercise_index.get)}
+        for cat, counts in counts_dict.items()
+    }
+
+    targets = np.array([solver.muscle_targets.get(m, 0.0) for m in Muscle])
+    active = targets > 0
+    diff = sets[active] - targets[active]
+    over, under = np.maximum(diff, 0.0), np.maximum(-diff, 0.0)
+    objective = float(deviation_objective(solver, sets))
+    gap = None
+    if lower_bound is not None:
+        gap = max(objective - lower_bound, 0.0) / abs(objective) if objective else 0.0
+    return CoverageResult(
+        "Feasible",
+        counts_dict,
+        pairs_dict,
+        {m: float(sets[k]) for k, m in enumerate(Muscle)},
+        float(over.sum()),
+        float(under.sum()),
+        float(over.max()) if over.size else 0.0,
+        float(under.max()) if under.size else 0.0,
+        objective,
+        gap is not None and gap <= 1e-9,
+        gap,
+    )
+
+
+# -----------------------
+# Entry point
+# -----------------------
+def preview_coverage(
+    solver: PlanSolver,
+    overrides: Optional[Dict[str, Any]] = None,
+    method: str = "lp",
+    repair: bool = False,
+    time_limit: Optional[float] = None,
+) -> CoveragePreview:
+    """
+    Estimated coverage of a plan (e.g. while moving muscle_targets or
+    sets_per_instance sliders), without the integer solve.
+
+    method: 'lp' solves the continuous relaxation of the coverage model; its
+        objective is a lower bound on the ILP objective. 'nnls' fits the targets
+        by least squares (no solver involved, no bound).
+    repair: also build an integer plan (preview.plan): the better of a greedy
+        plan and (with the LP) the LP pair counts rounded down and completed
+        greedily. Its gap is measured against the LP bound when there is one.
+    """
+    if method not in PREVIEW_METHODS:
+        raise ValueError(f"Unknown preview method {method!r}, expected one of {PREVIEW_METHODS}")
+    if overrides:
+        solver = solver.with_overrides(overrides)
+
+    if method == "nnls":
+        preview, model = nnls_preview(solver), None
+    else:
+        preview, model = lp_preview(solver, time_limit)
+    if repair and preview.feasible:
+        seeds: List[Optional[Dict[DayCategory, Dict[Pair, int]]]] = [None]
+        if model is not None:
+            seeds.append(
+                {
+                    cat: {pair: int(safe_value(var) + 1e-6) for pair, var in pairs.items()}
+                    for cat, pairs in model.p.items()
+                }
+            )
+        with preview.metrics.span("repair"):
+            plans = [repair_plan(solver, seed, preview.lower_bound) for seed in seeds]
+            feasible = [plan for plan in plans if plan.feasible] or plans
+            preview.plan = min(feasible, key=lambda plan: plan.objective_value)
+    solver.emit_metrics(preview.metrics)
+    return preview
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Preview the coverage of a plan from the LP relaxation or NNLS"
+    )
+    parser.add_argument("config", nargs="?", default="config.json")
+    parser.add_argument("--method", default="lp", choices=PREVIEW_METHODS)
+    parser.add_argument(
+        "--overrides", default=None, help='JSON config overrides, e.g. \'{"threshold": 0.5}\''
+    )
+    parser.add_argument("--repair", action="store_true", help="also round to an integer plan")
+    parser.add_argument(
+        "--compare", action="store_true", help="also solve the ILP and print its objective"
+    )
+    args = parser.parse_args()
+
+    solver = PlanSolver.from_path(args.config)
+    overrides = json.loads(args.overrides) if args.overrides else None
+    start = time.perf_counter()
+    preview = preview_coverage(solver, overrides, args.method, args.repair)
+    wall_s = time.perf_counter() - start
+
+    print(f"{args.method} preview: {preview.status} in {wall_s * 1000:.1f} ms")
+    if not preview.feasible:
+        return
+    if overrides:
+        solver = solver.with_overrides(overrides)
+    plan = preview.plan
+    for m, covered in preview.coverage.items():
+        target = solver.muscle_targets.get(m, 0.0)
+        line = f"  {m.name:20s} target {target:4.1f}   estimate {covered:6.2f}"
+        if plan is not None and plan.feasible:
+            line += f"   plan {plan.coverage[m]:6.2f}"
+        print(line)
+    print(f"Estimated objective: {preview.objective:.2f}")
+    if preview.lower_bound is not None:
+        print(f"Lower bound: {preview.lower_bound:.2f}")
+    if plan is not None:
+        gap = f", gap {plan.gap:.1%}" if plan.gap is not None else ""
+        print(f"Repaired plan: {plan.status}, objective {plan.objective_value:.2f}{gap}")
+    if args.compare:
+        start = time.perf_counter()
+        result = solver.solve_coverage(use_cache=False)
+        print(
+            f"ILP: {result.status}, objective {result.objective_value:.2f} "
+            f"in {time.perf_counter() - start:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+import os
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:  # solve.py imports this module from its command line entry point
+    from solve import AssignmentResult, CoverageResult, DayCategory, PlanSolver
+
+REPORT_FORMATS = ("md", "json", "csv")
+RECORD_FORMATS = ("jsonl", "csv")
+PLAN_FIELDS = (
+    "status",
+    "objective_value",
+    "sum_overshoot_deviations",
+    "sum_undershoot_deviations",
+    "max_overshoot",
+    "max_undershoot",
+    "proven_optimal",
+    "gap",
+    "counts",
+    "assignments",
+    "total_overlap",
+    "metrics",
+)
+Assignments = Dict["DayCategory", "AssignmentResult"]
+
+
+# -----------------------
+# Records
+# -----------------------
+def plan_record(result: "CoverageResult", assignments: Assignments) -> Dict[str, Any]:
+    """JSON-serializable summary of one solved plan"""
+    return {
+        "status": result.status,
+        "objective_value": result.objective_value,
+        "sum_overshoot_deviations": result.sum_overshoot_deviations,
+        "sum_undershoot_deviations": result.sum_undershoot_deviations,
+        "max_overshoot": result.max_overshoot,
+        "max_undershoot": result.max_undershoot,
+        "proven_optimal": result.proven_optimal,
+        "gap": result.gap,
+        "counts": {cat.name: counts for cat, counts in result.counts_dict.items()},
+        "assignments": {
+            cat.name: {
+                day: [list(pair) for pair in pairs]
+                for day, pairs in assignment.assignments.items()
+            }
+            for cat, assignment in assignments.items()
+        },
+        "total_overlap": {
+            cat.name: assignment.total_overlap
+            for cat, assignment in assignments.items()
+        },
+        "metrics": {
+            "coverage": result.metrics.to_dict() if result.metrics else None,
+            "assignment": {
+                cat.name: assignment.metrics.to_dict() if assignment.metrics else None
+                for cat, assignment in assignments.items()
+            },
+        },
+    }
+
+
+def plan_rows(assignments: Assignments) -> List[Dict[str, Any]]:
+    """One row per superset of the day assignments (the CSV report)"""
+    return [
+        {
+            "category": cat.name,
+            "day": d + 1,
+            "superset": s + 1,
+            "exercise_1": pair[0],
+            "exercise_2": pair[1],
+        }
+        for cat, assignment in assignments.items()
+        for d, pairs in enumerate(assignment.assignments.values())
+        for s, pair in enumerate(pairs)
+    ]
+
+
+# -----------------------
+# Markdown
+# -----------------------
+def plan_markdown(
+    solver: "PlanSolver", result: "CoverageResult", assignments: Assignments
+) -> str:
+    """
+    The full text report: status, counts, pairs, coverage vs targets,
+    objective, settings and the day assignment tables
+    """
+    lines = [f"Solver status: {result.status}"]
+    if not result.feasible:
+        lines.append("No feasible solution found.")
+        return "\n".join(lines) + "\n"
+
+    lines.append("\n=== COUNTS ===")
+    for cat in result.counts_dict:
+        lines.append(
+            f"{cat.name.replace('_', ' ')} counts ({solver.day_requirements[cat]} instances, "
+            f"{solver.pairs_per_category[cat]} supersets over {solver.days_per_category[cat]} days "
+            f"at {solver.pairs_per_day[cat]}/day):"
+        )
+        for k, v in sorted(result.counts_dict[cat].items(), key=lambda x: -x[1]):
+            lines.append(f"  {k:40s} : {v}")
+        lines.append("")
+
+    lines.append("\n=== EXPANDED PAIRS ===")
+    for cat in result.pairs_dict:
+        lines.append(
+            f"{cat.name.replace('_', ' ')} expanded pairs ({solver.pairs_per_category[cat]} total supersets):"
+        )
+        for i, pair in enumerate(result.pairs_dict[cat], start=1):
+            lines.append(f" Pair {i:2d}: {pair[0]}  +  {pair[1]}")
+        lines.append("")
+
+    targets = solver.muscle_targets
+    lines.append("\n=== COVERAGE vs TARGETS (sets/week) ===")
+    for m, covered in result.coverage.items():
+        target = targets[m]
+        pct_dev = (covered - target) / target * 100 if target > 0 else 0.0
+        lines.append(
+            f"  {m.name:20s} target {target:4.1f}   covered {covered:6.2f}   "
+            f"diff {covered-target:6.2f}   %dev {pct_dev:6.1f}%"
+        )
+
+    mult = solver.undershoot_weight_multiplier
+    lines.append(
+        f"\nObjective = {solver.deviation_sum_weight} * (sum_overshoot({result.sum_overshoot_deviations:.2f}) "
+        f"+ {mult} * sum_undershoot({result.sum_undershoot_deviations:.2f})) "
+        f"+ max_overshoot({result.max_overshoot:.2f}) + {mult} * max_undershoot({result.max_undershoot:.2f}) "
+        f"= {result.objective_value:.2f} sets"
+    )
+
+    lines.append(f"\nNote: THRESHOLD = {solver.threshold}")
+    lines.append("SETS_PER_INSTANCE:")
+    for cat, val in solver.sets_per_instance.items():
+        lines.append(f"  {cat.name}: {val}")
+
+    for cat, assignment in assignments.items():
+        category_name = cat.name.lower()
+        if assignment.feasible:
+            lines.append(
+                f"{category_name} assignment minimizes total muscular overlaps between pairs "
+                f"on same days (total overlap: {assignment.total_overlap:.2f})."
+            )
+        else:
+            lines.append(f"{category_name} assignment failed.")
+
+    lines.append("\n=== ASSIGNMENT ===\n")
+    return "\n".join(lines) + "\n" + workout_plan_markdown(assignments)
+
+
+def workout_plan_markdown(assignments: Assignments) -> str:
+    """The '## Workout Plan' section: one table of supersets per category"""
+    lines = ["## Workout Plan", ""]
+    for cat, assignment in assignments.items():
+        if not assignment.assignments:
+            continue
+        cat_name = cat.name.replace("_", " ")
+        pairs_per_day = len(next(iter(assignment.assignments.values())))
+        lines.append(f"### {cat_name} Days:")
+        lines.append(
+            "| Workout Type | "
+            + " | ".join(f"Superset {j + 1}" for j in range(pairs_per_day))
+            + " |"
+        )
+        lines.append("|" + "|".join(["---"] * (pairs_per_day + 1)) + "|")
+        for i, pairs in enumerate(assignment.assignments.values()):
+            supersets = [f"{pair[0]}<br>{pair[1]}" for pair in pairs]
+            lines.append(f"| {cat_name} {i + 1} | " + " | ".join(supersets) + " |")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------
+# Rendering and writing
+# -----------------------
+def render(
+    fmt: str, solver: "PlanSolver", result: "CoverageResult", assignments: Assignments
+) -> str:
+    """A plan as 'md' (the text report), 'json' (plan_record) or 'csv' (plan_rows)"""
+    if fmt == "md":
+        return plan_markdown(solver, result, assignments)
+    if fmt == "json":
+        return json.dumps(plan_record(result, assignments), indent=2) + "\n"
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(
+            buffer,
+            ["category", "day", "superset", "exercise_1", "exercise_2"],
+            lineterminator="\n",
+        )
+        writer.writeheader()
+        writer.writerows(plan_rows(assignments))
+        return buffer.getvalue()
+    raise ValueError(f"Unknown report format {fmt!r}, expected one of {REPORT_FORMATS}")
+
+
+def report_format(path: str) -> str:
+    """Report format from a file extension (.md, .json, .csv; anything else: md)"""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return ext if ext in REPORT_FORMATS else "md"
+
+
+def write_text(path: str, text: str) -> None:
+    """Write a rendered report in one UTF-8 write ('\\n' line endings on every platform)"""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+
+
+# -----------------------
+# Streaming records
+# -----------------------
+class RecordWriter:
+    """
+    Writes one record per call as it arrives (batch runs): JSON lines, or CSV
+    with one column per field and nested values as JSON cells. CSV columns are
+    `fields`, or the keys of the first record (missing keys are left empty,
+    extra keys dropped).
+    """
+
+    def __init__(
+        self, out: IO[str], fmt: str = "jsonl", fields: Optional[List[str]] = None
+    ) -> None:
+        if fmt not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format {fmt!r}, expected one of {RECORD_FORMATS}")
+        self.out = out
+        self.fmt = fmt
+        self.fields = fields
+        self._csv: Optional[csv.DictWriter] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self.fmt == "jsonl":
+            self.out.write(json.dumps(record) + "\n")
+        else:
+            row = {
+                key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                for key, value in record.items()
+            }
+            if self._csv is None:
+                self._csv = csv.DictWriter(
+                    self.out,
+                    self.fields or list(row),
+                    extrasaction="ignore",
+                    lineterminator="\n",
+                )
+                self._csv.writeheader()
+            self._csv.writerow(row)
+        self.out.flush()
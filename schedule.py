@@ -0,0 +1,214 @@
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from solve import AssignmentResult, DayCategory, Muscle, MUSCLE_INDEX, PlanSolver
+
+WEEK_HOURS = 168.0
+MuscleKey = Union[Muscle, str]
+
+
+@dataclass
+class PlanSchedule:
+    """
+    A solved week laid out as timed sessions, with the derived loads
+    precomputed as arrays so queries are indexing only.
+
+    categories / labels: Category and day label of each of the S sessions, in week order
+    hours: Start of each session in hours from the start of the week (S,)
+    load: Sets per muscle of each session (S x M)
+    daily_load: Sets per muscle of each calendar day (7 x M)
+    back_to_back: Per pair of consecutive calendar days (d, d+1, wrapping to the
+        next week), the sets per muscle trained on both: min of their loads (7 x M)
+    recovery: Hours since the previous session training each muscle, at the
+        sessions that train it (wrapping around the week; NaN elsewhere) (S x M)
+    min_recovery: Shortest such gap per muscle (M; NaN if untrained)
+    peak_daily_load: Highest sets of a calendar day per muscle (M)
+    weekly_load: Sets per muscle over the week, the plan's coverage (M)
+    min_sets: Sets of a muscle a session needs to count as training it
+    """
+
+    categories: List[DayCategory]
+    labels: List[str]
+    hours: np.ndarray
+    load: np.ndarray
+    daily_load: np.ndarray
+    back_to_back: np.ndarray
+    recovery: np.ndarray
+    min_recovery: np.ndarray
+    peak_daily_load: np.ndarray
+    weekly_load: np.ndarray
+    min_sets: float = 0.5
+
+    @classmethod
+    def build(
+        cls,
+        solver: PlanSolver,
+        assignments: Dict[DayCategory, AssignmentResult],
+        hours: Optional[Sequence[float]] = None,
+        order: Optional[Sequence[Tuple[DayCategory, int]]] = None,
+        min_sets: float = 0.5,
+    ) -> "PlanSchedule":
+        """
+        Lay out the day assignments as sessions.
+
+        order: (category, day index) of the sessions in week order; by default
+            each category's days are spread evenly over the week and
+            interleaved (in category order where they coincide)
+        hours: Session start hours in that order; by default evenly spaced
+            over the week
+        """
+        days = {
+            cat: list(assignment.assignments.items())
+            for cat, assignment in assignments.items()
+            if assignment.assignments
+        }
+        if order is None:
+            cat_order = {cat: k for k, cat in enumerate(DayCategory)}
+            order = sorted(
+                ((cat, d) for cat, cat_days in days.items() for d in range(len(cat_days))),
+                key=lambda s: ((s[1] + 0.5) / len(days[s[0]]), cat_order[s[0]]),
+            )
+        S = len(order)
+        if hours is None:
+            hours = [k * WEEK_HOURS / S for k in range(S)]
+        if len(hours) != S:
+            raise ValueError(f"{len(hours)} session hours for {S} sessions")
+
+        index = solver.exercise_index
+        load = np.zeros((S, solver.M))
+        labels: List[str] = []
+        for s, (cat, d) in enumerate(order):
+            label, pairs = days[cat][d]
+            exercises = [index[name] for pair in pairs for name in pair]
+            load[s] = solver.sets_per_instance[cat] * solver.vec[exercises].sum(axis=0)
+            labels.append(label)
+        return cls.from_arrays(
+            [cat for cat, _ in order], labels, np.asarray(hours, dtype=float), load, min_sets
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        categories: List[DayCategory],
+        labels: List[str],
+        hours: np.ndarray,
+        load: np.ndarray,
+        min_sets: float = 0.5,
+    ) -> "PlanSchedule":
+        """Precompute the derived arrays from session hours and loads"""
+        by_time = np.argsort(hours, kind="stable")
+        hours, load = hours[by_time], load[by_time]
+        categories = [categories[s] for s in by_time]
+        labels = [labels[s] for s in by_time]
+
+        day = (hours // 24).astype(int) % 7
+        daily_load = np.zeros((7, load.shape[1]))
+        np.add.at(daily_load, day, load)
+        back_to_back = np.minimum(daily_load, np.roll(daily_load, -1, axis=0))
+
+        # Time of the previous training session per muscle: the last hit
+        # before each row (forward fill), wrapping to last week's last hit
+        hit = load >= min_sets
+        times = np.where(hit, hours[:, None], -np.inf)
+        last = np.maximum.accumulate(times, axis=0)
+        previous = np.vstack([np.full((1, load.shape[1]), -np.inf), last[:-1]])
+        wrapped = np.where(np.isfinite(last[-1]), last[-1] - WEEK_HOURS, -np.inf)
+        previous = np.where(np.isfinite(previous), previous, wrapped)
+        recovery = np.where(hit, hours[:, None] - previous, np.nan)
+        min_recovery = np.fmin.reduce(recovery, axis=0, initial=np.nan)
+        return cls(
+            categories,
+            labels,
+            hours,
+            load,
+            daily_load,
+            back_to_back,
+            recovery,
+            min_recovery,
+            daily_load.max(axis=0),
+            load.sum(axis=0),
+            min_sets,
+        )
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    @staticmethod
+    def muscle_index(muscle: MuscleKey) -> int:
+        return MUSCLE_INDEX[Muscle[muscle] if isinstance(muscle, str) else muscle]
+
+    def sessions_training(self, muscle: MuscleKey) -> np.ndarray:
+        """Indices of the sessions training a muscle"""
+        return np.flatnonzero(~np.isnan(self.recovery[:, self.muscle_index(muscle)]))
+
+    def hours_between(self, muscle: MuscleKey) -> np.ndarray:
+        """Hours between consecutive sessions training a muscle (one per session, wrapping)"""
+        column = self.recovery[:, self.muscle_index(muscle)]
+        return column[~np.isnan(column)]
+
+    def muscles_below_recovery(self, hours: float) -> List[Muscle]:
+        """Muscles trained again within fewer than `hours` hours"""
+        short = np.flatnonzero(self.min_recovery < hours)
+        return [list(Muscle)[m] for m in short]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable arrays (muscle columns in Muscle order, NaN as None)"""
+
+        def clean(array: np.ndarray) -> Any:
+            return np.where(np.isnan(array), None, np.round(array, 4)).tolist()
+
+        return {
+            "muscles": [m.name for m in Muscle],
+            "sessions": [
+                {"category": cat.name, "label": label, "hour": float(hour)}
+                for cat, label, hour in zip(self.categories, self.labels, self.hours)
+            ],
+            "load": clean(self.load),
+            "daily_load": clean(self.daily_load),
+            "back_to_back": clean(self.back_to_back),
+            "min_recovery": clean(self.min_recovery),
+            "peak_daily_load": clean(self.peak_daily_load),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Solve a plan and print its per-muscle daily load and recovery windows"
+    )
+    parser.add_argument("config", nargs="?", default="config.json")
+    parser.add_argument(
+        "--hours", default=None, help="comma-separated session start hours, in week order"
+    )
+    parser.add_argument("--min-sets", type=float, default=0.5)
+    parser.add_argument("--json", action="store_true", help="print the arrays as JSON")
+    args = parser.parse_args()
+
+    solver = PlanSolver.from_path(args.config)
+    result = solver.solve_coverage()
+    if not result.feasible:
+        sys.exit(f"No feasible plan: {result.status}")
+    hours = [float(h) for h in args.hours.split(",")] if args.hours else None
+    schedule = PlanSchedule.build(solver, solver.assign_days(result), hours, min_sets=args.min_sets)
+
+    if args.json:
+        print(json.dumps(schedule.to_dict(), indent=2))
+        return
+    for cat, label, hour in zip(schedule.categories, schedule.labels, schedule.hours):
+        print(f"  {hour:6.1f} h  {cat.name:12s} {label}")
+    print(f"\n  {'muscle':20s} {'weekly':>7s} {'peak/day':>9s} {'min rest h':>11s}")
+    for m, muscle in enumerate(Muscle):
+        rest = schedule.min_recovery[m]
+        rest_text = "-" if np.isnan(rest) else f"{rest:.1f}"
+        print(
+            f"  {muscle.name:20s} {schedule.weekly_load[m]:7.2f} "
+            f"{schedule.peak_daily_load[m]:9.2f} {rest_text:>11s}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from batch import _init_worker, solve_profile
+from cache import SolveCache, canonical_hash
+from shared import SharedCatalog
+from solve import ASSIGNMENT_METHODS, PlanSolver, merge_config
+
+MAX_BODY_BYTES = 1 << 20
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# -----------------------
+# Jobs
+# -----------------------
+@dataclass
+class Job:
+    """
+    One plan request.
+
+    id: Job id returned to clients
+    key: Hash of the effective config, timeout and assignment method
+        (identical in-flight requests share the job)
+    status: 'queued', 'running' or 'done' (the record's own status tells
+        whether the solve succeeded)
+    record: batch.solve_profile() record (with the Markdown report) once done
+    submissions: Requests answered with this job (1 + deduplicated ones)
+    """
+
+    id: str
+    key: str
+    config: Optional[Dict[str, Any]]
+    overrides: Dict[str, Any]
+    timeout: Optional[float]
+    assignment_method: str
+    submitted: float
+    status: str = "queued"
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    record: Optional[Dict[str, Any]] = None
+    submissions: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "submissions": self.submissions,
+            "wait_s": (self.started or time.monotonic()) - self.submitted,
+            "run_s": (self.finished or time.monotonic()) - self.started
+            if self.started is not None
+            else None,
+            "result": self.record,
+        }
+
+
+# -----------------------
+# Service
+# -----------------------
+class PlanService:
+    """
+    Plan jobs solved on a bounded process pool behind an asyncio HTTP server.
+
+    Requests go to a bounded queue (full: 503 with Retry-After) and are run by
+    `workers` dispatcher tasks, one solver process each, so the event loop never
+    waits on a solve and at most `workers` solves run at once. A request whose
+    effective config, timeout and assignment method match a queued or running
+    job gets that job's id instead of a new job. Finished jobs are kept for
+    polling, the oldest dropped beyond max_results.
+
+    timeout: Default (and maximum) solver seconds per job
+    """
+
+    def __init__(
+        self,
+        base: PlanSolver,
+        workers: int = 2,
+        max_queue: int = 64,
+        timeout: Optional[float] = None,
+        assignment_method: str = "exact",
+        max_results: int = 1000,
+    ) -> None:
+        self.base = base
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.assignment_method = assignment_method
+        self.max_results = max_results
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.in_flight: Dict[str, Job] = {}
+        self.running = 0
+        self.counters = {
+            "submitted": 0,
+            "accepted": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+        }
+        self.wait_s = 0.0
+        self.run_s = 0.0
+        self.queue: Optional["asyncio.Queue[Job]"] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: list = []
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue(self.max_queue)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.base,)
+        )
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # -----------------------
+    # Submission
+    # -----------------------
+    def submit(self, body: Dict[str, Any]) -> Tuple[Job, bool]:
+        """
+        Queue a request {"config": full config (optional), "overrides": {...},
+        "timeout": seconds, "assignment_method": 'exact'|'heuristic'}:
+        (job, whether it joined an identical in-flight job)
+        """
+        assert self.queue is not None, "service not started"
+        config = body.get("config")
+        overrides = body.get("overrides", {})
+        if config is not None and not isinstance(config, dict):
+            raise HTTPError(400, "'config' must be an object")
+        if not isinstance(overrides, dict):
+            raise HTTPError(400, "'overrides' must be an object")
+        method = body.get("assignment_method", self.assignment_method)
+        if method not in ASSIGNMENT_METHODS:
+            raise HTTPError(400, f"'assignment_method' must be one of {ASSIGNMENT_METHODS}")
+        timeout = body.get("timeout", self.timeout)
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise HTTPError(400, "'timeout' must be a positive number")
+            if self.timeout is not None:
+                timeout = min(timeout, self.timeout)
+
+        self.counters["submitted"] += 1
+        effective = merge_config(config if config is not None else self.base.config, overrides)
+        key = canonical_hash("job", {"config": effective, "timeout": timeout, "method": method})
+        job = self.in_flight.get(key)
+        if job is not None:
+            job.submissions += 1
+            self.counters["deduplicated"] += 1
+            return job, True
+
+        job = Job(uuid.uuid4().hex, key, config, overrides, timeout, method, time.monotonic())
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise HTTPError(503, "queue full, retry later") from None
+        self.counters["accepted"] += 1
+        self.in_flight[key] = job
+        self.jobs[job.id] = job
+        self._trim()
+        return job, False
+
+    def _trim(self) -> None:
+        """Drop the oldest finished jobs beyond max_results"""
+        finished = len(self.jobs) - len(self.in_flight)
+        for job_id in list(self.jobs):
+            if finished <= self.max_results:
+                break
+            if self.jobs[job_id].status == "done":
+                del self.jobs[job_id]
+                finished -= 1
+
+    async def _dispatch(self) -> None:
+        assert self.queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status, job.started = "running", time.monotonic()
+            self.running += 1
+            try:
+                job.record = await loop.run_in_executor(
+                    self.pool,
+                    solve_profile,
+                    job.id,
+                    job.overrides,
+                    job.timeout,
+                    job.assignment_method,
+                    job.config,
+                    True,
+                )
+            except Exception as exc:  # e.g. a worker process died
+                job.record = {"id": job.id, "status": "Error", "error": repr(exc)}
+            finally:
+                self.running -= 1
+                job.status, job.finished = "done", time.monotonic()
+                self.in_flight.pop(job.key, None)
+                self.queue.task_done()
+            self.counters["failed" if job.record["status"] == "Error" else "completed"] += 1
+            self.wait_s += job.started - job.submitted
+            self.run_s += job.finished - job.started
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, running solves, request counters and mean wait/run seconds"""
+        done = self.counters["completed"] + self.counters["failed"]
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "workers": self.workers,
+            "in_flight": len(self.in_flight),
+            "jobs_stored": len(self.jobs),
+            **self.counters,
+            "mean_wait_s": self.wait_s / done if done else 0.0,
+            "mean_run_s": self.run_s / done if done else 0.0,
+        }
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """One HTTP/1.1 request per connection"""
+        try:
+            try:
+                method, target, headers, body = await read_request(reader)
+                status, content_type, payload = self.route(method, target, headers, body)
+                extra = {}
+            except HTTPError as exc:
+                status, content_type = exc.status, "application/json"
+                payload = json.dumps({"error": str(exc)})
+                extra = {"Retry-After": "1"} if exc.status == 503 else {}
+            await write_response(writer, status, content_type, payload, extra)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def route(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, str, str]:
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["jobs"]:
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as exc:  # JSONDecodeError, or a body that is not UTF-8
+                raise HTTPError(400, f"invalid JSON: {exc}") from None
+            if not isinstance(request, dict):
+                raise HTTPError(400, "request must be a JSON object")
+            job, deduplicated = self.submit(request)
+            return 202, "application/json", json.dumps(
+                {"id": job.id, "status": job.status, "deduplicated": deduplicated}
+            )
+        if method != "GET":
+            raise HTTPError(405, "use GET")
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(404, f"unknown job {parts[1]}")
+            query = parse_qs(url.query)
+            markdown = query.get("format") == ["markdown"] or "text/markdown" in headers.get(
+                "accept", ""
+            )
+            if job.status != "done":
+                return 202, "application/json", json.dumps(job.to_dict())
+            if markdown and "markdown" in job.record:
+                return 200, "text/markdown; charset=utf-8", job.record["markdown"]
+            record = {k: v for k, v in job.record.items() if k != "markdown"}
+            return 200, "application/json", json.dumps({**job.to_dict(), "result": record})
+        if parts == ["metrics"]:
+            return 200, "application/json", json.dumps(self.metrics())
+        if parts == ["health"]:
+            return 200, "application/json", json.dumps({"status": "ok"})
+        raise HTTPError(404, f"no route {url.path}")
+
+
+async def read_request(
+    reader: asyncio.StreamReader,
+) -> Tuple[str, str, Dict[str, str], bytes]:
+    """(method, target, lower-cased headers, body) of one request"""
+    line = (await reader.readline()).decode("latin-1").strip()
+    try:
+        method, target, _ = line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+async def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    content_type: str,
+    payload: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    data = payload.encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(data)}",
+        "Connection: close",
+        *(f"{name}: {value}" for name, value in (headers or {}).items()),
+    ]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+    await writer.drain()
+
+
+# -----------------------
+# Command line
+# -----------------------
+async def serve(service: PlanService, host: str, port: int) -> None:
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving plans on http://{host}:{port} ({service.workers} workers)", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP service for plan jobs")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="solver processes")
+    parser.add_argument("--max-queue", type=int, default=64, help="queued jobs before 503")
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="default and maximum seconds per job"
+    )
+    parser.add_argument(
+        "--assignment-method", default="exact", choices=["exact", "heuristic"]
+    )
+    parser.add_argument("--cache", default=None, help="SQLite solve cache file")
+    parser.add_argument(
+        "--shared", action="store_true", help="workers attach to one shared exercise table"
+    )
+    args = parser.parse_args()
+
+    cache = SolveCache(args.cache) if args.cache else None
+    catalog = SharedCatalog.from_path(args.config) if args.shared else None
+    service = PlanService(
+        catalog.solver(cache) if catalog else PlanSolver.from_path(args.config, cache),
+        workers=args.workers,
+        max_queue=args.max_queue,
+        timeout=args.timeout,
+        assignment_method=args.assignment_method,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if catalog is not None:
+            catalog.close()
+
+
+if __name__ == "__main__":
+    main()
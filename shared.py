@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache import SolveCache, canonical_hash
+from metrics import MetricsHook
+from solve import DayCategory, Equipment, ExerciseTable, Muscle, PairIndex, PlanSolver
+
+SHARED_LAYOUT_VERSION = 1
+STAMP_BYTES = 64  # hex SHA-256 at the start of every block
+ALIGN = 64
+
+# Blocks attached by this process, kept open for the lifetime of the views into them
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def catalog_stamp(config: Dict[str, Any]) -> str:
+    """
+    Version stamp of everything a shared block holds: the exercises, the
+    threshold of its compatible pairs, the muscle/equipment/category names and
+    the block layout. Any change to these in config.json gives a new stamp.
+    """
+    return canonical_hash(
+        "shared_catalog",
+        {
+            "version": SHARED_LAYOUT_VERSION,
+            "exercises": config["exercises"],
+            "threshold": config["threshold"],
+            "enums": [list(enum.__members__) for enum in (Muscle, Equipment, DayCategory)],
+        },
+    )
+
+
+@dataclass(frozen=True)
+class SharedCatalogSpec:
+    """
+    What a process needs to attach to a shared block (small and picklable).
+
+    name: Shared memory block name (derived from the stamp)
+    stamp: catalog_stamp of the config the block was built from
+    config: That config
+    names: Exercise names (row order of the arrays)
+    layout: Per array, (byte offset, shape, dtype)
+    """
+
+    name: str
+    stamp: str
+    config: Dict[str, Any]
+    names: List[str]
+    layout: Dict[str, Tuple[int, Tuple[int, ...], str]]
+
+
+def _arrays(solver: PlanSolver) -> Dict[str, np.ndarray]:
+    table = solver.table
+    arrays = {
+        "activations": table.activations,
+        "equipment_mask": table.equipment_mask,
+        "category_mask": table.category_mask,
+        "usage_limits": table.usage_limits,
+        "w": solver.w,
+    }
+    for cat in DayCategory:
+        arrays[f"pairs_{cat.name}"] = np.array(
+            solver.compatible_pairs[cat], dtype=np.int32
+        ).reshape(-1, 2)
+    return arrays
+
+
+def _views(buf: memoryview, spec: SharedCatalogSpec) -> Dict[str, np.ndarray]:
+    views = {}
+    for key, (offset, shape, dtype) in spec.layout.items():
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset)
+        view.flags.writeable = False
+        views[key] = view
+    return views
+
+
+class SharedCatalog:
+    """
+    The exercise table, overlap matrix W and compatible pairs of a solver in
+    one shared memory block, built once for every worker process to attach to
+    read-only (attach_solver) instead of recomputing them.
+
+    The block is named after the catalog stamp: a process building the same
+    catalog while a block for it exists attaches to that block, and a changed
+    config.json gets a new one. The creating process owns the block and
+    removes it on close().
+    """
+
+    def __init__(self, solver: PlanSolver) -> None:
+        stamp = catalog_stamp(solver.config)
+        arrays = _arrays(solver)
+        layout: Dict[str, Tuple[int, Tuple[int, ...], str]] = {}
+        offset = STAMP_BYTES
+        for key, array in arrays.items():
+            offset = -(-offset // ALIGN) * ALIGN
+            layout[key] = (offset, array.shape, array.dtype.str)
+            offset += array.nbytes
+        self.spec = SharedCatalogSpec(
+            f"wp_{stamp[:24]}", stamp, solver.config, list(solver.exercise_names), layout
+        )
+
+        try:
+            self.block = shared_memory.SharedMemory(self.spec.name, create=True, size=max(offset, 1))
+            self.owner = True
+        except FileExistsError:
+            self.block = _attach(self.spec, untrack=True)
+            self.owner = False
+            return
+        for key, view in _views(self.block.buf, self.spec).items():
+            view.flags.writeable = True
+            view[...] = arrays[key]
+        self.block.buf[:STAMP_BYTES] = stamp.encode("ascii")
+        _ATTACHED[self.spec.name] = self.block
+
+    @classmethod
+    def from_path(cls, path: str = "config.json") -> "SharedCatalog":
+        """Shared block of a JSON config or compiled snapshot"""
+        return cls(PlanSolver.from_path(path))
+
+    @property
+    def nbytes(self) -> int:
+        return self.block.size
+
+    def stale(self, config: Dict[str, Any]) -> bool:
+        """The config no longer matches the block (rebuild with a new SharedCatalog)"""
+        return catalog_stamp(config) != self.spec.stamp
+
+    def solver(
+        self,
+        cache: Optional[SolveCache] = None,
+        metrics_hook: Optional[MetricsHook] = None,
+    ) -> "SharedPlanSolver":
+        return attach_solver(self.spec, cache, metrics_hook)
+
+    def close(self) -> None:
+        """Detach, and remove the block if this catalog created it"""
+        if self.owner:
+            self.block.unlink()
+        _ATTACHED.pop(self.spec.name, None)
+        # Views handed out earlier may still reference the buffer; the mapping
+        # is released when they are gone
+        try:
+            self.block.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "SharedCatalog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _attach(spec: SharedCatalogSpec, untrack: bool = False) -> shared_memory.SharedMemory:
+    """
+    Open a block by name. Attaching registers it with this process's resource
+    tracker, which removes it once every process using that tracker exited.
+    Workers started by the owner share its tracker, so that is harmless;
+    untrack is for processes with their own tracker (another deployment).
+    """
+    block = _ATTACHED.get(spec.name)
+    if block is None:
+        block = shared_memory.SharedMemory(spec.name)
+        if untrack:
+            resource_tracker.unregister(block._name, "shared_memory")
+        _ATTACHED[spec.name] = block
+    stamp = bytes(block.buf[:STAMP_BYTES]).decode("ascii")
+    if stamp != spec.stamp:
+        raise ValueError(f"Shared block {spec.name}: stamp {stamp[:12]}, expected {spec.stamp[:12]}")
+    return block
+
+
+class SharedPlanSolver(PlanSolver):
+    """
+    A PlanSolver whose exercise table, W and compatible pairs are read-only
+    views into a shared block. It pickles as its spec and config, so worker
+    processes receiving it (e.g. as a pool initializer argument) attach to
+    the block instead of copying the arrays.
+    """
+
+    spec: SharedCatalogSpec
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (attach_solver, (self.spec, self.cache, self.metrics_hook, self.config))
+
+    def __copy__(self) -> "SharedPlanSolver":
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+
+def attach_solver(
+    spec: SharedCatalogSpec,
+    cache: Optional[SolveCache] = None,
+    metrics_hook: Optional[MetricsHook] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> SharedPlanSolver:
+    """
+    Solver on a shared block, in the owner or a process it started (other
+    processes attach with SharedCatalog). config: the spec's config with other
+    tunables (same exercises); a different threshold recomputes the compatible
+    pairs from the shared W in this process.
+    """
+    views = _views(_attach(spec).buf, spec)
+    table = ExerciseTable(
+        list(spec.names),
+        views["activations"],
+        views["equipment_mask"],
+        views["category_mask"],
+        views["usage_limits"],
+    )
+    config = spec.config if config is None else config
+    pairs: Optional[PairIndex] = None
+    if config["threshold"] == spec.config["threshold"]:
+        pairs = {}
+        for cat in DayCategory:
+            stored = views[f"pairs_{cat.name}"]
+            pairs[cat] = list(zip(stored[:, 0].tolist(), stored[:, 1].tolist()))
+    solver = SharedPlanSolver(config, cache, metrics_hook, table, pairs, views["w"])
+    solver.spec = spec
+    return solver
@@ -0,0 +1,287 @@
+import argparse
+import json
+import sys
+from numbers import Real
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backends import SolverSettings
+from cache import SolveCache, canonical_hash
+from metrics import MetricsHook
+from solve import (
+    DayCategory,
+    Equipment,
+    ExerciseTable,
+    Muscle,
+    PairIndex,
+    PlanSolver,
+    load_config,
+    parse_exercises,
+)
+
+SNAPSHOT_VERSION = 1
+REQUIRED_KEYS = (
+    "exercises",
+    "muscle_targets",
+    "sets_per_instance",
+    "supersets_per_day",
+    "days_per_category",
+    "threshold",
+    "deviation_sum_weight",
+    "undershoot_weight_multiplier",
+)
+CATEGORY_KEYS = ("sets_per_instance", "supersets_per_day", "days_per_category")
+EXERCISE_KEYS = ("categories", "activations", "equipments", "usage_limit_per_category")
+
+
+class ConfigError(ValueError):
+    """A config failed validation; problems lists every issue found"""
+
+    def __init__(self, problems: List[str]) -> None:
+        super().__init__(
+            f"{len(problems)} config problem(s):\n" + "\n".join(f"  - {p}" for p in problems)
+        )
+        self.problems = problems
+
+
+# -----------------------
+# Validation
+# -----------------------
+def _number(value: Any, minimum: float = 0.0) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool) and value >= minimum
+
+
+def _integer(value: Any, minimum: int = 0) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+
+def _names(values: Any, enum: Any, where: str, problems: List[str]) -> None:
+    for name in values:
+        if name not in enum.__members__:
+            problems.append(f"{where}: unknown {enum.__name__} {name!r}")
+
+
+def _missing(values: Dict[str, Any], enum: Any, where: str, problems: List[str]) -> None:
+    missing = [name for name in enum.__members__ if name not in values]
+    if missing:
+        problems.append(f"{where}: missing {enum.__name__} {', '.join(missing)}")
+
+
+def _section(config: Dict[str, Any], key: str, problems: List[str]) -> Dict[str, Any]:
+    """A mapping section of the config ({} if missing, or wrong and reported)"""
+    value = config.get(key, {})
+    if not isinstance(value, dict):
+        problems.append(f"{key}: expected an object, got {value!r}")
+        return {}
+    return value
+
+
+def config_problems(config: Dict[str, Any]) -> List[str]:
+    """
+    Every problem of a raw config that would otherwise fail (or silently
+    misbehave) deep inside a solve: missing keys, unknown muscle / equipment /
+    category names, muscles without a target, categories missing from one of
+    the per-category settings, out-of-range numbers, and categories whose
+    eligible exercises can't fill their days.
+    """
+    problems: List[str] = []
+    missing = [key for key in REQUIRED_KEYS if key not in config]
+    problems.extend(f"missing key {key!r}" for key in missing)
+
+    for key in ("threshold", "deviation_sum_weight", "undershoot_weight_multiplier"):
+        if key in config and not _number(config[key]):
+            problems.append(f"{key}: expected a number >= 0, got {config[key]!r}")
+
+    targets = _section(config, "muscle_targets", problems)
+    _names(targets, Muscle, "muscle_targets", problems)
+    if isinstance(config.get("muscle_targets"), dict):
+        _missing(targets, Muscle, "muscle_targets", problems)
+    for muscle, sets in targets.items():
+        if not _number(sets):
+            problems.append(f"muscle_targets.{muscle}: expected sets >= 0, got {sets!r}")
+
+    for key in CATEGORY_KEYS:
+        values = _section(config, key, problems)
+        _names(values, DayCategory, key, problems)
+        if isinstance(config.get(key), dict):
+            _missing(values, DayCategory, key, problems)
+        if key == "sets_per_instance":
+            check, kind = _number, "a number"
+        else:
+            check, kind = _integer, "an integer"
+        for cat, value in values.items():
+            if not check(value):
+                problems.append(f"{key}.{cat}: expected {kind} >= 0, got {value!r}")
+
+    if "solver" in config and _section(config, "solver", problems):
+        try:
+            SolverSettings.from_config(config)
+        except (TypeError, ValueError) as exc:
+            problems.append(f"solver: {exc}")
+
+    exercises = _section(config, "exercises", problems)
+    if isinstance(config.get("exercises"), dict) and not exercises:
+        problems.append("exercises: no exercises defined")
+    for name, data in exercises.items():
+        where = f"exercises[{name!r}]"
+        if not isinstance(data, dict):
+            problems.append(f"{where}: expected an object, got {data!r}")
+            continue
+        if not isinstance(data.get("activations", {}), dict):
+            problems.append(
+                f"{where}.activations: expected an object, got {data['activations']!r}"
+            )
+            continue
+        missing = [key for key in EXERCISE_KEYS if key not in data]
+        problems.extend(f"{where}: missing key {key!r}" for key in missing)
+        _names(data.get("categories", []), DayCategory, f"{where}.categories", problems)
+        _names(data.get("activations", {}), Muscle, f"{where}.activations", problems)
+        _names(data.get("equipments") or [], Equipment, f"{where}.equipments", problems)
+        for muscle, value in data.get("activations", {}).items():
+            if not _number(value) or value > 1:
+                problems.append(f"{where}.activations.{muscle}: expected 0..1, got {value!r}")
+        if "usage_limit_per_category" in data and not _integer(
+            data["usage_limit_per_category"]
+        ):
+            problems.append(
+                f"{where}.usage_limit_per_category: expected an integer >= 0, "
+                f"got {data['usage_limit_per_category']!r}"
+            )
+    if problems:
+        return problems
+
+    # Category consistency: enough eligible instances for the days
+    for cat_name, days in config["days_per_category"].items():
+        cat = DayCategory[cat_name]
+        instances = 2 * days * config["supersets_per_day"][cat_name]
+        available = sum(
+            min(days, data["usage_limit_per_category"])
+            for data in exercises.values()
+            if cat_name in data["categories"]
+        )
+        if available < instances:
+            problems.append(
+                f"{cat.name}: eligible exercises allow {available} instances, "
+                f"{instances} are required ({days} days)"
+            )
+    return problems
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """Raise ConfigError listing every problem of a raw config"""
+    problems = config_problems(config)
+    if problems:
+        raise ConfigError(problems)
+
+
+# -----------------------
+# Snapshots
+# -----------------------
+def compile_config(config: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """
+    Validate a raw config and write it with its exercise table and compatible
+    pairs to an uncompressed .npz snapshot. Returns a summary
+    (exercises, pairs per category, config hash).
+    """
+    validate_config(config)
+    table = ExerciseTable.from_exercises(parse_exercises(config))
+    pairs = table.compatible_pairs(config["threshold"])
+    problems = [
+        f"{cat.name}: no compatible pairs at threshold {config['threshold']}"
+        for cat in DayCategory
+        if config["days_per_category"].get(cat.name, 0) and not pairs[cat]
+    ]
+    if problems:
+        raise ConfigError(problems)
+
+    config_hash = canonical_hash("config", config)
+    arrays: Dict[str, np.ndarray] = {
+        "version": np.array(SNAPSHOT_VERSION),
+        "config_json": np.frombuffer(json.dumps(config).encode("utf-8"), dtype=np.uint8),
+        "config_hash": np.array(config_hash),
+        "muscles": np.array([m.name for m in Muscle]),
+        "equipments": np.array([eq.name for eq in Equipment]),
+        "categories": np.array([cat.name for cat in DayCategory]),
+        "names": np.array(table.names),
+        "activations": table.activations,
+        "equipment_mask": table.equipment_mask,
+        "category_mask": table.category_mask,
+        "usage_limits": table.usage_limits,
+    }
+    for cat in DayCategory:
+        arrays[f"pairs_{cat.name}"] = np.array(pairs[cat], dtype=np.int32).reshape(-1, 2)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    return {
+        "exercises": len(table.names),
+        "pairs": {cat.name: len(pairs[cat]) for cat in DayCategory},
+        "config_hash": config_hash,
+    }
+
+
+def load_snapshot(
+    path: str,
+    cache: Optional[SolveCache] = None,
+    metrics_hook: Optional[MetricsHook] = None,
+) -> PlanSolver:
+    """
+    PlanSolver from a compiled snapshot: the exercise table and compatible pairs
+    are read as arrays instead of being re-derived from the JSON. Fails if the
+    snapshot was written by another version or for other muscle/equipment/
+    category enums.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["version"])
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: snapshot version {version}, expected {SNAPSHOT_VERSION}")
+        for key, enum in (("muscles", Muscle), ("equipments", Equipment), ("categories", DayCategory)):
+            if data[key].tolist() != list(enum.__members__):
+                raise ValueError(f"{path}: compiled for different {enum.__name__} names, recompile")
+        config = json.loads(data["config_json"].tobytes().decode("utf-8"))
+        table = ExerciseTable(
+            data["names"].tolist(),
+            data["activations"],
+            data["equipment_mask"],
+            data["category_mask"],
+            data["usage_limits"],
+        )
+        pairs: PairIndex = {}
+        for cat in DayCategory:
+            stored = data[f"pairs_{cat.name}"]
+            pairs[cat] = list(zip(stored[:, 0].tolist(), stored[:, 1].tolist()))
+    return PlanSolver(config, cache, metrics_hook, table, pairs)
+
+
+# -----------------------
+# Command line
+# -----------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Validate config.json and compile it to a binary snapshot"
+    )
+    parser.add_argument("config", nargs="?", default="config.json")
+    parser.add_argument("-o", "--out", default=None, help="snapshot path (default: <config>.npz)")
+    parser.add_argument("--check", action="store_true", help="only validate")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    try:
+        if args.check:
+            validate_config(config)
+            print(f"{args.config}: OK", file=sys.stderr)
+            return
+        out = args.out or args.config.rsplit(".", 1)[0] + ".npz"
+        summary = compile_config(config, out)
+    except ConfigError as exc:
+        print(f"{args.config}: {exc}", file=sys.stderr)
+        sys.exit(1)
+    pairs = ", ".join(f"{cat} {n}" for cat, n in summary["pairs"].items())
+    print(
+        f"{out}: {summary['exercises']} exercises, compatible pairs {pairs}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
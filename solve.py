@@ -1,7 +1,27 @@
+import numpy as np
 import pulp
+
+from backends import (
+    IncumbentHook,
+    SolverSettings,
+    make_solver,
+    proven_gap,
+    proven_optimal,
+    solve_statistics,
+)
+from cache import SolveCache, coverage_payload
+from heuristics import heuristic_assignment
+from metrics import MetricsHook, SolveMetrics
+from presolve import PairPresolve, presolve_pairs
+import copy
+import dataclasses
+from collections import Counter
+from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Dict, List, Tuple, Optional, Union, Any, cast
 import json
+import sys
+import time
 
 
 # -----------------------
@@ -122,71 +142,207 @@ EquipmentList = List[Equipment]
 ExerciseData = Tuple[List[DayCategory], MuscleActivation, EquipmentList, int]
 ExerciseDict = Dict[ExerciseName, ExerciseData]
 MuscleTargetDict = Dict[Muscle, float]
-ExerciseVector = List[float]
-ExerciseMatrix = List[List[float]]
+ExerciseVector = np.ndarray
+ExerciseMatrix = np.ndarray
 LpVariableDict = Dict[Any, pulp.LpVariable]
 ExerciseCounts = Dict[ExerciseName, int]
-ExercisePairs = List[Tuple[ExerciseName, ExerciseName]]
+ExercisePair = Tuple[ExerciseName, ExerciseName]
+ExercisePairs = List[ExercisePair]
 DayAssignments = Dict[str, ExercisePairs]
 CoverageDict = Dict[Muscle, float]
+PairIndex = Dict[DayCategory, List[Tuple[int, int]]]
+
 
 # -----------------------
-# Load config
+# Result types
 # -----------------------
-# Load config
-with open("config.json", "r") as f:
-    config = json.load(f)
-
-# Parse tunables
-SETS_PER_INSTANCE: Dict[DayCategory, float] = {
-    DayCategory[cat]: val for cat, val in config["sets_per_instance"].items()
-}
-THRESHOLD: float = config["threshold"]
-DEVIATION_SUM_WEIGHT: float = config["deviation_sum_weight"]
-UNDERSHOOT_WEIGHT_MULTIPLIER: float = config["undershoot_weight_multiplier"]
-PAIRS_PER_DAY = {
-    DayCategory[cat]: val for cat, val in config["supersets_per_day"].items()
-}
-DAYS_PER_CATEGORY = {
-    DayCategory[cat]: val for cat, val in config["days_per_category"].items()
-}
-PAIRS_PER_CATEGORY = {
-    cat: PAIRS_PER_DAY[cat] * DAYS_PER_CATEGORY[cat] for cat in PAIRS_PER_DAY
-}
-DAY_REQUIREMENTS = {cat: PAIRS_PER_CATEGORY[cat] * 2 for cat in PAIRS_PER_CATEGORY}
-
-
-def get_max_usage_for_category(exercise_name: str, cat: DayCategory) -> int:
-    """Get the maximum times an exercise can be used in the given category"""
-    return min(DAYS_PER_CATEGORY[cat], EXERCISES[exercise_name][3])
+@dataclass
+class CoverageResult:
+    """
+    Result of the coverage ILP (pair selection per category).
+
+    status: Solver status ('Optimal', 'Feasible', etc.)
+    counts_dict: Exercise counts per category
+    pairs_dict: Expanded superset pairs per category
+    coverage: Muscle coverage vs targets
+    sum_overshoot_deviations: Sum of overshoot deviations across all muscles (in sets)
+    sum_undershoot_deviations: Sum of undershoot deviations across all muscles (in sets)
+    max_overshoot: Maximum overshoot deviation across muscles (in sets)
+    max_undershoot: Maximum undershoot deviation across muscles (in sets)
+    objective_value: Minimized objective value (weighted sum + weighted max overshoot/undershoot, in sets)
+    proven_optimal: the solver proved optimality (False e.g. when a time limit or a
+        gap_rel / gap_abs target cut the search; only proven results are cached)
+    gap: Proven relative gap of the plan (see backends.proven_gap; None if unknown)
+    metrics: Phase timings and model statistics of the solve
+    """
 
+    status: str
+    counts_dict: Dict[DayCategory, ExerciseCounts]
+    pairs_dict: Dict[DayCategory, ExercisePairs]
+    coverage: CoverageDict
+    sum_overshoot_deviations: float = 0.0
+    sum_undershoot_deviations: float = 0.0
+    max_overshoot: float = 0.0
+    max_undershoot: float = 0.0
+    objective_value: float = 0.0
+    proven_optimal: bool = False
+    gap: Optional[float] = None
+    metrics: Optional[SolveMetrics] = None
+
+    @property
+    def feasible(self) -> bool:
+        return self.status in ("Optimal", "Feasible")
+
+
+@dataclass
+class AssignmentResult:
+    """
+    Result of the day-assignment ILP for one category.
+
+    status: Solver status ('Optimal', 'Feasible', etc.)
+    assignments: Pairs per day label ('Day 0', 'Day 1', ...), empty if the solve failed
+    total_overlap: Total muscular overlap between pairs on the same days
+    proven_optimal: the solver proved optimality (never for the heuristic)
+    gap: Proven relative gap of the assignment (see backends.proven_gap; None if unknown)
+    metrics: Phase timings and model statistics of the solve
+    """
 
-# -----------------------
-# Targets
-# -----------------------
-MUSCLE_TARGETS: MuscleTargetDict = {
-    Muscle[muscle]: target for muscle, target in config["muscle_targets"].items()
-}
+    status: str
+    assignments: DayAssignments
+    total_overlap: float = 0.0
+    proven_optimal: bool = False
+    gap: Optional[float] = None
+    metrics: Optional[SolveMetrics] = None
+
+    @property
+    def feasible(self) -> bool:
+        return self.status in ("Optimal", "Feasible")
 
-EXERCISES: ExerciseDict = {}
-for name, data in config["exercises"].items():
-    cat_list = data["categories"]
-    act_dict = data["activations"]
-    equips_list = data["equipments"]
-    limit = data["usage_limit_per_category"]
-    categories = [DayCategory[cat] for cat in cat_list]
-    activations: Dict[Muscle, float] = {Muscle[m]: val for m, val in act_dict.items()}
-    equipment = [Equipment[m] for m in equips_list] if equips_list else []
-    EXERCISES[name] = (categories, activations, equipment, limit)
 
+ASSIGNMENT_FORMULATIONS = ("compact", "linearized")
+ASSIGNMENT_METHODS = ("exact", "heuristic")
 
-EXERCISE_NAMES: List[ExerciseName] = list(EXERCISES.keys())
-E: int = len(EXERCISE_NAMES)
-M: int = len(Muscle)
+
+@dataclass
+class AssignmentModel:
+    """
+    Day-assignment ILP ready to be solved.
+
+    prob: The pulp problem
+    formulation: One of ASSIGNMENT_FORMULATIONS
+    day_vars: (pair, day, var) triples; each var at 1 puts one copy of pair on that day
+        ('linearized': num_days consecutive entries per pair; 'compact': the
+        copy slots of each type and day, consecutive and in slot order)
+    overlap_vars: (z, x1, x2) triples with z standing for x1 * x2
+    num_days: Number of days assigned to
+    metrics: Timings and statistics collected while building and solving
+    """
+
+    prob: pulp.LpProblem
+    formulation: str
+    day_vars: List[Tuple[ExercisePair, int, pulp.LpVariable]]
+    overlap_vars: List[Tuple[pulp.LpVariable, pulp.LpVariable, pulp.LpVariable]]
+    num_days: int
+    metrics: SolveMetrics = field(default_factory=lambda: SolveMetrics("assignment"))
+
+    def extract(self) -> DayAssignments:
+        """Read the pairs per day from a solved model"""
+        assignments: DayAssignments = {f"Day {d}": [] for d in range(self.num_days)}
+        for pair, d, var in self.day_vars:
+            if safe_value(var) > 0.5:
+                assignments[f"Day {d}"].append(pair)
+        return assignments
+
+    def set_initial(self, assignments: DayAssignments) -> None:
+        """Load a complete assignment as a MIP start (solve with warmStart=True)"""
+        days = [Counter(pairs) for pairs in assignments.values()]
+        if self.formulation == "compact":
+            # Model days are ordered by the lowest type they hold
+            type_index: Dict[ExercisePair, int] = {}
+            for pair, _, _ in self.day_vars:
+                type_index.setdefault(pair, len(type_index))
+            days.sort(key=lambda day: min(type_index[pair] for pair in day))
+            used: Counter = Counter()
+            for pair, d, var in self.day_vars:
+                var.setInitialValue(1 if used[(pair, d)] < days[d][pair] else 0)
+                used[(pair, d)] += 1
+        else:
+            for start in range(0, len(self.day_vars), self.num_days):
+                placed = False
+                for pair, d, var in self.day_vars[start : start + self.num_days]:
+                    take = not placed and days[d][pair] > 0
+                    var.setInitialValue(1 if take else 0)
+                    if take:
+                        days[d][pair] -= 1
+                        placed = True
+        for z, x1, x2 in self.overlap_vars:
+            z.setInitialValue(max(0, round(x1.varValue) + round(x2.varValue) - 1))
+
+
+@dataclass
+class CoverageModel:
+    """
+    Coverage ILP with handles to its variables, kept to re-solve after small edits.
+
+    prob: The pulp problem
+    c: Exercise count variables per category (by exercise index)
+    p: Pair count variables per category (by exercise index pair)
+    overshoot / undershoot: Deviation slacks of the muscles with a positive target
+    max_overshoot / max_undershoot: Maximum deviation slacks
+    presolve: Presolve reductions per category (empty if built without presolve)
+    metrics: Timings and statistics collected while building and solving
+    """
+
+    prob: pulp.LpProblem
+    c: Dict[DayCategory, LpVariableDict]
+    p: Dict[DayCategory, LpVariableDict]
+    overshoot: Dict[Muscle, pulp.LpVariable]
+    undershoot: Dict[Muscle, pulp.LpVariable]
+    max_overshoot: pulp.LpVariable
+    max_undershoot: pulp.LpVariable
+    presolve: Dict[DayCategory, PairPresolve] = field(default_factory=dict)
+    metrics: SolveMetrics = field(default_factory=lambda: SolveMetrics("coverage"))
+
+
+# -----------------------
+# Load config
+# -----------------------
+def load_config(path: str = "config.json") -> Dict[str, Any]:
+    """Read the raw JSON config from disk"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def merge_config(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply overrides to a raw config; dict values (e.g. muscle_targets) are merged key by key"""
+    merged = dict(base)
+    for key, val in overrides.items():
+        if isinstance(val, dict) and isinstance(base.get(key), dict):
+            merged[key] = {**base[key], **val}
+        else:
+            merged[key] = val
+    return merged
+
+
+def parse_exercises(config: Dict[str, Any]) -> ExerciseDict:
+    """Resolve the exercise definitions of a raw config into enum-keyed tuples"""
+    exercises: ExerciseDict = {}
+    for name, data in config["exercises"].items():
+        cat_list = data["categories"]
+        act_dict = data["activations"]
+        equips_list = data["equipments"]
+        limit = data["usage_limit_per_category"]
+        categories = [DayCategory[cat] for cat in cat_list]
+        activations: Dict[Muscle, float] = {
+            Muscle[m]: val for m, val in act_dict.items()
+        }
+        equipment = [Equipment[m] for m in equips_list] if equips_list else []
+        exercises[name] = (categories, activations, equipment, limit)
+    return exercises
 
 
 # -----------------------
-# Helpers: vectors, overlap, allowed-in-category
+# Helpers: vectors, overlap
 # -----------------------
 def safe_value(var: pulp.LpVariable, default: float = 0.0) -> float:
     """Safely extract value from LpVariable, return default if None"""
@@ -196,456 +352,1047 @@ def safe_value(var: pulp.LpVariable, default: float = 0.0) -> float:
     return default
 
 
-def exercise_vector(name: ExerciseName) -> ExerciseVector:
-    vec = [0.0] * M
-    categories, acts, equipment, _ = EXERCISES[name]
-    for m, val in acts.items():
-        if val >= 0.1:
-            vec[MUSCLE_INDEX[m]] = float(val)
-    return vec
+# -----------------------
+# Array-backed exercise table
+# -----------------------
+ACTIVATION_FLOOR = 0.1  # activations below this are ignored to keep the model small
+EQUIPMENT_BIT = {eq: 1 << i for i, eq in enumerate(Equipment)}
+CATEGORY_BIT = {cat: 1 << i for i, cat in enumerate(DayCategory)}
 
 
-def get_exercise_equipment(exercise_name: ExerciseName) -> EquipmentList:
-    """Return list of equipment used by an exercise"""
-    categories, acts, equipment, _ = EXERCISES[exercise_name]
-    return equipment
+@dataclass
+class ExerciseTable:
+    """
+    Exercises as arrays, indexed in config order.
 
+    activations: E x M activation matrix (entries below ACTIVATION_FLOOR zeroed)
+    equipment_mask: E bitmasks, one EQUIPMENT_BIT per equipment used
+    category_mask: E bitmasks, one CATEGORY_BIT per eligible category
+    usage_limits: E usage limits per category
+    """
 
-def has_equipment_conflict(ex1: ExerciseName, ex2: ExerciseName) -> bool:
-    """Check if two exercises share any equipment"""
-    equipment1 = get_exercise_equipment(ex1)
-    equipment2 = get_exercise_equipment(ex2)
-    return bool(set(equipment1) & set(equipment2))
+    names: List[ExerciseName]
+    activations: np.ndarray
+    equipment_mask: np.ndarray
+    category_mask: np.ndarray
+    usage_limits: np.ndarray
+
+    @classmethod
+    def from_exercises(cls, exercises: ExerciseDict) -> "ExerciseTable":
+        names = list(exercises.keys())
+        E = len(names)
+        activations = np.zeros((E, len(Muscle)))
+        equipment_mask = np.zeros(E, dtype=np.int64)
+        category_mask = np.zeros(E, dtype=np.int64)
+        usage_limits = np.zeros(E, dtype=np.int64)
+        for e, name in enumerate(names):
+            categories, acts, equipment, limit = exercises[name]
+            for m, val in acts.items():
+                if val >= ACTIVATION_FLOOR:
+                    activations[e, MUSCLE_INDEX[m]] = float(val)
+            for eq in equipment:
+                equipment_mask[e] |= EQUIPMENT_BIT[eq]
+            for cat in categories:
+                category_mask[e] |= CATEGORY_BIT[cat]
+            usage_limits[e] = limit
+        return cls(names, activations, equipment_mask, category_mask, usage_limits)
+
+    def gram(self) -> ExerciseMatrix:
+        """Pairwise muscle overlap W = A @ A.T"""
+        return self.activations @ self.activations.T
+
+    def muscle_incidence(self) -> List[List[int]]:
+        """Per muscle, the exercises activating it (the nonzeros of each column of A)"""
+        return [np.flatnonzero(column).tolist() for column in self.activations.T]
+
+    def in_category(self, cat: DayCategory) -> np.ndarray:
+        """Boolean mask of exercises eligible for a category"""
+        return (self.category_mask & CATEGORY_BIT[cat]) != 0
+
+    def compatible_pairs(
+        self, threshold: float, w: Optional[ExerciseMatrix] = None
+    ) -> PairIndex:
+        """
+        Allowed superset pairs (i <= j) per category: overlap within threshold,
+        no shared equipment and both exercises eligible for the category.
+        Pairs are listed in row-major order.
+        """
+        if w is None:
+            w = self.gram()
+        eq = self.equipment_mask
+        ok = np.triu((w <= threshold + 1e-9) & ((eq[:, None] & eq[None, :]) == 0))
+        pairs: PairIndex = {}
+        for cat in DayCategory:
+            in_cat = self.in_category(cat)
+            i, j = np.nonzero(ok & in_cat[:, None] & in_cat[None, :])
+            pairs[cat] = list(zip(i.tolist(), j.tolist()))
+        return pairs
 
 
-VEC: ExerciseMatrix = [exercise_vector(n) for n in EXERCISE_NAMES]
+# -----------------------
+# Solver engine
+# -----------------------
+class PlanSolver:
+    """
+    Two-stage plan solver built once from a config and reused across solves.
 
+    Parsing the config and building the exercise vectors and overlap matrix
+    happens in the constructor; solve_coverage() and assign_days() only build
+    and solve the ILPs and return result objects without printing.
 
-def dot(a: ExerciseVector, b: ExerciseVector) -> float:
-    return sum(x * y for x, y in zip(a, b))
+    Every result carries a SolveMetrics; metrics_hook, if set, also receives
+    the metrics of the construction ('setup') and of every solve.
 
+    table / compatible_pairs / w: Precomputed from the same config (a compiled
+    snapshot, see snapshot.py, or a shared block, see shared.py) instead of
+    derived from it
+    """
 
-W: ExerciseMatrix = [[dot(VEC[i], VEC[j]) for j in range(E)] for i in range(E)]
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        cache: Optional[SolveCache] = None,
+        metrics_hook: Optional[MetricsHook] = None,
+        table: Optional[ExerciseTable] = None,
+        compatible_pairs: Optional[PairIndex] = None,
+        w: Optional[ExerciseMatrix] = None,
+    ) -> None:
+        self.config = config
+        self.cache = cache
+        self.metrics_hook = metrics_hook
+        metrics = SolveMetrics("setup")
+
+        with metrics.span("parse_config"):
+            self._parse_tunables(config)
+            self._exercises: Optional[ExerciseDict] = (
+                parse_exercises(config) if table is None else None
+            )
 
+        with metrics.span("exercise_table"):
+            if table is None:
+                table = ExerciseTable.from_exercises(self._exercises)
+            self.table = table
+            self.exercise_names: List[ExerciseName] = list(table.names)
+            self.E: int = len(self.exercise_names)
+            self.M: int = len(Muscle)
+            self.exercise_index: Dict[ExerciseName, int] = {
+                n: i for i, n in enumerate(self.exercise_names)
+            }
+            self.vec: ExerciseMatrix = self.table.activations
+            self.muscle_exercises: List[List[int]] = self.table.muscle_incidence()
+        with metrics.span("overlap_matrix"):
+            self.w: ExerciseMatrix = self.table.gram() if w is None else w
+        with metrics.span("compatible_pairs"):
+            if compatible_pairs is None:
+                compatible_pairs = self.table.compatible_pairs(self.threshold, self.w)
+            self.compatible_pairs: PairIndex = compatible_pairs
+        self.setup_metrics = metrics
+        self.emit_metrics(metrics)
+
+    @classmethod
+    def from_path(
+        cls,
+        path: str = "config.json",
+        cache: Optional[SolveCache] = None,
+        metrics_hook: Optional[MetricsHook] = None,
+    ) -> "PlanSolver":
+        """Solver for a JSON config or a compiled snapshot (.npz)"""
+        if path.endswith(".npz"):
+            from snapshot import load_snapshot
+
+            return load_snapshot(path, cache, metrics_hook)
+        return cls(load_config(path), cache, metrics_hook)
+
+    @property
+    def exercises(self) -> ExerciseDict:
+        """Enum-keyed exercise definitions (parsed on first use when loaded from a snapshot)"""
+        if self._exercises is None:
+            self._exercises = parse_exercises(self.config)
+        return self._exercises
+
+    def emit_metrics(self, metrics: SolveMetrics) -> None:
+        """Pass metrics to the metrics hook, if any"""
+        if self.metrics_hook is not None:
+            self.metrics_hook(metrics)
+
+    def _parse_tunables(self, config: Dict[str, Any]) -> None:
+        self.sets_per_instance: Dict[DayCategory, float] = {
+            DayCategory[cat]: val for cat, val in config["sets_per_instance"].items()
+        }
+        self.threshold: float = config["threshold"]
+        self.deviation_sum_weight: float = config["deviation_sum_weight"]
+        self.undershoot_weight_multiplier: float = config[
+            "undershoot_weight_multiplier"
+        ]
+        self.pairs_per_day: Dict[DayCategory, int] = {
+            DayCategory[cat]: val for cat, val in config["supersets_per_day"].items()
+        }
+        self.days_per_category: Dict[DayCategory, int] = {
+            DayCategory[cat]: val for cat, val in config["days_per_category"].items()
+        }
+        self.pairs_per_category: Dict[DayCategory, int] = {
+            cat: self.pairs_per_day[cat] * self.days_per_category[cat]
+            for cat in self.pairs_per_day
+        }
+        self.day_requirements: Dict[DayCategory, int] = {
+            cat: self.pairs_per_category[cat] * 2 for cat in self.pairs_per_category
+        }
 
-def allowed_in_category(ex_name: str, cat: DayCategory) -> bool:
-    return cat in EXERCISES[ex_name][0]
+        # Targets
+        self.muscle_targets: MuscleTargetDict = {
+            Muscle[muscle]: target
+            for muscle, target in config["muscle_targets"].items()
+        }
 
+        # MIP backend
+        self.solver_settings = SolverSettings.from_config(config)
+
+    def with_overrides(self, overrides: Dict[str, Any]) -> "PlanSolver":
+        """
+        Solver for the same catalog with some config keys replaced (see merge_config).
+        The exercise tables are shared with this solver: a new threshold only
+        recomputes the compatible pairs, and only new exercises force a full rebuild.
+        """
+        config = merge_config(self.config, overrides)
+        if "exercises" in overrides:
+            return PlanSolver(config, self.cache, self.metrics_hook)
+        solver = copy.copy(self)
+        solver.config = config
+        solver._parse_tunables(config)
+        if solver.threshold != self.threshold:
+            solver.compatible_pairs = self.table.compatible_pairs(
+                solver.threshold, self.w
+            )
+        return solver
+
+    # -----------------------
+    # Exercise helpers
+    # -----------------------
+    def get_max_usage_for_category(self, exercise_name: str, cat: DayCategory) -> int:
+        """Get the maximum times an exercise can be used in the given category"""
+        limit = int(self.table.usage_limits[self.exercise_index[exercise_name]])
+        return min(self.days_per_category[cat], limit)
+
+    def exercise_vector(self, name: ExerciseName) -> ExerciseVector:
+        return self.vec[self.exercise_index[name]]
+
+    def get_exercise_equipment(self, exercise_name: ExerciseName) -> EquipmentList:
+        """Return list of equipment used by an exercise"""
+        categories, acts, equipment, _ = self.exercises[exercise_name]
+        return equipment
+
+    def has_equipment_conflict(self, ex1: ExerciseName, ex2: ExerciseName) -> bool:
+        """Check if two exercises share any equipment"""
+        mask = self.table.equipment_mask
+        return bool(mask[self.exercise_index[ex1]] & mask[self.exercise_index[ex2]])
+
+    def allowed_in_category(self, ex_name: str, cat: DayCategory) -> bool:
+        return bool(self.table.category_mask[self.exercise_index[ex_name]] & CATEGORY_BIT[cat])
+
+    # -----------------------
+    # Assignment ILP Helper
+    # -----------------------
+    def pair_overlap_matrix(self, pairs_list: ExercisePairs) -> np.ndarray:
+        """Symmetric P x P overlap between the summed activation vectors of pairs"""
+        first = [self.exercise_index[ex1] for ex1, _ in pairs_list]
+        second = [self.exercise_index[ex2] for _, ex2 in pairs_list]
+        pair_sum_vecs = self.vec[first] + self.vec[second]
+        return pair_sum_vecs @ pair_sum_vecs.T
+
+    def build_assignment_model(
+        self,
+        pairs_list: ExercisePairs,
+        category_name: str,
+        num_days: int,
+        pairs_per_day: int,
+        formulation: str = "compact",
+        metrics: Optional[SolveMetrics] = None,
+    ) -> AssignmentModel:
+        """
+        Build the ILP assigning pairs to days, minimizing same-day overlap.
+        formulation: 'compact' (identical pairs aggregated, day symmetry broken,
+            zero-overlap terms dropped) or 'linearized' (one binary z per day
+            and pair of pairs)
+        metrics: metrics to add the build phase to (a new one by default)
+        """
+        P = len(pairs_list)
+        if P != num_days * pairs_per_day:
+            raise ValueError(
+                f"Number of pairs {P} does not match num_days * pairs_per_day = {num_days * pairs_per_day}"
+            )
+        if formulation == "compact":
+            build = self._build_compact_assignment
+        elif formulation == "linearized":
+            build = self._build_linearized_assignment
+        else:
+            raise ValueError(
+                f"Unknown assignment formulation {formulation!r}, expected one of {ASSIGNMENT_FORMULATIONS}"
+            )
+        if metrics is None:
+            metrics = SolveMetrics("assignment")
+        with metrics.span("build"):
+            model = build(pairs_list, category_name, num_days, pairs_per_day)
+        metrics.record_model(model.prob)
+        model.metrics = metrics
+        return model
+
+    def _build_linearized_assignment(
+        self,
+        pairs_list: ExercisePairs,
+        category_name: str,
+        num_days: int,
+        pairs_per_day: int,
+    ) -> AssignmentModel:
+        P = len(pairs_list)
+        D = np.triu(self.pair_overlap_matrix(pairs_list), k=1)
+
+        assign_prob = pulp.LpProblem(
+            f"{category_name.lower()}_assignment", pulp.LpMinimize
+        )
+        x = [
+            [pulp.LpVariable(f"x_{p}_{d}", cat="Binary") for d in range(num_days)]
+            for p in range(P)
+        ]
+
+        for p in range(P):
+            assign_prob += (
+                pulp.lpSum(x[p][d] for d in range(num_days)) == 1,
+                f"assign_pair_{p}",
+            )
 
-# -----------------------
-# Assignment ILP Helper
-# -----------------------
-def assign_pairs_to_days(
-    pairs_list: ExercisePairs, category_name: str, num_days: int, pairs_per_day: int
-) -> DayAssignments:
-    """
-    Solve ILP to assign pairs to days with constraints.
-    pairs_list: list of (ex1, ex2) tuples
-    category_name: 'Upper' or 'Lower'
-    num_days: number of days to assign to
-    pairs_per_day: number of pairs per day
-    """
-    if not pairs_list:
-        return {}
+        for d in range(num_days):
+            assign_prob += (
+                pulp.lpSum(x[p][d] for p in range(P)) == pairs_per_day,
+                f"day_capacity_{d}",
+            )
 
-    P = len(pairs_list)
-    if P != num_days * pairs_per_day:
-        raise ValueError(
-            f"Number of pairs {P} does not match num_days * pairs_per_day = {num_days * pairs_per_day}"
+        # Auxiliary for overlaps
+        obj_terms = []
+        overlap_vars = []
+        for d in range(num_days):
+            for p1 in range(P):
+                for p2 in range(p1 + 1, P):
+                    z = pulp.LpVariable(f"z_{d}_{p1}_{p2}", cat="Binary")
+                    assign_prob += z <= x[p1][d]
+                    assign_prob += z <= x[p2][d]
+                    assign_prob += z >= x[p1][d] + x[p2][d] - 1
+                    obj_terms.append(float(D[p1, p2]) * z)
+                    overlap_vars.append((z, x[p1][d], x[p2][d]))
+
+        assign_prob.setObjective(pulp.lpSum(obj_terms))
+
+        day_vars = [
+            (pairs_list[p], d, x[p][d]) for p in range(P) for d in range(num_days)
+        ]
+        return AssignmentModel(
+            assign_prob, "linearized", day_vars, overlap_vars, num_days
         )
 
-    # Precompute pair sum vectors
-    pair_sum_vecs: List[ExerciseVector] = []
-    for p in range(P):
-        ex1, ex2 = pairs_list[p]
-        v1 = exercise_vector(ex1)
-        v2 = exercise_vector(ex2)
-        pair_sum_vecs.append([a + b for a, b in zip(v1, v2)])
-
-    # Compute overlaps
-    D = [[0.0] * P for _ in range(P)]
-    for p1 in range(P):
-        for p2 in range(p1 + 1, P):
-            D[p1][p2] = dot(pair_sum_vecs[p1], pair_sum_vecs[p2])
-
-    # ILP
-    assign_prob = pulp.LpProblem(f"{category_name.lower()}_assignment", pulp.LpMinimize)
-    x = [
-        [pulp.LpVariable(f"x_{p}_{d}", cat="Binary") for d in range(num_days)]
-        for p in range(P)
-    ]
-
-    for p in range(P):
-        assign_prob += (
-            pulp.lpSum(x[p][d] for d in range(num_days)) == 1,
-            f"assign_pair_{p}",
+    def _build_compact_assignment(
+        self,
+        pairs_list: ExercisePairs,
+        category_name: str,
+        num_days: int,
+        pairs_per_day: int,
+    ) -> AssignmentModel:
+        # Aggregate identical pairs into types, in order of first appearance
+        multiplicity = Counter(pairs_list)
+        types: ExercisePairs = list(multiplicity)
+        n = [multiplicity[t] for t in types]
+        T = len(types)
+        D = self.pair_overlap_matrix(types)
+
+        assign_prob = pulp.LpProblem(
+            f"{category_name.lower()}_assignment", pulp.LpMinimize
         )
 
-    for d in range(num_days):
-        assign_prob += (
-            pulp.lpSum(x[p][d] for p in range(P)) == pairs_per_day,
-            f"day_capacity_{d}",
-        )
+        # Slot k of type t on day d is used iff day d holds at least k + 1 copies
+        # of t, so copies of the same pair are never told apart.
+        # Days are interchangeable: order them by the lowest type index they hold.
+        # Then type t can only sit on the first n[0] + ... + n[t] days.
+        slots: Dict[Tuple[int, int], List[pulp.LpVariable]] = {}
+        reachable_days = 0
+        for t in range(T):
+            reachable_days += n[t]
+            for d in range(min(num_days, reachable_days)):
+                slots[(t, d)] = [
+                    pulp.LpVariable(f"x_{t}_{d}_{k}", cat="Binary")
+                    for k in range(min(n[t], pairs_per_day))
+                ]
+                for k in range(1, len(slots[(t, d)])):
+                    assign_prob += (
+                        slots[(t, d)][k] <= slots[(t, d)][k - 1],
+                        f"slot_order_{t}_{d}_{k}",
+                    )
+
+        for t in range(T):
+            assign_prob += (
+                pulp.lpSum(
+                    var for d in range(num_days) for var in slots.get((t, d), [])
+                )
+                == n[t],
+                f"assign_type_{t}",
+            )
 
-    # Auxiliary for overlaps
-    obj_terms = []
-    for d in range(num_days):
-        for p1 in range(P):
-            for p2 in range(p1 + 1, P):
-                z = pulp.LpVariable(f"z_{d}_{p1}_{p2}", cat="Binary")
-                assign_prob += z <= x[p1][d]
-                assign_prob += z <= x[p2][d]
-                assign_prob += z >= x[p1][d] + x[p2][d] - 1
-                obj_terms.append(D[p1][p2] * z)
-
-    assign_prob.setObjective(pulp.lpSum(obj_terms))
-
-    # Solve
-    solver = pulp.PULP_CBC_CMD(msg=False)
-    assign_prob.solve(solver)
-    status = pulp.LpStatus[assign_prob.status]
-
-    if status not in ["Optimal", "Feasible"]:
-        print(f"{category_name} assignment failed.")
-        return {}
-
-    # Extract
-    assignments = {f"Day {d}": [] for d in range(num_days)}
-    for p in range(P):
+        day_slots: List[List[Tuple[int, int, pulp.LpVariable]]] = [
+            [
+                (t, k, var)
+                for t in range(T)
+                for k, var in enumerate(slots.get((t, d), []))
+            ]
+            for d in range(num_days)
+        ]
         for d in range(num_days):
-            if safe_value(x[p][d]) > 0.5:
-                assignments[f"Day {d}"].append(pairs_list[p])
-                break
+            assign_prob += (
+                pulp.lpSum(var for _, _, var in day_slots[d]) == pairs_per_day,
+                f"day_capacity_{d}",
+            )
 
-    total_overlap = pulp.value(assign_prob.objective)
-    print(
-        f"{category_name} assignment minimizes total muscular overlaps between pairs on same days (total overlap: {total_overlap:.2f})."
-    )
+        # Overlap between two used slots on the same day. Activations are
+        # non-negative, so D >= 0 and z only needs its lower bound; pairs of
+        # slots that cannot overlap get no z at all. Slot k of a type overlaps
+        # exactly the k copies before it, which is linear in the slot itself.
+        obj_terms = []
+        overlap_vars = []
+        for d in range(num_days):
+            # Products of each slot with every other slot on the day (exact
+            # for z and same-type slots, bounded above by the partner otherwise)
+            partners: List[List[Any]] = [[] for _ in day_slots[d]]
+            for a in range(len(day_slots[d])):
+                t1, k1, v1 = day_slots[d][a]
+                if k1 > 0:
+                    if D[t1, t1] > 1e-12:
+                        obj_terms.append(float(D[t1, t1]) * k1 * v1)
+                    partners[a].append(k1 * v1)
+                for b in range(a + 1, len(day_slots[d])):
+                    t2, k2, v2 = day_slots[d][b]
+                    if t1 == t2:
+                        partners[a].append(v2)
+                    elif D[t1, t2] <= 1e-12:
+                        partners[a].append(v2)
+                        partners[b].append(v1)
+                    else:
+                        z = pulp.LpVariable(f"z_{d}_{a}_{b}", lowBound=0)
+                        assign_prob += z >= v1 + v2 - 1
+                        partners[a].append(z)
+                        partners[b].append(z)
+                        obj_terms.append(float(D[t1, t2]) * z)
+                        overlap_vars.append((z, v1, v2))
+
+            # A used slot shares its day with exactly pairs_per_day - 1 others
+            # (day capacity multiplied by the slot); tightens the LP bound
+            for a, (t, k, var) in enumerate(day_slots[d]):
+                assign_prob += (
+                    pulp.lpSum(partners[a]) >= (pairs_per_day - 1) * var,
+                    f"day_partners_{d}_{a}",
+                )
+
+        assign_prob.setObjective(pulp.lpSum(obj_terms))
+
+        day_vars = [
+            (types[t], d, var)
+            for (t, d), vars_ in slots.items()
+            for var in vars_
+        ]
+        return AssignmentModel(
+            assign_prob, "compact", day_vars, overlap_vars, num_days
+        )
 
-    return assignments
+    def heuristic_day_assignment(
+        self,
+        pairs_list: ExercisePairs,
+        num_days: int,
+        pairs_per_day: int,
+        time_budget: float = 0.05,
+        seed: int = 0,
+    ) -> Tuple[DayAssignments, float]:
+        """
+        Assign pairs to days without an ILP: greedy construction followed by
+        swap-based simulated annealing within time_budget seconds.
+        Returns the assignment and its total same-day overlap.
+        """
+        day_of, total_overlap = heuristic_assignment(
+            self.pair_overlap_matrix(pairs_list),
+            num_days,
+            pairs_per_day,
+            time_budget,
+            seed,
+        )
+        assignments: DayAssignments = {f"Day {d}": [] for d in range(num_days)}
+        for pair, d in zip(pairs_list, day_of):
+            assignments[f"Day {d}"].append(pair)
+        return assignments, total_overlap
+
+    def assign_pairs_to_days(
+        self,
+        pairs_list: ExercisePairs,
+        category_name: str,
+        num_days: int,
+        pairs_per_day: int,
+        formulation: str = "compact",
+        method: str = "exact",
+        warm_start: bool = True,
+        time_budget: float = 0.05,
+        time_limit: Optional[float] = None,
+        use_cache: bool = True,
+        on_incumbent: Optional[IncumbentHook] = None,
+    ) -> AssignmentResult:
+        """
+        Solve ILP to assign pairs to days with constraints.
+        pairs_list: list of (ex1, ex2) tuples
+        category_name: 'Upper' or 'Lower'
+        num_days: number of days to assign to
+        pairs_per_day: number of pairs per day
+        formulation: see build_assignment_model()
+        method: 'exact' (ILP) or 'heuristic' (heuristic_day_assignment only,
+            status 'Feasible')
+        warm_start: in exact mode, pass the heuristic solution to the solver as a MIP start
+        time_budget: seconds for the heuristic
+        time_limit: solver seconds in exact mode (best solution found is returned;
+            the heuristic solution if the solver found none in time)
+        use_cache: look up / store exact results in self.cache (proven optima only)
+        on_incumbent: called with every improving solution of the exact solve
+            (HiGHS only, see backends.make_solver)
+        """
+        if not pairs_list:
+            return AssignmentResult("Optimal", {})
+        if method not in ASSIGNMENT_METHODS:
+            raise ValueError(
+                f"Unknown assignment method {method!r}, expected one of {ASSIGNMENT_METHODS}"
+            )
+        if len(pairs_list) != num_days * pairs_per_day:
+            raise ValueError(
+                f"Number of pairs {len(pairs_list)} does not match num_days * pairs_per_day = {num_days * pairs_per_day}"
+            )
 
+        metrics = SolveMetrics("assignment")
+        key = None
+        if self.cache is not None and use_cache and method == "exact":
+            with metrics.span("cache_lookup"):
+                key = self.cache.key(
+                    "assignment",
+                    self._assignment_payload(
+                        pairs_list, num_days, pairs_per_day, formulation
+                    ),
+                )
+                cached = self.cache.get(key)
+            if cached is not None:
+                metrics.cache_hit = True
+                self.emit_metrics(metrics)
+                return dataclasses.replace(cached, metrics=metrics)
+
+        if method == "heuristic" or warm_start:
+            with metrics.span("heuristic"):
+                heuristic, heuristic_overlap = self.heuristic_day_assignment(
+                    pairs_list, num_days, pairs_per_day, time_budget
+                )
+            if method == "heuristic":
+                self.emit_metrics(metrics)
+                return AssignmentResult(
+                    "Feasible", heuristic, heuristic_overlap, metrics=metrics
+                )
+
+        model = self.build_assignment_model(
+            pairs_list, category_name, num_days, pairs_per_day, formulation, metrics
+        )
+        if warm_start:
+            with metrics.span("mip_start"):
+                model.set_initial(heuristic)
+
+        # Solve
+        solver = make_solver(self.solver_settings, time_limit, warm_start, on_incumbent)
+        with metrics.span("solve"):
+            model.prob.solve(solver)
+        metrics.backend = self.solver_settings.effective_backend
+        metrics.mip_gap, metrics.nodes = solve_statistics(model.prob)
+        status = pulp.LpStatus[model.prob.status]
+        solved = model.prob.sol_status in (
+            pulp.LpSolutionOptimal,
+            pulp.LpSolutionIntegerFeasible,
+        )
 
-# -----------------------
-# Combined ILP Solver
-# -----------------------
-def solve_muscle_coverage() -> Tuple[
-    str,
-    Dict[DayCategory, ExerciseCounts],
-    Dict[DayCategory, ExercisePairs],
-    CoverageDict,
-    float,
-    float,
-    float,
-    float,
-    float,
-]:
-    """
-    Build and solve the ILP for muscle coverage with mixed-objective minimization.
-    Minimizes weighted sum of absolute deviations (in sets) plus weighted maximum overshoot/undershoot deviations across muscles.
-    Undershoot deviations are weighted more heavily than overshoot deviations.
-
-    Returns:
-        status: Solver status ('Optimal', 'Feasible', etc.)
-        counts_dict: Exercise counts per category
-        pairs_dict: Expanded superset pairs per category
-        coverage: Muscle coverage vs targets
-        sum_overshoot_deviations: Sum of overshoot deviations across all muscles (in sets)
-        sum_undershoot_deviations: Sum of undershoot deviations across all muscles (in sets)
-        max_overshoot: Maximum overshoot deviation across muscles (in sets)
-        max_undershoot: Maximum undershoot deviation across muscles (in sets)
-        objective_value: Minimized objective value (weighted sum + weighted max overshoot/undershoot, in sets)
-    """
-    prob: pulp.LpProblem = pulp.LpProblem("muscle_coverage_solver", pulp.LpMinimize)
+        if status not in ["Optimal", "Feasible"] or not solved:
+            self.emit_metrics(metrics)
+            if warm_start and status != "Infeasible":
+                # Time limit before the solver accepted an incumbent
+                return AssignmentResult(
+                    "Feasible", heuristic, heuristic_overlap, metrics=metrics
+                )
+            return AssignmentResult(status, {}, metrics=metrics)
+
+        with metrics.span("extract"):
+            total_overlap = safe_value(model.prob.objective)
+            result = AssignmentResult(
+                status,
+                model.extract(),
+                total_overlap,
+                proven_optimal(model.prob, self.solver_settings),
+                proven_gap(model.prob, self.solver_settings, metrics.mip_gap),
+                metrics,
+            )
+        if key is not None and result.proven_optimal:
+            self.cache.put(key, "assignment", result)
+        self.emit_metrics(metrics)
+        return result
+
+    def _assignment_payload(
+        self,
+        pairs_list: ExercisePairs,
+        num_days: int,
+        pairs_per_day: int,
+        formulation: str,
+    ) -> Dict[str, Any]:
+        """Everything the day-assignment ILP depends on, for the cache key"""
+        names = sorted({name for pair in pairs_list for name in pair})
+        return {
+            "pairs": pairs_list,
+            "vectors": {n: self.exercise_vector(n).tolist() for n in names},
+            "num_days": num_days,
+            "pairs_per_day": pairs_per_day,
+            "formulation": formulation,
+        }
 
-    # Define categories to process
-    categories = list(DayCategory)
+    def assign_days(
+        self,
+        result: CoverageResult,
+        formulation: str = "compact",
+        deadline: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Dict[DayCategory, AssignmentResult]:
+        """
+        Assign the expanded pairs of a coverage result to days, per category.
+        Extra keyword arguments (method, warm_start, time_budget, time_limit,
+        on_incumbent) go to assign_pairs_to_days().
+        deadline: time.perf_counter() value all categories must finish by: each
+            category's time limit is what is left of it, and categories reached
+            after it get the heuristic assignment
+        """
+        assignments: Dict[DayCategory, AssignmentResult] = {}
+        for cat in result.pairs_dict:
+            if result.pairs_dict[cat]:
+                options = kwargs
+                if deadline is not None:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        options = {**kwargs, "method": "heuristic", "time_limit": None}
+                    else:
+                        limit = kwargs.get("time_limit")
+                        limit = remaining if limit is None else min(limit, remaining)
+                        options = {**kwargs, "time_limit": limit}
+                assignments[cat] = self.assign_pairs_to_days(
+                    result.pairs_dict[cat],
+                    cat.name.lower(),
+                    self.days_per_category[cat],
+                    self.pairs_per_day[cat],
+                    formulation,
+                    **options,
+                )
+        return assignments
+
+    # -----------------------
+    # Combined ILP Solver
+    # -----------------------
+    def solve_coverage(
+        self,
+        time_limit: Optional[float] = None,
+        use_cache: bool = True,
+        on_incumbent: Optional[IncumbentHook] = None,
+    ) -> CoverageResult:
+        """
+        Build and solve the ILP for muscle coverage with mixed-objective minimization.
+        Minimizes weighted sum of absolute deviations (in sets) plus weighted maximum overshoot/undershoot deviations across muscles.
+        Undershoot deviations are weighted more heavily than overshoot deviations.
+        time_limit: solver seconds (best solution found is returned, with its gap)
+        use_cache: look up / store the result in self.cache (proven optima only)
+        on_incumbent: called with every improving solution (HiGHS only, see
+            backends.make_solver)
+        """
+        key = None
+        if self.cache is not None and use_cache:
+            metrics = SolveMetrics("coverage")
+            with metrics.span("cache_lookup"):
+                key = self.cache.key("coverage", coverage_payload(self.config))
+                cached = self.cache.get(key)
+            if cached is not None:
+                metrics.cache_hit = True
+                self.emit_metrics(metrics)
+                return dataclasses.replace(cached, metrics=metrics)
+
+        result = self._solve_coverage(time_limit, on_incumbent)
+        if key is not None and result.proven_optimal:
+            self.cache.put(key, "coverage", result)
+        self.emit_metrics(result.metrics)
+        return result
+
+    def _solve_coverage(
+        self, time_limit: Optional[float], on_incumbent: Optional[IncumbentHook] = None
+    ) -> CoverageResult:
+        model = self.build_coverage_model()
+
+        # Solve
+        solver = make_solver(self.solver_settings, time_limit, on_incumbent=on_incumbent)
+        self.run_coverage_solver(model, solver)
+        return self.extract_coverage(model)
+
+    def run_coverage_solver(self, model: CoverageModel, solver: pulp.LpSolver) -> None:
+        """Solve a built coverage model, recording the solve in its metrics"""
+        metrics = model.metrics
+        with metrics.span("solve"):
+            model.prob.solve(solver)
+        metrics.backend = self.solver_settings.effective_backend
+        metrics.mip_gap, metrics.nodes = solve_statistics(model.prob)
+
+    def count_upper_bound(self, cat: DayCategory, e: int) -> int:
+        """Upper bound of the count variable of exercise e in a category"""
+        return min(
+            self.day_requirements[cat],
+            self.get_max_usage_for_category(self.exercise_names[e], cat),
+        )
 
-    # Exercise count variables per category
-    c: Dict[DayCategory, LpVariableDict] = {}
-    for cat in categories:
-        c[cat] = {
-            e: pulp.LpVariable(
-                f"c_{cat.name.lower()}_{e}",
-                lowBound=0,
-                upBound=min(
-                    DAY_REQUIREMENTS[cat],
-                    get_max_usage_for_category(EXERCISE_NAMES[e], cat),
-                ),
-                cat="Integer",
+    def presolve_coverage(self) -> Dict[DayCategory, PairPresolve]:
+        """Presolve reductions of the coverage ILP per category (see presolve_pairs)"""
+        return {
+            cat: presolve_pairs(
+                self.compatible_pairs[cat],
+                np.array([self.count_upper_bound(cat, e) for e in range(self.E)]),
+                min(self.pairs_per_category[cat], 3),
+                self.vec,
+                self.table.equipment_mask,
             )
-            for e in range(E)
+            for cat in DayCategory
         }
 
-    # Pair variables per category
-    p: Dict[DayCategory, LpVariableDict] = {cat: {} for cat in categories}
-    for cat in categories:
-        for i in range(E):
-            for j in range(i, E):
-                # Check muscle overlap
-                muscle_overlap_ok = W[i][j] <= THRESHOLD + 1e-9
-
-                # Check equipment conflicts
-                ex1_name = EXERCISE_NAMES[i]
-                ex2_name = EXERCISE_NAMES[j]
-                equipment_conflict = has_equipment_conflict(ex1_name, ex2_name)
-
-                # Only allow pairing if both conditions are met
-                if (
-                    muscle_overlap_ok
-                    and not equipment_conflict
-                    and allowed_in_category(EXERCISE_NAMES[i], cat)
-                    and allowed_in_category(EXERCISE_NAMES[j], cat)
-                ):
-                    p[cat][(i, j)] = pulp.LpVariable(
-                        f"p_{cat.name.lower()}_{i}_{j}",
-                        lowBound=0,
-                        upBound=min(PAIRS_PER_CATEGORY[cat], 3),
-                        cat="Integer",
-                    )
-
-    # counts constraints per category
-    for cat in categories:
-        prob += (
-            pulp.lpSum(c[cat][e] for e in range(E)) == DAY_REQUIREMENTS[cat],
-            f"total_{cat.name.lower()}_instances",
+    def build_coverage_model(self, presolve: bool = True) -> CoverageModel:
+        """
+        Build the coverage ILP (see solve_coverage) without solving it.
+        presolve: drop impossible pair and count variables, tighten pair bounds
+            and order interchangeable exercises first (same optimal objective).
+            Models that will be edited in place need presolve=False, as edits
+            can make eliminated variables possible again.
+        """
+        metrics = SolveMetrics("coverage")
+        prob: pulp.LpProblem = pulp.LpProblem("muscle_coverage_solver", pulp.LpMinimize)
+
+        # Define categories to process
+        categories = list(DayCategory)
+        with metrics.span("presolve"):
+            reductions = self.presolve_coverage() if presolve else {}
+
+        with metrics.span("variables"):
+            c: Dict[DayCategory, LpVariableDict] = {}
+            p: Dict[DayCategory, LpVariableDict] = {}
+            for cat in categories:
+                c[cat], p[cat] = self.category_variables(cat, reductions.get(cat))
+
+        with metrics.span("constraints"):
+            # counts constraints per category
+            for cat in categories:
+                prob += self.instances_constraint(cat, c[cat])
+
+            # linking counts to pairs per category
+            for cat in categories:
+                for constraint in self.link_constraints(cat, c[cat], p[cat]):
+                    prob += constraint
+
+            # total pairs constraints per category
+            for cat in categories:
+                prob += self.pairs_constraint(cat, p[cat])
+
+        # Variables for maximum overshoot and undershoot deviations (in sets)
+        max_overshoot_slack = pulp.LpVariable(
+            "max_overshoot_slack", lowBound=0, cat="Continuous"
         )
-
-    # linking counts to pairs per category
-    for cat in categories:
-        for e in range(E):
-            terms = []
-            if (e, e) in p[cat]:
-                terms.append(2 * p[cat][(e, e)])
-            for f in range(0, e):
-                if (f, e) in p[cat]:
-                    terms.append(p[cat][(f, e)])
-            for f in range(e + 1, E):
-                if (e, f) in p[cat]:
-                    terms.append(p[cat][(e, f)])
-            prob += c[cat][e] == pulp.lpSum(terms), f"link_{cat.name.lower()}_{e}"
-
-    # total pairs constraints per category
-    for cat in categories:
-        prob += (
-            pulp.lpSum(p[cat].values()) == PAIRS_PER_CATEGORY[cat],
-            f"total_{cat.name.lower()}_pairs",
+        max_undershoot_slack = pulp.LpVariable(
+            "max_undershoot_slack", lowBound=0, cat="Continuous"
         )
 
-    # Absolute deviation constraints - minimize sum of absolute deviations from targets (in sets)
-    overshoot_deviations = {}
-    undershoot_deviations = {}
+        # Interchangeable exercises: count the first one at least as often
+        for cat, reduction in reductions.items():
+            for k1, k2 in reduction.symmetric:
+                prob += c[cat][k1] >= c[cat][k2], f"sym_{cat.name.lower()}_{k1}_{k2}"
+
+        model = CoverageModel(
+            prob,
+            c,
+            p,
+            {},
+            {},
+            max_overshoot_slack,
+            max_undershoot_slack,
+            reductions,
+            metrics,
+        )
 
-    # Variables for maximum overshoot and undershoot deviations (in sets)
-    max_overshoot_slack = pulp.LpVariable(
-        "max_overshoot_slack", lowBound=0, cat="Continuous"
-    )
-    max_undershoot_slack = pulp.LpVariable(
-        "max_undershoot_slack", lowBound=0, cat="Continuous"
-    )
+        # Absolute deviation constraints - minimize sum of absolute deviations from targets (in sets)
+        with metrics.span("deviation_constraints"):
+            for m in Muscle:
+                if self.muscle_targets[m] > 0:
+                    self.add_deviation_constraints(model, m)
+
+        with metrics.span("objective"):
+            self.set_coverage_objective(model)
+        metrics.record_model(prob)
+        return model
+
+    def category_variables(
+        self, cat: DayCategory, reduction: Optional[PairPresolve] = None
+    ) -> Tuple[LpVariableDict, LpVariableDict]:
+        """
+        Count and pair variables of one category of the coverage ILP, all
+        compatible ones or (with a reduction) those left by presolve.
+        """
+        if reduction is not None:
+            bounds = {e: int(ub) for e, ub in enumerate(reduction.count_bounds) if ub > 0}
+            pair_bounds = zip(reduction.pairs, reduction.pair_bounds)
+        else:
+            bounds = {e: self.count_upper_bound(cat, e) for e in range(self.E)}
+            cap = min(self.pairs_per_category[cat], 3)
+            pair_bounds = ((pair, cap) for pair in self.compatible_pairs[cat])
 
-    for m_idx, m in enumerate(Muscle):
-        if MUSCLE_TARGETS[m] > 0:
-            coverage_expr = pulp.lpSum(
-                SETS_PER_INSTANCE[cat] * c[cat][e] * VEC[e][m_idx]
-                for cat in categories
-                for e in range(E)
+        # Exercise count variables
+        c: LpVariableDict = {
+            e: pulp.LpVariable(
+                f"c_{cat.name.lower()}_{e}",
+                lowBound=0,
+                upBound=ub,
+                cat="Integer",
             )
-            target = MUSCLE_TARGETS[m]
+            for e, ub in bounds.items()
+        }
 
-            # Slack variables for overshoot and undershoot in absolute sets
-            over_abs_slack = pulp.LpVariable(
-                f"over_abs_{m.name}", lowBound=0, cat="Continuous"
-            )
-            under_abs_slack = pulp.LpVariable(
-                f"under_abs_{m.name}", lowBound=0, cat="Continuous"
+        # Pair variables
+        # (overlap within THRESHOLD, no shared equipment, both eligible; precomputed)
+        p: LpVariableDict = {
+            (i, j): pulp.LpVariable(
+                f"p_{cat.name.lower()}_{i}_{j}",
+                lowBound=0,
+                upBound=ub,
+                cat="Integer",
             )
+            for (i, j), ub in pair_bounds
+        }
+        return c, p
+
+    def add_category_constraints(
+        self,
+        prob: pulp.LpProblem,
+        cat: DayCategory,
+        c: LpVariableDict,
+        p: LpVariableDict,
+    ) -> None:
+        """Add the constraints local to one category (instances, links, pairs)"""
+        prob += self.instances_constraint(cat, c)
+        for constraint in self.link_constraints(cat, c, p):
+            prob += constraint
+        prob += self.pairs_constraint(cat, p)
+
+    def instances_constraint(
+        self, cat: DayCategory, c: LpVariableDict
+    ) -> Tuple[pulp.LpConstraint, str]:
+        """The category's exercise instances add up to its day requirements"""
+        return (
+            pulp.lpSum(c.values()) == self.day_requirements[cat],
+            f"total_{cat.name.lower()}_instances",
+        )
 
-            overshoot_deviations[m] = over_abs_slack
-            undershoot_deviations[m] = under_abs_slack
-
-            # Constraints allowing absolute deviation in sets
-            prob += (coverage_expr <= target + over_abs_slack, f"over_dev_{m.name}")
-            prob += (coverage_expr >= target - under_abs_slack, f"under_dev_{m.name}")
-
-            # Constraints for max overshoot and undershoot deviations
-            prob += (max_overshoot_slack >= over_abs_slack, f"max_over_{m.name}")
-            prob += (max_undershoot_slack >= under_abs_slack, f"max_under_{m.name}")
-
-    # Objective: minimize weighted sum of absolute deviations plus weighted max overshoot/undershoot deviations
-    dev_sum_expr = pulp.lpSum(overshoot_deviations.values()) + UNDERSHOOT_WEIGHT_MULTIPLIER * pulp.lpSum(
-        undershoot_deviations.values()
-    )
-    prob.setObjective(DEVIATION_SUM_WEIGHT * dev_sum_expr + max_overshoot_slack + UNDERSHOOT_WEIGHT_MULTIPLIER * max_undershoot_slack)
+    def link_constraints(
+        self, cat: DayCategory, c: LpVariableDict, p: LpVariableDict
+    ) -> List[pulp.LpConstraint]:
+        """
+        c_e - sum of the pairs using e == 0 for each exercise, from per-exercise
+        incidence lists filled in one pass over the pairs
+        """
+        incidence: Dict[int, List[Tuple[pulp.LpVariable, int]]] = {
+            e: [(var, 1)] for e, var in c.items()
+        }
+        for (i, j), var in p.items():
+            if i == j:
+                incidence[i].append((var, -2))
+            else:
+                incidence[i].append((var, -1))
+                incidence[j].append((var, -1))
+        return [
+            pulp.LpConstraint(
+                pulp.LpAffineExpression(terms),
+                pulp.LpConstraintEQ,
+                f"link_{cat.name.lower()}_{e}",
+                0,
+            )
+            for e, terms in incidence.items()
+        ]
+
+    def pairs_constraint(
+        self, cat: DayCategory, p: LpVariableDict
+    ) -> Tuple[pulp.LpConstraint, str]:
+        """The category's pairs add up to its supersets"""
+        return (
+            pulp.lpSum(p.values()) == self.pairs_per_category[cat],
+            f"total_{cat.name.lower()}_pairs",
+        )
 
-    # Solve
-    solver = pulp.PULP_CBC_CMD(msg=False)
-    prob.solve(solver)
+    def add_deviation_constraints(self, model: CoverageModel, m: Muscle) -> None:
+        """Add the overshoot/undershoot slacks and constraints of one muscle"""
+        m_idx = MUSCLE_INDEX[m]
+        prob = model.prob
+        # Only the exercises activating m have a coefficient
+        terms: List[Tuple[pulp.LpVariable, float]] = []
+        for cat in DayCategory:
+            counts, sets = model.c[cat], self.sets_per_instance[cat]
+            for e in self.muscle_exercises[m_idx]:
+                if e in counts:
+                    terms.append((counts[e], sets * float(self.vec[e, m_idx])))
+        coverage_expr = pulp.LpAffineExpression(terms)
+        target = self.muscle_targets[m]
+
+        # Slack variables for overshoot and undershoot in absolute sets
+        over_abs_slack = pulp.LpVariable(
+            f"over_abs_{m.name}", lowBound=0, cat="Continuous"
+        )
+        under_abs_slack = pulp.LpVariable(
+            f"under_abs_{m.name}", lowBound=0, cat="Continuous"
+        )
 
-    status: str = pulp.LpStatus[prob.status]
+        model.overshoot[m] = over_abs_slack
+        model.undershoot[m] = under_abs_slack
 
-    if status not in ("Optimal", "Feasible"):
-        # Return empty dicts for infeasible case (but type says no Optional, assume always succeeds for now)
-        empty_counts = {cat: {} for cat in categories}
-        empty_pairs = {cat: [] for cat in categories}
-        return status, empty_counts, empty_pairs, {}, 0.0, 0.0, 0.0, 0.0, 0.0
+        # Constraints allowing absolute deviation in sets
+        prob += (coverage_expr <= target + over_abs_slack, f"over_dev_{m.name}")
+        prob += (coverage_expr >= target - under_abs_slack, f"under_dev_{m.name}")
 
-    # Build results per category
-    counts_dict: Dict[DayCategory, ExerciseCounts] = {}
-    pairs_dict: Dict[DayCategory, ExercisePairs] = {}
+        # Constraints for max overshoot and undershoot deviations
+        prob += (model.max_overshoot >= over_abs_slack, f"max_over_{m.name}")
+        prob += (model.max_undershoot >= under_abs_slack, f"max_under_{m.name}")
 
-    for cat in categories:
-        counts_dict[cat] = {
-            EXERCISE_NAMES[e]: int(safe_value(c[cat][e]))
-            for e in range(E)
-            if safe_value(c[cat][e]) > 0
-        }
-        pairs_dict[cat] = []
-        for (i, j), var in p[cat].items():
-            q = int(safe_value(var))
-            pairs_dict[cat].extend([(EXERCISE_NAMES[i], EXERCISE_NAMES[j])] * q)
-
-    # Coverage calculation sum over all categories
-    coverage: CoverageDict = {}
-    for m_idx, m in enumerate(Muscle):
-        cov = sum(
-            SETS_PER_INSTANCE[cat] * int(safe_value(c[cat][e])) * VEC[e][m_idx]
-            for cat in categories
-            for e in range(E)
+    def set_coverage_objective(self, model: CoverageModel) -> None:
+        # Objective: minimize weighted sum of absolute deviations plus weighted max overshoot/undershoot deviations
+        dev_sum_expr = pulp.lpSum(model.overshoot.values()) + self.undershoot_weight_multiplier * pulp.lpSum(
+            model.undershoot.values()
         )
-        coverage[m] = cov
+        model.prob.setObjective(self.deviation_sum_weight * dev_sum_expr + model.max_overshoot + self.undershoot_weight_multiplier * model.max_undershoot)
+
+    def extract_coverage(self, model: CoverageModel) -> CoverageResult:
+        """Read a CoverageResult from a solved coverage model"""
+        with model.metrics.span("extract"):
+            result = self._read_coverage(model)
+        result.metrics = model.metrics
+        return result
+
+    def _read_coverage(self, model: CoverageModel) -> CoverageResult:
+        names = self.exercise_names
+        categories = list(DayCategory)
+        prob, c, p = model.prob, model.c, model.p
+        overshoot_deviations = model.overshoot
+        undershoot_deviations = model.undershoot
+
+        status: str = pulp.LpStatus[prob.status]
+
+        if status not in ("Optimal", "Feasible"):
+            empty_counts = {cat: {} for cat in categories}
+            empty_pairs = {cat: [] for cat in categories}
+            return CoverageResult(status, empty_counts, empty_pairs, {})
+
+        # Build results per category
+        counts_dict: Dict[DayCategory, ExerciseCounts] = {}
+        pairs_dict: Dict[DayCategory, ExercisePairs] = {}
+
+        for cat in categories:
+            counts_dict[cat] = {
+                names[e]: round(safe_value(var))
+                for e, var in c[cat].items()
+                if safe_value(var) > 0.5
+            }
+            pairs_dict[cat] = []
+            for (i, j), var in p[cat].items():
+                q = round(safe_value(var))
+                pairs_dict[cat].extend([(names[i], names[j])] * q)
+
+        # Coverage calculation sum over all categories
+        sets_per_muscle = np.zeros(self.M)
+        for cat in categories:
+            for e, var in c[cat].items():
+                count = round(safe_value(var))
+                if count:
+                    sets_per_muscle += self.sets_per_instance[cat] * count * self.vec[e]
+        coverage: CoverageDict = {
+            m: float(sets_per_muscle[m_idx]) for m_idx, m in enumerate(Muscle)
+        }
 
-    # Calculate separate sums and maxima for overshoot and undershoot deviations
-    sum_overshoot_deviations = sum(
-        safe_value(overshoot_deviations[m]) for m in overshoot_deviations
-    )
-    sum_undershoot_deviations = sum(
-        safe_value(undershoot_deviations[m]) for m in undershoot_deviations
-    )
+        # Calculate separate sums and maxima for overshoot and undershoot deviations
+        sum_overshoot_deviations = sum(
+            safe_value(overshoot_deviations[m]) for m in overshoot_deviations
+        )
+        sum_undershoot_deviations = sum(
+            safe_value(undershoot_deviations[m]) for m in undershoot_deviations
+        )
 
-    # Calculate maximum overshoot and undershoot deviations
-    max_overshoot = safe_value(max_overshoot_slack)
-    max_undershoot = safe_value(max_undershoot_slack)
+        # Calculate maximum overshoot and undershoot deviations
+        max_overshoot = safe_value(model.max_overshoot)
+        max_undershoot = safe_value(model.max_undershoot)
 
-    # Calculate objective value (weighted abs sum + weighted max overshoot/undershoot deviations)
-    objective_value = (
-        max_overshoot + UNDERSHOOT_WEIGHT_MULTIPLIER * max_undershoot +
-        DEVIATION_SUM_WEIGHT * (sum_overshoot_deviations + UNDERSHOOT_WEIGHT_MULTIPLIER * sum_undershoot_deviations)
-    )
+        # Calculate objective value (weighted abs sum + weighted max overshoot/undershoot deviations)
+        objective_value = (
+            max_overshoot + self.undershoot_weight_multiplier * max_undershoot +
+            self.deviation_sum_weight * (sum_overshoot_deviations + self.undershoot_weight_multiplier * sum_undershoot_deviations)
+        )
 
-    return (
-        status,
-        counts_dict,
-        pairs_dict,
-        coverage,
-        sum_overshoot_deviations,
-        sum_undershoot_deviations,
-        max_overshoot,
-        max_undershoot,
-        objective_value,
-    )
+        return CoverageResult(
+            status,
+            counts_dict,
+            pairs_dict,
+            coverage,
+            sum_overshoot_deviations,
+            sum_undershoot_deviations,
+            max_overshoot,
+            max_undershoot,
+            objective_value,
+            proven_optimal(prob, self.solver_settings),
+            proven_gap(prob, self.solver_settings, model.metrics.mip_gap),
+        )
 
 
 # -----------------------
 # Run solver and assign pairs to days
 # -----------------------
-result = solve_muscle_coverage()
-
-status = result[0]
-print("Solver status:", status)
-
-if status not in ("Optimal", "Feasible"):
-    print("No feasible solution found.")
-else:
-    # Unpack the successful results
-    (
-        status,
-        counts_dict,
-        pairs_dict,
-        coverage,
-        sum_overshoot_deviations,
-        sum_undershoot_deviations,
-        max_overshoot,
-        max_undershoot,
-        objective_value,
-    ) = result
-
-    print("\n=== COUNTS ===")
-    for cat in counts_dict:
-        supersets_per_day = PAIRS_PER_DAY[cat]
-        days = DAYS_PER_CATEGORY[cat]
-        total_instances = DAY_REQUIREMENTS[cat]
-        total_supersets = PAIRS_PER_CATEGORY[cat]
-        print(
-            f"{cat.name.replace('_', ' ')} counts ({total_instances} instances, {total_supersets} supersets over {days} days at {supersets_per_day}/day):"
-        )
-        for k, v in sorted(counts_dict[cat].items(), key=lambda x: -x[1]):
-            print(f"  {k:40s} : {v}")
-        print()
-
-    print("\n=== EXPANDED PAIRS ===")
-    for cat in pairs_dict:
-        print(
-            f"{cat.name.replace('_', ' ')} expanded pairs ({PAIRS_PER_CATEGORY[cat]} total supersets):"
-        )
-        for i, pair in enumerate(pairs_dict[cat], start=1):
-            print(f" Pair {i:2d}: {pair[0]}  +  {pair[1]}")
-        print()
-
-    print("\n=== COVERAGE vs TARGETS (sets/week) ===")
-    for m in Muscle:
-        if MUSCLE_TARGETS[m] > 0:
-            pct_dev = (coverage[m] - MUSCLE_TARGETS[m]) / MUSCLE_TARGETS[m] * 100
-        else:
-            pct_dev = 0.0
-        print(
-            f"  {m.name:20s} target {MUSCLE_TARGETS[m]:4.1f}   covered {coverage[m]:6.2f}   diff {coverage[m]-MUSCLE_TARGETS[m]:6.2f}   %dev {pct_dev:6.1f}%"
-        )
+def main() -> None:
+    import argparse
+
+    from report import (
+        REPORT_FORMATS,
+        render,
+        report_format,
+        workout_plan_markdown,
+        write_text,
+    )
 
-    print(
-        f"\nObjective = {DEVIATION_SUM_WEIGHT} * (sum_overshoot({sum_overshoot_deviations:.2f}) + {UNDERSHOOT_WEIGHT_MULTIPLIER} * sum_undershoot({sum_undershoot_deviations:.2f})) + max_overshoot({max_overshoot:.2f}) + {UNDERSHOOT_WEIGHT_MULTIPLIER} * max_undershoot({max_undershoot:.2f}) = {objective_value:.2f} sets"
+    parser = argparse.ArgumentParser(
+        description="Solve the weekly plan and write the report"
+    )
+    parser.add_argument("config", nargs="?", default="config.json")
+    parser.add_argument(
+        "--format",
+        default=None,
+        choices=REPORT_FORMATS,
+        help="default: from the --out extension (.json, .csv), else md",
+    )
+    parser.add_argument("--out", default=None, help="report file (UTF-8; default: stdout)")
+    parser.add_argument(
+        "--plan-md", default=None, help="also write the '## Workout Plan' section here"
     )
+    args = parser.parse_args()
 
-    print(f"\nNote: THRESHOLD = {THRESHOLD}")
-    print("SETS_PER_INSTANCE:")
-    for cat, val in SETS_PER_INSTANCE.items():
-        print(f"  {cat.name}: {val}")
-
-    # ---------------------------
-    # Assignment ILP: Assign pairs to days per category
-    # ---------------------------
-    assignments = {}
-    for cat in pairs_dict:
-        if pairs_dict[cat]:
-            category_name = cat.name.lower()
-            num_days = DAYS_PER_CATEGORY[cat]
-            pairs_per_day = PAIRS_PER_DAY[cat]
-            assignments[cat] = assign_pairs_to_days(
-                pairs_dict[cat], category_name, num_days, pairs_per_day
-            )
+    solver = PlanSolver.from_path(args.config)
+    result = solver.solve_coverage()
+    assignments = solver.assign_days(result) if result.feasible else {}
 
-    print("\n=== ASSIGNMENT ===\n")
-    print("## Workout Plan")
-    print()
-
-    for cat in assignments:
-        if assignments[cat]:
-            cat_name = cat.name.replace("_", " ")
-            # Assuming consistent pairs_per_day for the category
-            first_day_pairs = list(assignments[cat].values())[0]
-            pairs_per_day = len(first_day_pairs)
-            day_names = [str(i + 1) for i in range(len(assignments[cat]))]
-
-            print(f"### {cat_name} Days:")
-            header = (
-                "| Workout Type | "
-                + " | ".join(f"Superset {j+1}" for j in range(pairs_per_day))
-                + " |"
-            )
-            print(header)
-            print("|" + "|".join(["---"] * (pairs_per_day + 1)) + "|")
-            for i, (k, pairs) in enumerate(assignments[cat].items()):
-                day_label = f"{cat_name} {day_names[i]}"
-                supersets = [f"{pair[0]}<br>{pair[1]}" for pair in pairs]
-                row = f"| {day_label} | " + " | ".join(supersets) + " |"
-                print(row)
-            print()
+    fmt = args.format or (report_format(args.out) if args.out else "md")
+    text = render(fmt, solver, result, assignments)
+    if args.out is None:
+        sys.stdout.write(text)
+    else:
+        write_text(args.out, text)
+    if args.plan_md is not None and result.feasible:
+        write_text(args.plan_md, workout_plan_markdown(assignments))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from batch import _init_worker, solve_profile
+from benchmark import print_rows, write_rows
+from cache import SolveCache
+from shared import SharedCatalog
+from solve import PlanSolver
+
+# Row columns a plan is judged on (all minimized)
+PARETO_COLUMNS = (
+    "max_overshoot",
+    "max_undershoot",
+    "sum_overshoot_deviations",
+    "sum_undershoot_deviations",
+    "elapsed_s",
+)
+
+
+# -----------------------
+# Parameters and points
+# -----------------------
+@dataclass
+class SweepParam:
+    """
+    One swept tunable.
+
+    key: Config key, with a dot for per-category values ('sets_per_instance.UPPER_GYM')
+    values: Explicit values, or None for the range low..high
+    integer: The key takes whole values (see integer_key): the grid and samples
+        of a range are whole numbers
+    """
+
+    key: str
+    values: Optional[List[float]] = None
+    low: float = 0.0
+    high: float = 0.0
+    integer: bool = False
+
+    @classmethod
+    def parse(cls, spec: str) -> "SweepParam":
+        """'key=v1,v2,...' (values) or 'key=low:high' (range)"""
+        key, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Expected key=v1,v2 or key=low:high, got {spec!r}")
+        if ":" in values:
+            low, high = (float(v) for v in values.split(":"))
+            return cls(key, None, low, high)
+        return cls(key, [float(v) for v in values.split(",")])
+
+    def grid(self, steps: int) -> List[float]:
+        """
+        The values, or `steps` evenly spaced values over the range (rounded and
+        deduplicated for an integer key)
+        """
+        if self.values is not None:
+            return self.values
+        if steps < 2:
+            grid = [self.low]
+        else:
+            grid = [self.low + (self.high - self.low) * k / (steps - 1) for k in range(steps)]
+        if self.integer:
+            return list(dict.fromkeys(round(value) for value in grid))
+        return grid
+
+    def sample(self, rng: random.Random) -> float:
+        """One of the values, or uniform over the range (whole numbers for an integer key)"""
+        if self.values is not None:
+            return rng.choice(self.values)
+        if self.integer:
+            low, high = math.ceil(self.low), math.floor(self.high)
+            if low > high:
+                raise ValueError(f"No whole value of {self.key!r} in {self.low}:{self.high}")
+            return rng.randint(low, high)
+        return rng.uniform(self.low, self.high)
+
+
+def grid_points(params: Sequence[SweepParam], steps: int = 3) -> List[Dict[str, float]]:
+    """Every combination of the parameters' grid values"""
+    keys = [param.key for param in params]
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*(param.grid(steps) for param in params))
+    ]
+
+
+def random_points(
+    params: Sequence[SweepParam], samples: int, seed: int = 0
+) -> List[Dict[str, float]]:
+    """`samples` points with every parameter drawn independently"""
+    rng = random.Random(seed)
+    return [{param.key: param.sample(rng) for param in params} for _ in range(samples)]
+
+
+def integer_key(base: Dict[str, Any], key: str) -> bool:
+    """The config key (dotted for per-category values) holds an integer in base"""
+    top, _, sub = key.partition(".")
+    value = base.get(top)
+    if sub and isinstance(value, dict):
+        value = value.get(sub)
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def point_overrides(base: Dict[str, Any], point: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Config overrides of a point (dotted keys become nested, see merge_config).
+    Keys whose base value is an integer (days_per_category, supersets_per_day)
+    take whole values only, passed on as ints.
+    """
+    overrides: Dict[str, Any] = {}
+    for key, value in point.items():
+        top, _, sub = key.partition(".")
+        if top not in base or bool(sub) != isinstance(base[top], dict):
+            raise ValueError(f"Unknown config key {key!r}")
+        if sub and sub not in base[top]:
+            raise ValueError(f"Unknown config key {key!r}")
+        if integer_key(base, key):
+            if not float(value).is_integer():
+                raise ValueError(f"{key!r} takes integers, got {value}")
+            value = int(value)
+        if sub:
+            overrides.setdefault(top, {})[sub] = value
+        else:
+            overrides[top] = value
+    return overrides
+
+
+# -----------------------
+# Sweep
+# -----------------------
+def run_sweep(
+    base: PlanSolver,
+    points: Sequence[Dict[str, float]],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    assignment_method: str = "exact",
+) -> List[Dict[str, Any]]:
+    """
+    Solve both stages at every point on a process pool. Each worker receives the
+    base solver once (exercise vectors and overlap matrix included); a point
+    only re-parses the tunables, and a new threshold only recomputes the
+    compatible pairs (see PlanSolver.with_overrides). One row per point, in
+    order: the point's values, status, objective, deviations, same-day
+    overlap and solve time.
+    """
+    overrides = [point_overrides(base.config, point) for point in points]
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        initializer=_init_worker,
+        initargs=(base,),
+    ) as pool:
+        futures = [
+            pool.submit(solve_profile, index, override, timeout, assignment_method)
+            for index, override in enumerate(overrides)
+        ]
+        records = [future.result() for future in futures]
+
+    rows: List[Dict[str, Any]] = []
+    for point, record in zip(points, records):
+        rows.append(
+            {
+                **point,
+                "status": record["status"],
+                "objective_value": record.get("objective_value"),
+                "max_overshoot": record.get("max_overshoot"),
+                "max_undershoot": record.get("max_undershoot"),
+                "sum_overshoot_deviations": record.get("sum_overshoot_deviations"),
+                "sum_undershoot_deviations": record.get("sum_undershoot_deviations"),
+                "total_overlap": sum(record.get("total_overlap", {}).values()),
+                "proven_optimal": record.get("proven_optimal", False),
+                "elapsed_s": record["elapsed_s"],
+            }
+        )
+    return rows
+
+
+def pareto_front(
+    rows: Sequence[Dict[str, Any]], columns: Sequence[str] = PARETO_COLUMNS
+) -> List[Dict[str, Any]]:
+    """
+    The solved rows no other solved row dominates (as good in every column,
+    better in one), sorted by the first column
+    """
+    solved = [row for row in rows if row["status"] in ("Optimal", "Feasible")]
+
+    def dominates(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        return all(a[c] <= b[c] for c in columns) and any(a[c] < b[c] for c in columns)
+
+    front = [row for row in solved if not any(dominates(other, row) for other in solved)]
+    return sorted(front, key=lambda row: [row[c] for c in columns])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Sweep tunables over a grid or random samples and print the Pareto table"
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        required=True,
+        help="key=v1,v2 or key=low:high, e.g. threshold=0.4:0.6 or sets_per_instance.UPPER_GYM=2,3",
+    )
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--steps", type=int, default=3, help="grid values per range")
+    parser.add_argument(
+        "--samples", type=int, default=None, help="random points instead of the grid"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per point")
+    parser.add_argument(
+        "--assignment-method", default="exact", choices=["exact", "heuristic"]
+    )
+    parser.add_argument("--cache", default=None, help="SQLite solve cache file")
+    parser.add_argument(
+        "--shared", action="store_true", help="workers attach to one shared exercise table"
+    )
+    parser.add_argument(
+        "--pareto",
+        nargs="+",
+        default=list(PARETO_COLUMNS),
+        help="columns the front is computed on (all minimized)",
+    )
+    parser.add_argument("--all", action="store_true", help="print every point, not only the front")
+    parser.add_argument("--out", default=None, help="also write all rows to .csv or .json")
+    args = parser.parse_args()
+
+    cache = SolveCache(args.cache) if args.cache else None
+    catalog = SharedCatalog.from_path(args.config) if args.shared else None
+    base = catalog.solver(cache) if catalog else PlanSolver.from_path(args.config, cache)
+
+    params = [SweepParam.parse(spec) for spec in args.param]
+    for param in params:
+        param.integer = integer_key(base.config, param.key)
+    if args.samples is not None:
+        points = random_points(params, args.samples, args.seed)
+    else:
+        points = grid_points(params, args.steps)
+    start = time.perf_counter()
+    try:
+        rows = run_sweep(base, points, args.workers, args.timeout, args.assignment_method)
+    finally:
+        if catalog is not None:
+            catalog.close()
+    wall_s = time.perf_counter() - start
+
+    front = pareto_front(rows, args.pareto)
+    print_rows(rows if args.all else front)
+    if args.out:
+        write_rows(rows, args.out)
+    print(
+        f"{len(rows)} points, {len(front)} on the Pareto front, in {wall_s:.2f} s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import time
+
+from solve import PlanSolver
+
+
+def test_categories_past_the_deadline_get_the_heuristic():
+    solver = PlanSolver.from_path("config.json")
+    coverage = solver.solve_coverage(use_cache=False)
+    days = solver.assign_days(coverage, deadline=time.perf_counter() - 1, use_cache=False)
+    assert days
+    for assignment in days.values():
+        assert assignment.status == "Feasible"
+        assert not assignment.proven_optimal
+
@@ -0,0 +1,24 @@
+from cache import SolveCache
+from solve import PlanSolver
+
+
+def test_gap_stopped_solve_is_not_served_to_a_strict_solve(tmp_path):
+    cache = SolveCache(str(tmp_path / "cache.sqlite"))
+    base = PlanSolver.from_path("config.json", cache)
+    loose = base.with_overrides({"solver": {"backend": "cbc", "gap_rel": 0.5}})
+    strict = base.with_overrides({"solver": {"backend": "cbc", "gap_rel": None}})
+
+    first = loose.solve_coverage()
+    assert first.feasible
+    assert not first.proven_optimal
+    assert cache.stats()["entries"] == 0
+
+    second = strict.solve_coverage()
+    assert not second.metrics.cache_hit
+    assert second.proven_optimal
+    assert second.objective_value <= first.objective_value + 1e-9
+
+    # Proven optima are cached
+    third = strict.solve_coverage()
+    assert third.metrics.cache_hit
+    assert third.objective_value == second.objective_value
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+
+from service import PlanService
+from solve import PlanSolver
+
+
+@pytest.fixture(scope="module")
+def service():
+    return PlanService(PlanSolver.from_path("config.json"))
+
+
+def exchange(service, request: bytes) -> bytes:
+    """Send one raw request to the service's handler and return the raw reply"""
+
+    async def run() -> bytes:
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            reply = await reader.read()
+            writer.close()
+            return reply
+
+    return asyncio.run(run())
+
+
+def post(body: bytes, length: str = None) -> bytes:
+    length = str(len(body)) if length is None else length
+    return (
+        b"POST /jobs HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {length}\r\n\r\n".encode()
+        + body
+    )
+
+
+def status_and_error(reply: bytes):
+    head, _, body = reply.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)["error"]
+
+
+def test_non_utf8_body_is_a_bad_request(service):
+    status, error = status_and_error(exchange(service, post(b"\xff")))
+    assert status == 400
+    assert error.startswith("invalid JSON")
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_invalid_content_length_is_a_bad_request(service, length):
+    status, error = status_and_error(exchange(service, post(b"", length)))
+    assert status == 400
+    assert error == "invalid Content-Length"
+
@@ -0,0 +1,40 @@
+import copy
+
+import pytest
+
+from solve import load_config
+from snapshot import config_problems
+
+
+@pytest.fixture(scope="module")
+def base():
+    return load_config("config.json")
+
+
+def test_shipped_config_has_no_problems(base):
+    assert config_problems(base) == []
+
+
+@pytest.mark.parametrize(
+    "key", ["muscle_targets", "exercises", "days_per_category", "sets_per_instance", "solver"]
+)
+def test_non_object_section_is_a_problem(base, key):
+    config = copy.deepcopy(base)
+    config[key] = [1]
+    assert config_problems(config) == [f"{key}: expected an object, got [1]"]
+
+
+def test_muscle_without_target_is_a_problem(base):
+    config = copy.deepcopy(base)
+    del config["muscle_targets"]["LATS"]
+    assert config_problems(config) == ["muscle_targets: missing Muscle LATS"]
+
+
+def test_category_missing_everywhere_is_a_problem(base):
+    config = copy.deepcopy(base)
+    for key in ("sets_per_instance", "supersets_per_day", "days_per_category"):
+        del config[key]["LOWER_HOME"]
+    assert config_problems(config) == [
+        f"{key}: missing DayCategory LOWER_HOME"
+        for key in ("sets_per_instance", "supersets_per_day", "days_per_category")
+    ]
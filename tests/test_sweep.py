@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from solve import load_config
+from sweep import SweepParam, grid_points, integer_key, point_overrides, random_points
+
+
+@pytest.fixture(scope="module")
+def base():
+    return load_config("config.json")
+
+
+def integer_param(base, spec):
+    param = SweepParam.parse(spec)
+    param.integer = integer_key(base, param.key)
+    return param
+
+
+def test_integer_range_grid_is_whole_and_deduplicated(base):
+    param = integer_param(base, "days_per_category.UPPER_GYM=2:4")
+    assert param.integer
+    assert param.grid(4) == [2, 3, 4]
+    assert param.grid(2) == [2, 4]
+
+
+def test_integer_range_samples_are_whole(base):
+    param = integer_param(base, "supersets_per_day.UPPER_GYM=1:3")
+    points = random_points([param], 20, seed=1)
+    for point in points:
+        overrides = point_overrides(base, point)
+        assert overrides["supersets_per_day"]["UPPER_GYM"] in (1, 2, 3)
+
+
+def test_float_keys_keep_fractions(base):
+    param = integer_param(base, "threshold=0.4:0.5")
+    assert not param.integer
+    assert not float(param.sample(random.Random(0))).is_integer()
+    assert [p["threshold"] for p in grid_points([param], 3)] == pytest.approx([0.4, 0.45, 0.5])
+
+
+def test_explicit_fractional_value_of_integer_key_is_rejected(base):
+    with pytest.raises(ValueError, match="takes integers"):
+        point_overrides(base, {"days_per_category.UPPER_GYM": 2.5})